@@ -8,12 +8,15 @@ import datetime
 import os
 import pathlib
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.append(str(pathlib.Path(__file__).parent.parent))
 
-from scripts.lib.notify import NotifyConfig, latest_report_paths, send_email
-from scripts.weekly_report import main as generate_reports
+from scripts.lib.notify import NotifyConfig, send_email
+from scripts.lib.report_template import with_cdn_assets
+from scripts.weekly_report import ASSETS, WORKERS, generate_all
 
 # Import tenant utilities with fallback
 try:
@@ -28,32 +31,76 @@ except ImportError:
 
 
 ARTIFACTS = pathlib.Path(__file__).resolve().parents[1] / "artifacts"
+EMAIL_DIR = ARTIFACTS / "email"
 
+# Concurrent email sends (SMTP is I/O bound)
+SEND_WORKERS = int(os.environ.get("FXZ_EMAIL_WORKERS", "4"))
 
-def ensure_bundle(tenant: str, do_zip: bool) -> dict:
-    """Ensure reports exist for tenant, regenerating if needed"""
+
+def plan_bundle(tenants: list, do_zip: bool, force: bool = False) -> dict:
+    """Generate every needed report, and at most one ZIP, exactly once.
+
+    The ZIP bundle carries all tenants, so with `do_zip` every tenant's
+    report is generated; otherwise only `tenants`. Unchanged reports are
+    reused (see weekly_report.generate_all). Returns per-tenant paths plus
+    generation stats.
+    """
     timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M")
+    targets = list_tenants() if do_zip else list(tenants)
+    targets += [t for t in tenants if t not in targets]
 
-    if do_zip:
-        # Generate all tenants with ZIP bundle
-        generate_reports(args=argparse.Namespace(tenant=None, all=True, zip=True))
-    else:
-        # Generate single tenant
-        generate_reports(args=argparse.Namespace(tenant=tenant, all=False, zip=False))
+    t0 = time.perf_counter()
+    results, zip_path = generate_all(
+        targets, WORKERS, do_zip=do_zip, assets=ASSETS if do_zip else "cdn", force=force
+    )
+    files = {r["tenant"]: pathlib.Path(r["file"]) for r in results if r["ok"]}
 
-    return {"paths": latest_report_paths(tenant), "timestamp": timestamp}
+    return {
+        "paths": {t: {"html": files.get(t), "zip": zip_path} for t in targets},
+        "timestamp": timestamp,
+        "generated": sum(1 for r in results if r["ok"] and not r.get("cached")),
+        "reused": sum(1 for r in results if r.get("cached")),
+        "failed": [r["tenant"] for r in results if not r["ok"]],
+        "seconds": time.perf_counter() - t0,
+    }
 
 
-def email_tenant(tenant: str, dry_run: bool = False, force_zip: bool = True) -> str:
-    """Send email report for a specific tenant"""
+def ensure_bundle(tenant: str, do_zip: bool) -> dict:
+    """Ensure reports exist for tenant, regenerating if needed"""
+    plan = plan_bundle([tenant], do_zip)
+    return {"paths": plan["paths"][tenant], "timestamp": plan["timestamp"]}
+
+
+def attachable_html(path: pathlib.Path) -> pathlib.Path:
+    """A copy of report `path` that renders without its assets/ folder"""
+    page = path.read_text(encoding="utf-8")
+    standalone = with_cdn_assets(page)
+    if standalone == page:
+        return path
+    EMAIL_DIR.mkdir(parents=True, exist_ok=True)
+    copy = EMAIL_DIR / path.name
+    copy.write_text(standalone, encoding="utf-8")
+    return copy
+
+
+def email_tenant(
+    tenant: str, dry_run: bool = False, force_zip: bool = True, paths: dict = None
+) -> str:
+    """Send email report for a specific tenant.
+
+    `paths` comes from a bundle planned once for the whole run; without
+    it the tenant's reports are ensured on the spot.
+    """
     config = NotifyConfig(tenant)
 
     if not config.emails:
         return f"[{tenant}] skipped: no recipient emails configured"
 
     # Ensure reports exist
-    bundle_info = ensure_bundle(tenant, do_zip=force_zip)
-    paths = bundle_info["paths"]
+    if paths is None:
+        paths = ensure_bundle(tenant, do_zip=force_zip)["paths"]
+    elif not force_zip:
+        paths = {**paths, "zip": None}
 
     # Prepare email content
     subject = f"{config.subject_prefix} {tenant} — Weekly Report"
@@ -71,7 +118,8 @@ This is an automated weekly performance and reliability report for your Fixzit d
     # Prepare attachments
     attachments = []
     if config.attach_html and paths["html"]:
-        attachments.append(paths["html"])
+        # Bundle-mode reports point at assets/, which an attachment lacks
+        attachments.append(attachable_html(paths["html"]))
     if config.attach_zip and paths["zip"]:
         attachments.append(paths["zip"])
 
@@ -106,6 +154,17 @@ def cli():
         "--dry-run", action="store_true", help="Show what would be sent"
     )
     parser.add_argument("--no-zip", action="store_true", help="Don't create ZIP bundle")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate reports even when their inputs are unchanged",
+    )
+    parser.add_argument(
+        "--send-workers",
+        type=int,
+        default=SEND_WORKERS,
+        help="Concurrent email sends (default: FXZ_EMAIL_WORKERS or 4)",
+    )
 
     args = parser.parse_args()
 
@@ -115,15 +174,39 @@ def cli():
     else:
         tenants = [args.tenant]
 
-    # Process each tenant
-    results = []
-    for tenant in tenants:
-        result = email_tenant(tenant, dry_run=args.dry_run, force_zip=not args.no_zip)
-        results.append(result)
+    # Phase 1: generate every report and the ZIP once, for all recipients
+    recipients = [t for t in tenants if NotifyConfig(t).emails]
+    plan = {"paths": {}}
+    if recipients:
+        plan = plan_bundle(recipients, do_zip=not args.no_zip, force=args.force)
+        print(
+            f"🏗️  Generate: {plan['generated']} rendered, {plan['reused']} reused"
+            + (f", {len(plan['failed'])} failed" if plan["failed"] else "")
+            + f" in {plan['seconds']:.1f}s"
+        )
+
+    # Phase 2: fan out the sends
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.send_workers)) as pool:
+        results = list(
+            pool.map(
+                lambda tenant: email_tenant(
+                    tenant,
+                    dry_run=args.dry_run,
+                    force_zip=not args.no_zip,
+                    paths=plan["paths"].get(tenant),
+                ),
+                tenants,
+            )
+        )
 
     # Print results
     for result in results:
         print(result)
+    print(
+        f"📨 Send: {len(recipients)} tenant(s) in {time.perf_counter() - t0:.1f}s"
+        + (" (dry run)" if args.dry_run else "")
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,461 @@
+"""
+Shared app-server lifecycle for browser-driven scripts
+
+Launches the app on a free port, waits for it over HTTP, and drains its
+logs on a background thread so the pipe never fills. A server started
+with ``python scripts/lib/app_server.py start`` stays warm across the
+perf, trend and UI-review steps of a pipeline: every script that uses
+``app_server()`` attaches to it (via FXZ_APP_URL or the state file)
+instead of cold-starting its own.
+
+Two backends are supported: Streamlit (an ``*.py`` entry) and the Next.js
+production build (entry ``next``, selected via FXZ_APP_ENTRY or a
+``--server next`` flag). The Next backend runs ``next build`` only when
+the build inputs' hash differs from the one stamped into ``.next`` and
+then serves it with ``next start``.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import pathlib
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from typing import Deque, List, Optional
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+STATE_FILE = ARTIFACTS / "app-server.json"
+LOG_FILE = ARTIFACTS / "app-server.log"
+
+DEFAULT_ENTRY = os.environ.get("FXZ_APP_ENTRY", "app.py")
+READY_TIMEOUT = float(os.environ.get("FXZ_APP_READY_TIMEOUT", "60"))
+LOG_TAIL_LINES = 200
+
+# Next.js production backend
+NEXT_ENTRY = "next"
+SERVERS = ["streamlit", NEXT_ENTRY]
+STREAMLIT_ENTRY = "app.py"
+NEXT_DIST = ROOT / ".next"
+BUILD_STAMP = NEXT_DIST / "fxz-build-hash"
+BUILD_LOG = ARTIFACTS / "next-build.log"
+# Paths that never affect the production bundle
+BUILD_IGNORED = (
+    "artifacts/",
+    "_artifacts/",
+    "docs/",
+    "qa/",
+    "scripts/",
+    "tests/",
+    ".github/",
+)
+BUILD_ENV_PREFIXES = ("NEXT_PUBLIC_", "NEXT_OUTPUT", "NODE_ENV")
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """Ask the OS for an unused TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def probe(url: str, timeout: float = 2.0) -> bool:
+    """True when `url` answers HTTP with anything other than a 5xx"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except Exception:
+        return False
+
+
+def wait_ready(url: str, timeout: float = READY_TIMEOUT, proc=None) -> None:
+    """Poll `url` until it answers, failing fast if `proc` exits"""
+    deadline = time.time() + timeout
+    delay = 0.1
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"App server exited early with code {proc.returncode}")
+        if probe(url):
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+    raise RuntimeError(f"App server not responding at {url} after {timeout:.0f}s")
+
+
+def is_next_entry(entry: Optional[str]) -> bool:
+    return bool(entry) and (
+        entry == NEXT_ENTRY or pathlib.Path(entry).name.startswith("next.config")
+    )
+
+
+def resolve_entry(server: Optional[str], entry: str = DEFAULT_ENTRY) -> str:
+    """Entry for a `--server` choice, falling back to FXZ_APP_ENTRY"""
+    if server == NEXT_ENTRY:
+        return NEXT_ENTRY
+    if server == "streamlit" and is_next_entry(entry):
+        return STREAMLIT_ENTRY
+    return entry
+
+
+def _next_bin() -> List[str]:
+    local = ROOT / "node_modules" / ".bin" / "next"
+    return [str(local)] if local.exists() else ["npx", "--no-install", "next"]
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def _build_input(path: str) -> bool:
+    return not path.startswith(BUILD_IGNORED) and not path.endswith(".md")
+
+
+def build_fingerprint() -> str:
+    """Hash of everything `next build` reads: tracked blob ids, working-tree
+    edits, untracked files and build-time environment variables"""
+    digest = hashlib.sha256()
+    try:
+        for line in _git("ls-files", "-s").splitlines():
+            meta, _, path = line.partition("\t")
+            if _build_input(path):
+                digest.update(f"{meta} {path}\n".encode())
+        # Dirty and untracked files are hashed by content
+        for line in _git("status", "--porcelain", "-uall").splitlines():
+            path = line[3:].split(" -> ")[-1].strip('"')
+            if not _build_input(path):
+                continue
+            file = ROOT / path
+            content = file.read_bytes() if file.is_file() else b"<deleted>"
+            digest.update(path.encode() + b"\0" + hashlib.sha256(content).digest())
+    except (OSError, subprocess.CalledProcessError):
+        # Not a git checkout: fall back to file metadata
+        for path in sorted(p for p in ROOT.rglob("*") if p.is_file()):
+            rel = path.relative_to(ROOT).as_posix()
+            if rel.startswith(("node_modules/", ".next/")) or not _build_input(rel):
+                continue
+            stat = path.stat()
+            digest.update(f"{rel} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+
+    for key in sorted(os.environ):
+        if key.startswith(BUILD_ENV_PREFIXES):
+            digest.update(f"{key}={os.environ[key]}\n".encode())
+    return digest.hexdigest()
+
+
+def ensure_next_build(force: bool = False) -> bool:
+    """Run `next build` unless .next already matches the sources.
+
+    Returns True when a build ran.
+    """
+    fingerprint = build_fingerprint()
+    if (
+        not force
+        and (NEXT_DIST / "BUILD_ID").exists()
+        and BUILD_STAMP.exists()
+        and BUILD_STAMP.read_text().strip() == fingerprint
+    ):
+        print("♻️  Reusing Next.js build in .next (sources unchanged)")
+        return False
+
+    print("🏗️  Building Next.js app (sources changed)...")
+    t0 = time.time()
+    env = dict(os.environ)
+    env.setdefault("NODE_OPTIONS", "--max-old-space-size=8192")
+    ARTIFACTS.mkdir(exist_ok=True)
+    with open(BUILD_LOG, "w", encoding="utf-8") as log:
+        result = subprocess.run(
+            _next_bin() + ["build"],
+            cwd=ROOT,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    if result.returncode != 0:
+        tail = BUILD_LOG.read_text(encoding="utf-8").splitlines()[-LOG_TAIL_LINES:]
+        print("\n".join(tail))
+        raise RuntimeError(f"next build failed with code {result.returncode}")
+
+    BUILD_STAMP.write_text(fingerprint)
+    print(f"✅ Next.js build finished in {time.time() - t0:.1f}s")
+    return True
+
+
+def next_command(host: str, port: int) -> List[str]:
+    """Command line for serving the production build with `next start`"""
+    return _next_bin() + ["start", "--port", str(port), "--hostname", host]
+
+
+def streamlit_command(entry: str, host: str, port: int) -> List[str]:
+    """Command line for serving `entry` with Streamlit"""
+    return [
+        sys.executable,
+        "-m",
+        "streamlit",
+        "run",
+        str(entry),
+        "--server.port",
+        str(port),
+        "--server.headless",
+        "true",
+        "--server.address",
+        host,
+        "--browser.gatherUsageStats",
+        "false",
+    ]
+
+
+class AppServer:
+    """A running (or attached) app server"""
+
+    def __init__(
+        self,
+        entry: str = DEFAULT_ENTRY,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        echo_logs: bool = False,
+    ):
+        self.entry = entry
+        self.host = host
+        self.port = port or free_port(host)
+        self.url = f"http://{host}:{self.port}"
+        self.echo_logs = echo_logs
+        self.proc: Optional[subprocess.Popen] = None
+        self.attached = False
+        self._log_tail: Deque[str] = collections.deque(maxlen=LOG_TAIL_LINES)
+        self._drain: Optional[threading.Thread] = None
+
+    @classmethod
+    def attach(cls, url: str) -> "AppServer":
+        """Wrap an already-running server without owning its lifecycle"""
+        parts = urllib.parse.urlsplit(url)
+        server = cls(entry=None, port=parts.port or 80, host=parts.hostname)
+        server.url = url.rstrip("/")
+        server.attached = True
+        return server
+
+    def command(self) -> List[str]:
+        if is_next_entry(self.entry):
+            return next_command(self.host, self.port)
+        return streamlit_command(self.entry, self.host, self.port)
+
+    def cwd(self) -> Optional[pathlib.Path]:
+        # `next` resolves the project from its working directory
+        return ROOT if is_next_entry(self.entry) else None
+
+    def prepare(self) -> None:
+        """Backend-specific setup before launch (Next: build if stale)"""
+        if is_next_entry(self.entry):
+            ensure_next_build()
+
+    def start(self, timeout: float = READY_TIMEOUT) -> "AppServer":
+        """Launch the server and block until it answers HTTP"""
+        self.prepare()
+        print(f"🚀 Starting app server ({self.entry}) on {self.url}...")
+        t0 = time.time()
+
+        self.proc = subprocess.Popen(
+            self.command(),
+            cwd=self.cwd(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        self._drain = threading.Thread(target=self._drain_logs, daemon=True)
+        self._drain.start()
+
+        try:
+            wait_ready(self.url, timeout=timeout, proc=self.proc)
+        except Exception:
+            print("\n".join(self._log_tail))
+            self.stop()
+            raise
+
+        print(f"✅ App server ready in {time.time() - t0:.1f}s")
+        return self
+
+    def _drain_logs(self) -> None:
+        for line in self.proc.stdout:
+            line = line.rstrip()
+            self._log_tail.append(line)
+            if self.echo_logs:
+                print(f"📡 {line}")
+
+    def logs(self) -> List[str]:
+        """Most recent server log lines"""
+        return list(self._log_tail)
+
+    def stop(self) -> None:
+        """Terminate the server if this process owns it"""
+        if self.attached or self.proc is None or self.proc.poll() is not None:
+            return
+
+        print("🛑 Shutting down app server...")
+        try:
+            self.proc.terminate()
+            self.proc.wait(timeout=5)
+        except Exception as e:
+            print(f"Warning: Failed to gracefully shutdown: {e}")
+            try:
+                self.proc.kill()
+            except Exception:
+                pass
+
+
+def _backend(entry: Optional[str]) -> Optional[str]:
+    """What a server entry actually serves: `next` or the Streamlit script"""
+    if not entry:
+        return None
+    return NEXT_ENTRY if is_next_entry(entry) else pathlib.Path(entry).as_posix()
+
+
+def warm_server_url(entry: Optional[str] = None) -> Optional[str]:
+    """URL of a reachable warm server from FXZ_APP_URL or the state file.
+
+    With `entry`, a state-file server recorded for a different backend is
+    ignored; FXZ_APP_URL is an explicit choice and is always trusted.
+    """
+    candidates = [os.environ.get("FXZ_APP_URL")]
+    if STATE_FILE.exists():
+        try:
+            state = json.loads(STATE_FILE.read_text())
+        except Exception:
+            state = {}
+        if entry and _backend(state.get("entry")) != _backend(entry):
+            if state.get("url"):
+                print(
+                    f"⚠️  Warm server at {state['url']} runs {state.get('entry')}, "
+                    f"not {entry}; not reusing it"
+                )
+        else:
+            candidates.append(state.get("url"))
+
+    for url in candidates:
+        if url and probe(url):
+            return url.rstrip("/")
+    return None
+
+
+@contextmanager
+def app_server(
+    entry: str = DEFAULT_ENTRY,
+    port: Optional[int] = None,
+    echo_logs: bool = False,
+):
+    """Yield a ready AppServer, reusing a warm one of the same backend"""
+    url = warm_server_url(entry)
+    if url:
+        print(f"♻️  Reusing warm app server at {url}")
+        yield AppServer.attach(url)
+        return
+
+    if port is None and os.environ.get("FXZ_APP_PORT"):
+        port = int(os.environ["FXZ_APP_PORT"])
+
+    server = AppServer(entry=entry, port=port, echo_logs=echo_logs)
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def start_detached(entry: str = DEFAULT_ENTRY, port: Optional[int] = None) -> dict:
+    """Start a warm server that outlives this process and record its state"""
+    if STATE_FILE.exists():
+        try:
+            state = json.loads(STATE_FILE.read_text())
+        except Exception:
+            state = {}
+        if state.get("url") and probe(state["url"]):
+            if _backend(state.get("entry")) != _backend(entry):
+                raise RuntimeError(
+                    f"Warm server at {state['url']} runs {state.get('entry')}; "
+                    "stop it before starting another backend"
+                )
+            return state
+    url = warm_server_url()
+    if url:
+        return {"url": url}
+
+    ARTIFACTS.mkdir(exist_ok=True)
+    server = AppServer(entry=entry, port=port)
+    server.prepare()
+    with open(LOG_FILE, "a", encoding="utf-8") as log:
+        proc = subprocess.Popen(
+            server.command(),
+            cwd=server.cwd(),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    try:
+        wait_ready(server.url, proc=proc)
+    except Exception:
+        # Nothing records the pid yet, so no later stop could reach it
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        raise
+
+    state = {"pid": proc.pid, "url": server.url, "entry": entry, "started": time.time()}
+    STATE_FILE.write_text(json.dumps(state, indent=2))
+    return state
+
+
+def stop_detached() -> bool:
+    """Stop the warm server recorded in the state file"""
+    if not STATE_FILE.exists():
+        return False
+
+    try:
+        state = json.loads(STATE_FILE.read_text())
+        os.killpg(state["pid"], signal.SIGTERM)
+    except Exception as e:
+        print(f"Warning: Failed to stop warm server: {e}")
+    finally:
+        STATE_FILE.unlink(missing_ok=True)
+    return True
+
+
+def cli():
+    """Command line interface"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage a warm app server")
+    parser.add_argument("action", choices=["start", "stop", "status"])
+    parser.add_argument("--entry", default=DEFAULT_ENTRY)
+    parser.add_argument("--server", choices=SERVERS, help="Overrides --entry")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    if args.action == "start":
+        entry = resolve_entry(args.server, args.entry)
+        state = start_detached(entry=entry, port=args.port)
+        print(f"export FXZ_APP_URL={state['url']}")
+    elif args.action == "stop":
+        stopped = stop_detached()
+        print("🛑 Warm server stopped" if stopped else "No warm server running")
+    else:
+        url = warm_server_url()
+        print(f"✅ Warm server at {url}" if url else "No warm server running")
+        sys.exit(0 if url else 1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,234 @@
+"""
+Login-once Playwright storage state for authenticated sweeps
+
+Each role (tenant, owner, admin, ...) logs in once and the resulting
+storage state (session cookies + localStorage) is written to
+artifacts/auth/<role>.json with an expiry in a sidecar meta file. Every
+browser context -- in this process or in sweep workers -- is then created
+with ``storage_state=<path>`` instead of logging in per route.
+
+Credentials come from the same variables as tests/setup-auth.ts:
+TEST_<ROLE>_IDENTIFIER and TEST_<ROLE>_PASSWORD. Sessions are minted via
+the test-only /api/auth/test/session endpoint when the app exposes it,
+falling back to the login form.
+"""
+
+import base64
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+STATE_DIR = ARTIFACTS / "auth"
+
+ROLES = ["tenant", "owner", "admin"]
+DEFAULT_ROLE = os.environ.get("FXZ_PERF_ROLE") or None
+STATE_TTL = int(os.environ.get("FXZ_AUTH_TTL", "600"))  # seconds
+EXPIRY_MARGIN = 60  # refresh states that would expire mid-sweep
+# maxAge of the JWT minted by app/api/auth/test/session/route.ts; its
+# cookies carry no expiry, so this is the only cap on minted sessions
+MINTED_SESSION_TTL = 15 * 60
+
+LOGIN_TIMEOUT = 30_000
+SESSION_COOKIES = ("authjs.session-token", "next-auth.session-token")
+
+
+def state_path(role: str) -> pathlib.Path:
+    return STATE_DIR / f"{role}.json"
+
+
+def _meta_path(role: str) -> pathlib.Path:
+    return STATE_DIR / f"{role}.meta.json"
+
+
+def credentials(role: str) -> Dict[str, Optional[str]]:
+    prefix = f"TEST_{role.upper()}"
+    return {
+        "identifier": os.environ.get(f"{prefix}_IDENTIFIER"),
+        "password": os.environ.get(f"{prefix}_PASSWORD"),
+        "org_id": os.environ.get("PUBLIC_ORG_ID")
+        or os.environ.get("DEFAULT_ORG_ID")
+        or os.environ.get("TEST_ORG_ID"),
+    }
+
+
+def cached_state(role: str, base_url: str) -> Optional[pathlib.Path]:
+    """Saved state for `role` if it is unexpired and for the same host"""
+    path = state_path(role)
+    try:
+        meta = json.loads(_meta_path(role).read_text())
+    except (OSError, ValueError):
+        return None
+    if not path.exists() or meta.get("host") != urlsplit(base_url).hostname:
+        return None
+    if meta.get("expires", 0) <= time.time() + EXPIRY_MARGIN:
+        return None
+    return path
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """`exp` claim of a signed (three-part) JWT; encrypted tokens give None"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        exp = json.loads(payload).get("exp")
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _state_expiry(state: Dict, lifetime: Optional[float] = None) -> float:
+    """TTL-bounded expiry, capped by the session's own `lifetime` and by the
+    earliest session cookie or token expiry"""
+    now = time.time()
+    expires = now + STATE_TTL
+    if lifetime:
+        expires = min(expires, now + lifetime)
+    for cookie in state.get("cookies", []):
+        if not cookie.get("name", "").endswith(SESSION_COOKIES):
+            continue
+        if cookie.get("expires", -1) > 0:
+            expires = min(expires, cookie["expires"])
+        token_exp = _token_expiry(cookie.get("value", ""))
+        if token_exp:
+            expires = min(expires, token_exp)
+    return expires
+
+
+def _has_session(context) -> bool:
+    return any(c["name"].endswith(SESSION_COOKIES) for c in context.cookies())
+
+
+def _mint_session(context, base_url: str, creds: Dict) -> bool:
+    """Test-only session endpoint (non-production builds); sets cookies"""
+    # The endpoint rejects a null orgId but resolves a missing one itself
+    data = {"email": creds["identifier"]}
+    if creds["org_id"]:
+        data["orgId"] = creds["org_id"]
+    try:
+        response = context.request.post(
+            f"{base_url}/api/auth/test/session", data=data, timeout=LOGIN_TIMEOUT
+        )
+    except Exception:
+        return False
+    if not response.ok:
+        return False
+
+    token = (response.json() or {}).get("sessionToken")
+    if token and not _has_session(context):
+        parts = urlsplit(base_url)
+        context.add_cookies(
+            [
+                {
+                    "name": name,
+                    "value": token,
+                    "domain": parts.hostname,
+                    "path": "/",
+                    "httpOnly": True,
+                    "sameSite": "Lax",
+                    "secure": parts.scheme == "https",
+                }
+                for name in SESSION_COOKIES
+            ]
+        )
+    return _has_session(context)
+
+
+def _form_login(context, base_url: str, creds: Dict) -> bool:
+    if not creds["password"]:
+        return False
+    page = context.new_page()
+    try:
+        page.goto(f"{base_url}/login", wait_until="domcontentloaded")
+        page.get_by_test_id("login-email").fill(creds["identifier"])
+        page.get_by_test_id("login-password").fill(creds["password"])
+        page.get_by_test_id("login-submit").click()
+        page.wait_for_url(lambda url: "/login" not in url, timeout=LOGIN_TIMEOUT)
+        return _has_session(context)
+    except Exception:
+        return False
+    finally:
+        page.close()
+
+
+def login(browser, base_url: str, role: str) -> pathlib.Path:
+    """Log `role` in with a fresh context and save its storage state"""
+    creds = credentials(role)
+    if not creds["identifier"]:
+        raise RuntimeError(f"TEST_{role.upper()}_IDENTIFIER is not set")
+
+    context = browser.new_context()
+    try:
+        lifetime = None
+        if _mint_session(context, base_url, creds):
+            lifetime = MINTED_SESSION_TTL
+        elif not _form_login(context, base_url, creds):
+            raise RuntimeError(f"Login failed for role '{role}'")
+        state = context.storage_state()
+    finally:
+        context.close()
+
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    path = state_path(role)
+    path.write_text(json.dumps(state, indent=2))
+    _meta_path(role).write_text(
+        json.dumps(
+            {
+                "role": role,
+                "host": urlsplit(base_url).hostname,
+                "created": time.time(),
+                "expires": _state_expiry(state, lifetime),
+            },
+            indent=2,
+        )
+    )
+    return path
+
+
+def ensure_storage_state(base_url: str, role: Optional[str]) -> Optional[str]:
+    """Path to a valid storage state for `role`, logging in only if needed.
+
+    Returns None for anonymous sweeps (no role). The path is a plain
+    string so it can be handed to worker processes.
+    """
+    if not role:
+        return None
+
+    cached = cached_state(role, base_url)
+    if cached is not None:
+        print(f"🔑 Reusing saved session for role '{role}'")
+        return str(cached)
+
+    from playwright.sync_api import sync_playwright
+
+    print(f"🔐 Logging in as '{role}'")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(
+            headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
+        )
+        try:
+            return str(login(browser, base_url, role))
+        finally:
+            browser.close()
+
+
+def cookie_header(state_file: Optional[str], base_url: str) -> Optional[str]:
+    """``Cookie`` header value for plain HTTP clients from a storage state"""
+    if not state_file:
+        return None
+    host = urlsplit(base_url).hostname or ""
+    cookies = json.loads(pathlib.Path(state_file).read_text()).get("cookies", [])
+    pairs = [
+        f"{c['name']}={c['value']}"
+        for c in cookies
+        if host == c.get("domain", "").lstrip(".")
+        or host.endswith(c.get("domain", "") or host)
+    ]
+    return "; ".join(pairs) or None
@@ -0,0 +1,167 @@
+"""
+Route-pattern budget resolution
+
+Budgets can be keyed by exact path (``pages``) or by ordered route patterns
+(``routes``), globally and per device profile::
+
+    {
+      "global": {...},
+      "pages": {"/": {...}},
+      "routes": [
+        {"pattern": "/work-orders/[id]", "budgets": {...}},
+        {"pattern": "/reports/**", "priority": 10, "budgets": {...},
+         "profiles": {"mobile-4g": {"largest_contentful_paint_ms": 4000}}},
+        {"regex": "^/fm/properties/\\\\d+$", "budgets": {...}}
+      ],
+      "profiles": {"mobile-4g": {"global": {...}, "pages": {...}, "routes": [...]}}
+    }
+
+Glob patterns: ``*`` matches within one segment, ``**`` across segments,
+``?`` one character, and ``[id]``, ``[...slug]`` or ``:id`` a dynamic
+segment. Higher ``priority`` wins, ties go to declaration order. A
+profile's scopes are overrides: the thresholds resolved without the
+profile come first, then the profile's ``global`` and its matching page or
+route are merged over them, so a profile only restates what it changes. All
+patterns of a scope are compiled into one alternation so a lookup is a
+single regex match, and results are memoized per (path, profile).
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Next.js-style dynamic segments: [id], [...slug], [[...slug]]
+DYNAMIC_SEGMENT = re.compile(r"\[\[?(\.\.\.)?[^\]/]+\]\]?")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a route glob into an (unanchored) regex"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("(?:/.*)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            match = DYNAMIC_SEGMENT.match(pattern, i)
+            if match is None:
+                out.append(re.escape(pattern[i]))
+                i += 1
+                continue
+            out.append(".+" if match.group(1) else "[^/]+")
+            i = match.end()
+        elif pattern[i] == ":" and (i == 0 or pattern[i - 1] == "/"):
+            end = pattern.find("/", i)
+            end = len(pattern) if end == -1 else end
+            out.append("[^/]+")
+            i = end
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def normalize_path(path: str) -> str:
+    """Strip origin, query and trailing slash from a sampled URL"""
+    path = urlsplit(path).path or "/"
+    return path.rstrip("/") or "/"
+
+
+def _strip_anchors(regex: str) -> str:
+    """Drop one leading ``^`` and one trailing unescaped ``$`` (lookups use
+    fullmatch, and anchors inside the alternation would break it)"""
+    if regex.startswith("^"):
+        regex = regex[1:]
+    if regex.endswith("$"):
+        backslashes = len(regex[:-1]) - len(regex[:-1].rstrip("\\"))
+        if backslashes % 2 == 0:
+            regex = regex[:-1]
+    return regex
+
+
+def _merge(base: Dict, override: Optional[Dict]) -> Dict:
+    return {**base, **override} if override else base
+
+
+class _ScopeMatcher:
+    """Exact pages plus ordered route patterns for one budget scope"""
+
+    def __init__(self, scope: Dict, profile: Optional[str] = None):
+        self.pages = {normalize_path(p): t for p, t in scope.get("pages", {}).items()}
+        self.default = scope.get("global")
+
+        entries = sorted(
+            enumerate(scope.get("routes", [])),
+            key=lambda item: (-item[1].get("priority", 0), item[0]),
+        )
+        self.thresholds: List[Dict] = []
+        alternatives = []
+        for index, (_, entry) in enumerate(entries):
+            if "regex" in entry:
+                body = _strip_anchors(entry["regex"])
+            else:
+                body = glob_to_regex(normalize_path(entry["pattern"]))
+            # Empty marker group closes last, so `lastgroup` names the winner
+            alternatives.append(f"(?:{body})(?P<_budget_route_{index}>)")
+            overrides = entry.get("profiles", {}).get(profile) if profile else None
+            self.thresholds.append(_merge(entry.get("budgets", {}), overrides))
+
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def match(self, path: str) -> Optional[Dict]:
+        if path in self.pages:
+            return self.pages[path]
+        if self.regex is not None:
+            found = self.regex.fullmatch(path)
+            if found is not None:
+                return self.thresholds[int(found.lastgroup.rsplit("_", 1)[1])]
+        return None
+
+
+class BudgetMatcher:
+    """Resolve budget thresholds for sampled paths and device profiles
+
+    Base thresholds come from pages, then routes, then global; a profile's
+    global and then its matching page or route are merged over them.
+    """
+
+    def __init__(self, budgets: Dict):
+        self.budgets = budgets
+        self.global_thresholds = budgets.get("global", {})
+        self._base: Dict[Optional[str], _ScopeMatcher] = {}
+        self._profiles = {
+            name: _ScopeMatcher(scope, name)
+            for name, scope in budgets.get("profiles", {}).items()
+        }
+        self._memo: Dict[Tuple[str, Optional[str]], Dict] = {}
+
+    def _base_scope(self, profile: Optional[str]) -> _ScopeMatcher:
+        # Route entries may carry per-profile overrides, so compile per profile
+        if profile not in self._base:
+            self._base[profile] = _ScopeMatcher(self.budgets, profile)
+        return self._base[profile]
+
+    def thresholds(self, path: str, profile: Optional[str] = None) -> Dict:
+        key = (normalize_path(path), profile)
+        if key in self._memo:
+            return self._memo[key]
+
+        path = key[0]
+        result = self._base_scope(profile).match(path)
+        if result is None:
+            result = self.global_thresholds
+        scoped = self._profiles.get(profile) if profile else None
+        if scoped is not None:
+            result = _merge(_merge(result, scoped.default), scoped.match(path))
+
+        self._memo[key] = result
+        return result
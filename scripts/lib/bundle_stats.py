@@ -0,0 +1,184 @@
+"""
+First-load JavaScript per route from a Next.js production build
+
+Reads the manifests ``next build`` always writes into ``.next``:
+``build-manifest.json`` (shared root chunks, Pages Router entries) and
+``app-build-manifest.json`` (App Router entries, including their layout
+chunks). A route's first-load JS is the union of the shared chunks and
+its own entry chunks; sizes are measured on disk, raw and gzipped (the
+figure Next prints as "First Load JS").
+
+Each analysed build is appended to a JSONL history so later builds can
+be compared against the previous one.
+"""
+
+import gzip
+import json
+import pathlib
+import time
+from typing import Dict, List, Optional
+
+from scripts.lib.app_server import NEXT_DIST
+from scripts.lib.route_manifest import resolve_page
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+HISTORY_FILE = ARTIFACTS / "bundle-history.jsonl"
+
+# Pages Router entries that are not routes of their own
+PAGES_INTERNAL = {"/_app", "/_document", "/_error"}
+
+
+def _read_json(path: pathlib.Path) -> Dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _js(files: List[str]) -> List[str]:
+    return [f for f in files if f.endswith(".js")]
+
+
+def shared_chunks(build_manifest: Dict) -> List[str]:
+    """Chunks every route loads (App Router root + Pages Router _app)"""
+    files = build_manifest.get("rootMainFiles", []) + build_manifest.get(
+        "pages", {}
+    ).get("/_app", [])
+    return list(dict.fromkeys(_js(files)))
+
+
+def route_chunks(next_dir: pathlib.Path = NEXT_DIST) -> Dict[str, List[str]]:
+    """Entry chunks per URL route, App Router and Pages Router combined"""
+    routes: Dict[str, List[str]] = {}
+
+    app_manifest = _read_json(next_dir / "app-build-manifest.json")
+    for entry, files in app_manifest.get("pages", {}).items():
+        # e.g. "/(app)/marketplace/page" -> "/marketplace"
+        if not entry.endswith("/page") or "/_" in entry:
+            continue
+        route = resolve_page(entry.lstrip("/") + ".js")["route"]
+        routes.setdefault(route, list(dict.fromkeys(_js(files))))
+
+    build_manifest = _read_json(next_dir / "build-manifest.json")
+    for route, files in build_manifest.get("pages", {}).items():
+        if route not in PAGES_INTERNAL:
+            routes.setdefault(route, list(dict.fromkeys(_js(files))))
+
+    return dict(sorted(routes.items()))
+
+
+class _Sizes:
+    """Raw and gzipped sizes per chunk, measured once per build"""
+
+    def __init__(self, next_dir: pathlib.Path):
+        self.next_dir = next_dir
+        self.cache: Dict[str, Dict[str, int]] = {}
+
+    def __call__(self, chunk: str) -> Dict[str, int]:
+        if chunk not in self.cache:
+            try:
+                data = (self.next_dir / chunk).read_bytes()
+            except OSError:
+                data = b""
+            self.cache[chunk] = {
+                "bytes": len(data),
+                "gzip": len(gzip.compress(data)),
+            }
+        return self.cache[chunk]
+
+    def total(self, chunks: List[str]) -> Dict[str, int]:
+        sizes = [self(c) for c in chunks]
+        return {
+            "bytes": sum(s["bytes"] for s in sizes),
+            "gzip": sum(s["gzip"] for s in sizes),
+        }
+
+
+def analyze_build(next_dir: pathlib.Path = NEXT_DIST) -> Dict:
+    """First-load JS per route for the build in `next_dir`"""
+    build_id_file = next_dir / "BUILD_ID"
+    if not build_id_file.exists():
+        raise FileNotFoundError(f"No Next.js build found in {next_dir}")
+
+    sizes = _Sizes(next_dir)
+    shared = shared_chunks(_read_json(next_dir / "build-manifest.json"))
+    shared_set = set(shared)
+
+    routes = {}
+    for route, chunks in route_chunks(next_dir).items():
+        own = [c for c in chunks if c not in shared_set]
+        first_load = sizes.total(shared + own)
+        route_only = sizes.total(own)
+        routes[route] = {
+            "first_load_bytes": first_load["bytes"],
+            "first_load_gzip": first_load["gzip"],
+            "route_bytes": route_only["bytes"],
+            "route_gzip": route_only["gzip"],
+            "chunks": own,
+        }
+
+    shared_total = sizes.total(shared)
+    return {
+        "build_id": build_id_file.read_text().strip(),
+        "timestamp": int(time.time() * 1000),
+        "shared": {"chunks": shared, **shared_total},
+        "routes": routes,
+        "chunks": sizes.cache,
+    }
+
+
+def load_history(history_file: pathlib.Path = HISTORY_FILE) -> List[Dict]:
+    if not history_file.exists():
+        return []
+    history = []
+    with open(history_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    return history
+
+
+def previous_build(
+    build_id: str, history_file: pathlib.Path = HISTORY_FILE
+) -> Optional[Dict]:
+    """Most recent recorded build other than `build_id`"""
+    others = [b for b in load_history(history_file) if b.get("build_id") != build_id]
+    return others[-1] if others else None
+
+
+def record_build(analysis: Dict, history_file: pathlib.Path = HISTORY_FILE) -> bool:
+    """Append `analysis` to the history unless that build is already recorded"""
+    recorded = {b.get("build_id") for b in load_history(history_file)}
+    if analysis["build_id"] in recorded:
+        return False
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(analysis) + "\n")
+    return True
+
+
+def chunk_growth(current: Dict, previous: Dict, top_n: int = 10) -> List[Dict]:
+    """Largest chunks not present in `previous`, or grown since it
+
+    Chunk file names carry content hashes, so an edited chunk usually shows
+    up as a new file; this points a route-level regression at its cause.
+    """
+    before = previous.get("chunks", {})
+    grown = []
+    for chunk, size in current.get("chunks", {}).items():
+        delta = size["gzip"] - before.get(chunk, {}).get("gzip", 0)
+        if delta > 0:
+            grown.append(
+                {
+                    "chunk": chunk,
+                    "gzip": size["gzip"],
+                    "growth": delta,
+                    "new": chunk not in before,
+                }
+            )
+    grown.sort(key=lambda c: c["growth"], reverse=True)
+    return grown[:top_n]
@@ -0,0 +1,239 @@
+"""
+Chromium page metrics collector shared by the perf scripts
+
+Installs PerformanceObservers for paint, layout-shift, long tasks and event
+timing before any page script runs, and opens a CDP session for
+main-thread counters. From those it derives Lighthouse-style metrics:
+
+- TTI: end of the last long task before a quiet window after FCP
+- TBT: sum of (duration - 50ms) of long tasks between FCP and TTI
+- INP: worst event-timing interaction latency from scripted interactions
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from scripts.lib.device_profiles import apply_throttling
+
+BLOCKING_THRESHOLD_MS = 50
+TTI_QUIET_MS = int(os.environ.get("FXZ_TTI_QUIET_MS", "5000"))
+SETTLE_TIMEOUT_MS = int(os.environ.get("FXZ_SETTLE_TIMEOUT_MS", "15000"))
+
+OBSERVER_SCRIPT = """
+(() => {
+    const m = window.__fxzMetrics = {
+        cls: 0,
+        lcp: undefined,
+        fid: undefined,
+        longTasks: [],
+        interactions: {},
+        navigationStart: performance.timeOrigin
+    };
+    if (!('PerformanceObserver' in window)) return;
+
+    const observe = (type, cb, opts) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(cb))
+                .observe(Object.assign({ type, buffered: true }, opts || {}));
+        } catch (e) {
+            console.warn('Performance observer ' + type + ' failed:', e);
+        }
+    };
+
+    observe('layout-shift', (e) => { if (!e.hadRecentInput) m.cls += e.value; });
+    observe('largest-contentful-paint', (e) => { m.lcp = e.startTime; });
+    observe('first-input', (e) => { m.fid = e.processingStart - e.startTime; });
+    observe('longtask', (e) => {
+        m.longTasks.push({ start: e.startTime, duration: e.duration });
+    });
+    observe('event', (e) => {
+        if (!e.interactionId) return;
+        const prev = m.interactions[e.interactionId] || 0;
+        m.interactions[e.interactionId] = Math.max(prev, e.duration);
+    }, { durationThreshold: 16 });
+})();
+"""
+
+SNAPSHOT_SCRIPT = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0] || {};
+    const paints = performance.getEntriesByType('paint') || [];
+    const m = window.__fxzMetrics || {};
+    return {
+        pathname: window.location.pathname,
+        timestamp: Date.now(),
+        now: performance.now(),
+        fcp: (paints.find(p => p.name === 'first-contentful-paint') || {}).startTime || 0,
+        lcp: m.lcp || 0,
+        cls: m.cls || 0,
+        fid: m.fid || 0,
+        ttfb: nav.responseStart || 0,
+        domContentLoaded: nav.domContentLoadedEventEnd || 0,
+        loadComplete: nav.loadEventEnd || 0,
+        longTasks: m.longTasks || []
+    };
+}
+"""
+
+LAST_LONG_TASK_END_SCRIPT = """
+() => {
+    const tasks = (window.__fxzMetrics || {}).longTasks || [];
+    const last = tasks[tasks.length - 1];
+    return { now: performance.now(), lastEnd: last ? last.start + last.duration : 0 };
+}
+"""
+
+INTERACTIONS_SCRIPT = """
+() => Object.values((window.__fxzMetrics || {}).interactions || {})
+"""
+
+# A viewport point whose hit target has no interactive ancestor, so clicking
+# it cannot navigate or open anything; null when every probe hits a control
+NEUTRAL_POINT_SCRIPT = """
+() => {
+    const interactive = 'a, button, input, select, textarea, label, summary, '
+        + 'iframe, video, audio, [contenteditable], [onclick], [tabindex], '
+        + '[role=button], [role=link], [role=menuitem], [role=tab], '
+        + '[role=checkbox], [role=switch], [role=option]';
+    const w = window.innerWidth, h = window.innerHeight;
+    for (const fy of [0.5, 0.3, 0.7, 0.15, 0.85]) {
+        for (const fx of [0.5, 0.25, 0.75, 0.1, 0.9]) {
+            const x = Math.round(w * fx), y = Math.round(h * fy);
+            const el = document.elementFromPoint(x, y);
+            if (el && !el.closest(interactive)) return { x, y };
+        }
+    }
+    return null;
+}
+"""
+
+# CDP Performance.getMetrics counters reported as main-thread totals (seconds)
+MAIN_THREAD_COUNTERS = {
+    "TaskDuration": "taskMs",
+    "ScriptDuration": "scriptMs",
+    "LayoutDuration": "layoutMs",
+    "RecalcStyleDuration": "recalcStyleMs",
+}
+
+
+def install(page, profile: str = None):
+    """Register observers on `page`, apply the device profile's throttling
+    and return the CDP session used for it"""
+    page.add_init_script(OBSERVER_SCRIPT)
+    session = page.context.new_cdp_session(page)
+    session.send("Performance.enable")
+    apply_throttling(session, profile)
+    return session
+
+
+def wait_for_quiet(
+    page, quiet_ms: int = TTI_QUIET_MS, timeout_ms: int = SETTLE_TIMEOUT_MS
+) -> None:
+    """Wait until no long task has ended for `quiet_ms` (or `timeout_ms`)"""
+    waited = 0
+    while waited < timeout_ms:
+        state = page.evaluate(LAST_LONG_TASK_END_SCRIPT)
+        idle_for = state["now"] - state["lastEnd"]
+        if idle_for >= quiet_ms:
+            return
+        step = min(max(quiet_ms - idle_for, 100), timeout_ms - waited)
+        page.wait_for_timeout(step)
+        waited += step
+
+
+def compute_tti(
+    fcp: float, dom_content_loaded: float, long_tasks: List[Dict], quiet_ms: int
+) -> float:
+    """End of the last long task before the first quiet window after FCP"""
+    tti = max(fcp, dom_content_loaded)
+    for task in sorted(long_tasks, key=lambda t: t["start"]):
+        end = task["start"] + task["duration"]
+        if end <= fcp:
+            continue
+        if task["start"] - tti >= quiet_ms:
+            break
+        tti = max(tti, end)
+    return tti
+
+
+def compute_tbt(fcp: float, tti: float, long_tasks: List[Dict]) -> float:
+    """Blocking time of long tasks clipped to the [FCP, TTI] window"""
+    total = 0.0
+    for task in long_tasks:
+        start = max(task["start"], fcp)
+        end = min(task["start"] + task["duration"], tti)
+        if end - start > BLOCKING_THRESHOLD_MS:
+            total += end - start - BLOCKING_THRESHOLD_MS
+    return total
+
+
+def run_interactions(page) -> None:
+    """Scripted, navigation-free interactions used to estimate INP"""
+    for _ in range(3):
+        page.keyboard.press("Tab")
+    # A real (trusted) click is needed for event timing, so aim it at a
+    # non-interactive spot rather than whatever sits in a corner
+    point = page.evaluate(NEUTRAL_POINT_SCRIPT)
+    if point:
+        page.mouse.click(point["x"], point["y"])
+    else:
+        page.evaluate("() => document.body.dispatchEvent(new MouseEvent('click'))")
+    page.keyboard.press("Escape")
+    page.wait_for_timeout(300)
+
+
+def main_thread_totals(session) -> Dict[str, float]:
+    """Main-thread time split from CDP Performance.getMetrics"""
+    counters = {
+        m["name"]: m["value"]
+        for m in session.send("Performance.getMetrics").get("metrics", [])
+    }
+    return {
+        key: round(counters[name] * 1000)
+        for name, key in MAIN_THREAD_COUNTERS.items()
+        if name in counters
+    }
+
+
+def collect(page, session, interact: bool = True) -> Dict:
+    """Collect metrics from a page loaded after `install()`"""
+    wait_for_quiet(page)
+    snap = page.evaluate(SNAPSHOT_SCRIPT)
+
+    fcp = snap["fcp"]
+    long_tasks = snap["longTasks"]
+    tti = compute_tti(fcp, snap["domContentLoaded"], long_tasks, TTI_QUIET_MS)
+    tbt = compute_tbt(fcp, tti, long_tasks)
+    main_thread = main_thread_totals(session)
+
+    inp: Optional[float] = None
+    if interact:
+        try:
+            run_interactions(page)
+            latencies = page.evaluate(INTERACTIONS_SCRIPT)
+            inp = max(latencies) if latencies else 0
+        except Exception as e:
+            print(f"Warning: Scripted interactions failed: {e}")
+
+    lcp = snap["lcp"]
+    return {
+        "pathname": snap["pathname"],
+        "timestamp": snap["timestamp"],
+        "ttfb": round(snap["ttfb"]),
+        "fcp": round(fcp),
+        "lcp": round(lcp),
+        "cls": round(snap["cls"], 4),
+        "fid": round(snap["fid"]),
+        "tti": round(tti),
+        "tbt": round(tbt),
+        "inp": round(inp) if inp is not None else None,
+        # Speed Index needs filmstrip analysis; keep the FCP/LCP midpoint estimate
+        "speedIndex": round(fcp + (lcp - fcp) * 0.5),
+        "domContentLoaded": round(snap["domContentLoaded"]),
+        "loadComplete": round(snap["loadComplete"]),
+        "longTasks": [
+            {"start": round(t["start"]), "duration": round(t["duration"])}
+            for t in long_tasks
+        ],
+        "mainThread": main_thread,
+    }
@@ -0,0 +1,129 @@
+"""
+DDSketch: a mergeable streaming quantile sketch with relative-error bounds
+
+Values are counted in logarithmic buckets of ratio gamma = (1 + a) / (1 - a),
+so any quantile is returned within relative accuracy ``a`` of the true
+value while memory depends only on the value range, not on how many
+values were added. Bucket count is additionally capped at ``max_bins`` by
+collapsing the lowest buckets, which only degrades the lowest quantiles.
+Sketches with the same accuracy merge exactly, so per-file or per-day
+sketches can be combined later. Stdlib only (Masson et al., VLDB 2019).
+"""
+
+import math
+from typing import Dict, Optional
+
+DEFAULT_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+# Values at or below this (CLS of 0, for instance) go to the zero bucket
+MIN_INDEXABLE = 1e-9
+
+
+class DDSketch:
+    """Streaming quantiles for non-negative values"""
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_ACCURACY,
+        max_bins: int = DEFAULT_MAX_BINS,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(k-1), gamma^k]
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        while len(keys) > self.max_bins:
+            lowest = keys.pop(0)
+            self.bins[keys[0]] += self.bins.pop(lowest)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value is None or value < 0 or math.isnan(value):
+            return
+        if value <= MIN_INDEXABLE:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += weight
+        self.sum += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """Add `other`'s counts into this sketch (same accuracy required)"""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different accuracy")
+        if not other.count:
+            return self
+
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile `q` in [0, 1], or None when empty"""
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], data.get("max_bins", DEFAULT_MAX_BINS))
+        sketch.bins = {int(k): v for k, v in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
@@ -0,0 +1,97 @@
+"""
+Named device profiles (viewport, CPU and network throttling) for perf runs
+
+Profiles are applied in two places: Playwright context options (viewport,
+touch, user agent) and a CDP session on the page (CPU and network
+throttling). Samples are tagged with the profile name so trends and
+budgets can differ per profile.
+"""
+
+import os
+from typing import Dict
+
+DEFAULT_PROFILE = os.environ.get("FXZ_PERF_PROFILE", "desktop-fast")
+
+MOBILE_UA = (
+    "Mozilla/5.0 (Linux; Android 11; moto g power (2022)) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/119.0.0.0 Mobile Safari/537.36"
+)
+
+
+def _kbps(kilobits: float) -> float:
+    """Kilobits per second -> bytes per second (CDP throughput unit)"""
+    return kilobits * 1024 / 8
+
+
+PROFILES: Dict[str, Dict] = {
+    "desktop-fast": {
+        "viewport": {"width": 1366, "height": 768},
+        "device_scale_factor": 1,
+        "is_mobile": False,
+        "cpu_slowdown": 1,
+        "network": None,
+    },
+    "mobile-4g": {
+        "viewport": {"width": 412, "height": 823},
+        "device_scale_factor": 1.75,
+        "is_mobile": True,
+        "user_agent": MOBILE_UA,
+        "cpu_slowdown": 4,
+        "network": {"latency": 150, "download": _kbps(1638.4), "upload": _kbps(750)},
+    },
+    "mobile-3g-slow-cpu": {
+        "viewport": {"width": 360, "height": 640},
+        "device_scale_factor": 2,
+        "is_mobile": True,
+        "user_agent": MOBILE_UA,
+        "cpu_slowdown": 6,
+        "network": {"latency": 400, "download": _kbps(400), "upload": _kbps(400)},
+    },
+}
+
+
+def get_profile(name: str = None) -> Dict:
+    """Look up a profile by name, raising ValueError for unknown names"""
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown device profile '{name}'. Available: {', '.join(PROFILES)}"
+        )
+    return {"name": name, **PROFILES[name]}
+
+
+def context_options(name: str = None) -> Dict:
+    """Keyword arguments for browser.new_context() under a profile"""
+    profile = get_profile(name)
+    options = {
+        "viewport": profile["viewport"],
+        "device_scale_factor": profile["device_scale_factor"],
+        "is_mobile": profile["is_mobile"],
+        "has_touch": profile["is_mobile"],
+    }
+    if profile.get("user_agent"):
+        options["user_agent"] = profile["user_agent"]
+    return options
+
+
+def apply_throttling(session, name: str = None) -> None:
+    """Apply a profile's CPU and network throttling through CDP"""
+    profile = get_profile(name)
+
+    if profile["cpu_slowdown"] > 1:
+        session.send(
+            "Emulation.setCPUThrottlingRate", {"rate": profile["cpu_slowdown"]}
+        )
+
+    network = profile["network"]
+    if network:
+        session.send("Network.enable")
+        session.send(
+            "Network.emulateNetworkConditions",
+            {
+                "offline": False,
+                "latency": network["latency"],
+                "downloadThroughput": network["download"],
+                "uploadThroughput": network["upload"],
+            },
+        )
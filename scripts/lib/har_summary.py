@@ -0,0 +1,126 @@
+"""
+HAR reduction into a compact per-route resource breakdown
+
+Summarizes transferred bytes by resource type and origin, lists the
+largest JavaScript chunks, and pairs with the page's Resource Timing
+``renderBlockingStatus`` to list render-blocking resources.
+"""
+
+import json
+import pathlib
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+TOP_N = 10
+
+# Fallback mime-type -> resource type mapping when `_resourceType` is absent
+MIME_TYPES = [
+    ("javascript", "script"),
+    ("ecmascript", "script"),
+    ("css", "stylesheet"),
+    ("html", "document"),
+    ("json", "fetch"),
+    ("image/", "image"),
+    ("font", "font"),
+    ("woff", "font"),
+]
+
+RENDER_BLOCKING_SCRIPT = """
+() => performance.getEntriesByType('resource')
+    .filter(e => e.renderBlockingStatus === 'blocking')
+    .map(e => ({
+        url: e.name,
+        type: e.initiatorType,
+        bytes: e.transferSize,
+        start: Math.round(e.startTime),
+        duration: Math.round(e.duration)
+    }))
+"""
+
+
+def har_path_for(directory: pathlib.Path, path: str, *tags) -> pathlib.Path:
+    """Stable HAR filename for a route plus tags (profile, cache, sample...)"""
+    slug = re.sub(r"[^\w\-]+", "_", path.strip("/")) or "root"
+    name = "-".join([slug, *(str(t) for t in tags if t is not None)])
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{name}.har"
+
+
+def _resource_type(entry: Dict) -> str:
+    if entry.get("_resourceType"):
+        return entry["_resourceType"]
+    mime = (entry.get("response", {}).get("content", {}).get("mimeType") or "").lower()
+    for needle, kind in MIME_TYPES:
+        if needle in mime:
+            return kind
+    return "other"
+
+
+def _transfer_bytes(entry: Dict) -> int:
+    response = entry.get("response", {})
+    size = response.get("_transferSize")
+    if size is None or size < 0:
+        body = max(response.get("bodySize", 0) or 0, 0)
+        headers = max(response.get("headersSize", 0) or 0, 0)
+        size = body + headers
+    return int(size)
+
+
+def page_refs(har: Dict) -> List[str]:
+    """Page ids in navigation order"""
+    return [page["id"] for page in har.get("log", {}).get("pages", [])]
+
+
+def summarize_har(
+    har: Dict, pageref: Optional[str] = None, top_n: int = TOP_N
+) -> Dict:
+    """Reduce a HAR (optionally one page of it) to a byte breakdown"""
+    entries = har.get("log", {}).get("entries", [])
+    if pageref is not None:
+        entries = [e for e in entries if e.get("pageref") == pageref]
+
+    by_type: Dict[str, Dict] = {}
+    by_origin: Dict[str, Dict] = {}
+    scripts = []
+    total = 0
+
+    for entry in entries:
+        url = entry.get("request", {}).get("url", "")
+        if url.startswith("data:"):
+            continue
+
+        size = _transfer_bytes(entry)
+        kind = _resource_type(entry)
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        total += size
+
+        for bucket, key in ((by_type, kind), (by_origin, origin)):
+            stats = bucket.setdefault(key, {"requests": 0, "bytes": 0})
+            stats["requests"] += 1
+            stats["bytes"] += size
+
+        if kind == "script":
+            scripts.append({"url": url, "bytes": size})
+
+    scripts.sort(key=lambda s: s["bytes"], reverse=True)
+    return {
+        "requests": sum(s["requests"] for s in by_type.values()),
+        "bytes": total,
+        "by_type": dict(sorted(by_type.items(), key=lambda kv: -kv[1]["bytes"])),
+        "by_origin": dict(sorted(by_origin.items(), key=lambda kv: -kv[1]["bytes"])),
+        "largest_js": scripts[:top_n],
+    }
+
+
+def summarize_har_file(
+    har_file: pathlib.Path, page_index: Optional[int] = None, top_n: int = TOP_N
+) -> Dict:
+    """Summarize a HAR file, optionally only its `page_index`-th page"""
+    har = json.loads(pathlib.Path(har_file).read_text())
+    pageref = None
+    if page_index is not None:
+        refs = page_refs(har)
+        pageref = refs[page_index] if page_index < len(refs) else None
+    return summarize_har(har, pageref=pageref, top_n=top_n)
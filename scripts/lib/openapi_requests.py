@@ -0,0 +1,263 @@
+"""
+Representative requests for every operation in openapi.yaml
+
+Each operation (``"GET /aqar/listings/{id}"``) becomes one concrete
+request: path and required query parameters and the JSON request body
+are taken from the spec's examples and defaults, falling back to values
+synthesized from the schema (first enum value, format-shaped strings,
+minimum numbers, required object properties).
+
+Endpoints that need real fixtures (an existing listing id, a valid
+payload) get them from a stub-data file, either per parameter name or
+per operation::
+
+    {"params": {"id": "665f1c..."},
+     "operations": {"GET /hr/employees/{id}": {"path": {"id": "..."}},
+                    "POST /billing/quote": {"body": {...}},
+                    "GET /admin/export": {"skip": true}}}
+
+Path parameters filled from neither the spec nor the stubs are marked
+``synthetic``; such requests usually 404, so callers may skip them.
+PyYAML is optional: without it only a JSON spec can be read.
+"""
+
+import copy
+import json
+import os
+import pathlib
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode, urlsplit
+
+try:
+    import yaml
+except ImportError:  # optional dependency
+    yaml = None
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+SPEC_FILE = ROOT / "openapi.yaml"
+STUBS_FILE = pathlib.Path(os.environ.get("FXZ_API_STUBS", "api_stubs.json"))
+
+METHODS = ("get", "head", "post", "put", "patch", "delete")
+SAFE_METHODS = ("get", "head")
+MAX_DEPTH = 4
+
+# Stand-ins for string formats (ids look like Mongo ObjectIds)
+FORMAT_SAMPLES = {
+    "date-time": "2025-01-01T00:00:00Z",
+    "date": "2025-01-01",
+    "email": "perf@example.com",
+    "uri": "https://example.com",
+    "url": "https://example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000",
+    "objectid": "000000000000000000000000",
+    "password": "PerfTest#2025",
+    "phone": "+966500000000",
+}
+
+
+def load_spec(path: pathlib.Path = SPEC_FILE) -> Dict:
+    """Parse an OpenAPI document (YAML needs PyYAML, JSON does not)"""
+    text = pathlib.Path(path).read_text(encoding="utf-8")
+    if pathlib.Path(path).suffix == ".json":
+        return json.loads(text)
+    if yaml is None:
+        raise RuntimeError(f"PyYAML is required to read {path} (pip install pyyaml)")
+    return yaml.safe_load(text)
+
+
+def load_stubs(path: pathlib.Path = STUBS_FILE) -> Dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError as e:
+        print(f"Error reading {path}: {e}")
+        return {}
+
+
+def resolve(spec: Dict, node):
+    """Follow local ``$ref`` pointers until a concrete node is reached"""
+    seen = set()
+    while isinstance(node, dict) and "$ref" in node:
+        ref = node["$ref"]
+        if ref in seen or not ref.startswith("#/"):
+            return {}
+        seen.add(ref)
+        node = spec
+        for part in ref[2:].split("/"):
+            node = node.get(part.replace("~1", "/").replace("~0", "~"), {})
+    return node
+
+
+def _string_sample(schema: Dict, name: str) -> str:
+    fmt = str(schema.get("format", "")).lower()
+    if fmt in FORMAT_SAMPLES:
+        return FORMAT_SAMPLES[fmt]
+    lowered = name.lower()
+    if lowered == "id" or lowered.endswith("id"):
+        return FORMAT_SAMPLES["objectid"]
+    if "email" in lowered:
+        return FORMAT_SAMPLES["email"]
+    return "perf" * max(1, (schema.get("minLength") or 0) // 4 + 1)
+
+
+def sample_value(spec: Dict, schema, name: str = "", depth: int = 0):
+    """Example-first representative value for a schema"""
+    schema = resolve(spec, schema) or {}
+    for key in ("example", "default"):
+        if key in schema:
+            return copy.deepcopy(schema[key])
+    if isinstance(schema.get("examples"), list) and schema["examples"]:
+        return copy.deepcopy(schema["examples"][0])
+    if schema.get("enum"):
+        return schema["enum"][0]
+
+    if "allOf" in schema:
+        merged: Dict = {}
+        for part in schema["allOf"]:
+            value = sample_value(spec, part, name, depth)
+            if isinstance(value, dict):
+                merged.update(value)
+        return merged
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key):
+            return sample_value(spec, schema[key][0], name, depth)
+
+    kind = schema.get("type")
+    if kind is None:
+        kind = "object" if "properties" in schema else "string"
+    if kind == "string":
+        return _string_sample(schema, name)
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        return schema.get("minimum", 1.0)
+    if kind == "boolean":
+        return False
+    if kind == "array":
+        if depth >= MAX_DEPTH:
+            return []
+        count = max(1, schema.get("minItems") or 0)
+        return [
+            sample_value(spec, schema.get("items", {}), name, depth + 1)
+            for _ in range(count)
+        ]
+
+    # object: required properties only, or all of them when none are required
+    if depth >= MAX_DEPTH:
+        return {}
+    properties = schema.get("properties", {})
+    keys = schema.get("required") or list(properties)
+    return {
+        key: sample_value(spec, properties.get(key, {}), key, depth + 1)
+        for key in keys
+    }
+
+
+def _parameter_value(spec: Dict, param: Dict):
+    if "example" in param:
+        return param["example"], False
+    examples = param.get("examples") or {}
+    for example in examples.values():
+        example = resolve(spec, example)
+        if "value" in example:
+            return example["value"], False
+    schema = resolve(spec, param.get("schema", {}))
+    explicit = any(k in schema for k in ("example", "default", "enum", "examples"))
+    return sample_value(spec, schema, param["name"]), not explicit
+
+
+def _request_body(spec: Dict, operation: Dict):
+    body = resolve(spec, operation.get("requestBody"))
+    if not body:
+        return None
+    media = body.get("content", {}).get("application/json")
+    if media is None:
+        return None
+    if "example" in media:
+        return copy.deepcopy(media["example"])
+    for example in (media.get("examples") or {}).values():
+        example = resolve(spec, example)
+        if "value" in example:
+            return copy.deepcopy(example["value"])
+    return sample_value(spec, media.get("schema", {}))
+
+
+def base_path(spec: Dict) -> str:
+    """Path prefix of the first server URL (``/api`` for this spec)"""
+    servers = spec.get("servers") or [{}]
+    return urlsplit(servers[0].get("url", "")).path.rstrip("/")
+
+
+def build_operation(
+    spec: Dict, path: str, method: str, operation: Dict, stubs: Dict
+) -> Dict:
+    """Concrete request for one operation, stub data taking precedence"""
+    op_id = f"{method.upper()} {path}"
+    override = stubs.get("operations", {}).get(op_id, {})
+    params = [
+        resolve(spec, p)
+        for p in spec["paths"][path].get("parameters", [])
+        + operation.get("parameters", [])
+    ]
+
+    values = {"path": {}, "query": {}, "header": {}}
+    synthetic = []
+    for param in params:
+        where = param.get("in")
+        if where not in values or (where != "path" and not param.get("required")):
+            continue
+        name = param["name"]
+        stubbed = override.get(where, {}).get(name, stubs.get("params", {}).get(name))
+        if stubbed is not None:
+            values[where][name] = stubbed
+            continue
+        value, generated = _parameter_value(spec, param)
+        values[where][name] = value
+        if generated and where == "path":
+            synthetic.append(name)
+
+    values["query"].update(override.get("query", {}))
+    url = base_path(spec) + path
+    for name, value in values["path"].items():
+        url = url.replace("{" + name + "}", quote(str(value), safe=""))
+    if values["query"]:
+        url += "?" + urlencode(values["query"], doseq=True)
+
+    body = override.get("body", _request_body(spec, operation))
+    return {
+        "id": op_id,
+        "method": method.upper(),
+        "path": path,
+        "url": url,
+        "headers": {**values["header"], **override.get("headers", {})},
+        "body": body,
+        "auth": bool(operation.get("security", spec.get("security"))),
+        "synthetic": synthetic,
+        "skip": bool(override.get("skip")),
+        "summary": operation.get("summary", ""),
+    }
+
+
+def build_operations(
+    spec: Dict,
+    stubs: Optional[Dict] = None,
+    methods=SAFE_METHODS,
+    match: Optional[str] = None,
+) -> List[Dict]:
+    """Requests for every operation whose method is in `methods`, sorted.
+
+    `match` keeps only operations whose id contains the substring.
+    """
+    stubs = stubs or {}
+    operations = []
+    for path, item in spec.get("paths", {}).items():
+        for method, operation in item.items():
+            if method not in METHODS or method not in methods:
+                continue
+            request = build_operation(spec, path, method, operation, stubs)
+            if match and match not in request["id"]:
+                continue
+            operations.append(request)
+    return sorted(operations, key=lambda op: (op["path"], op["method"]))
@@ -0,0 +1,200 @@
+"""
+Small statistics helpers for performance sampling (percentiles, bootstrap
+CIs and rank-based regression tests)
+"""
+
+import itertools
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PERCENTILES = (50, 75, 95)
+BOOTSTRAP_RESAMPLES = 1000
+# Rank tests enumerate the exact null distribution up to this many splits
+EXACT_LIMIT = 20_000
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (same definition as numpy's default)"""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+
+    rank = (pct / 100.0) * (len(ordered) - 1)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    pct: float,
+    confidence: float = 0.95,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+) -> Optional[Tuple[float, float]]:
+    """Bootstrap confidence interval for a percentile of `values`"""
+    if len(values) < 2:
+        return None
+
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = sorted(
+        percentile([values[rng.randrange(n)] for _ in range(n)], pct)
+        for _ in range(resamples)
+    )
+
+    alpha = (1.0 - confidence) / 2.0
+    return (
+        percentile(estimates, alpha * 100.0),
+        percentile(estimates, (1.0 - alpha) * 100.0),
+    )
+
+
+def summarize(
+    values: Iterable[float], percentiles: Iterable[int] = DEFAULT_PERCENTILES
+) -> Dict:
+    """Summarize samples as {"n", "p50", ..., "ci": {"p50": [lo, hi], ...}}"""
+    values: List[float] = [v for v in values if v is not None]
+    summary = {"n": len(values), "ci": {}}
+
+    for pct in percentiles:
+        key = f"p{pct}"
+        value = percentile(values, pct)
+        summary[key] = round(value, 4) if value is not None else None
+
+        ci = bootstrap_ci(values, pct)
+        summary["ci"][key] = [round(ci[0], 4), round(ci[1], 4)] if ci else None
+
+    return summary
+
+
+def _ranks(values: Sequence[float]) -> List[float]:
+    """Average ranks (1-based) with ties sharing the mean rank"""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return ranks
+
+
+def _exact_p_greater(ranks: Sequence[float], n1: int, observed: float) -> float:
+    """P(rank sum of a random size-`n1` subset >= `observed`), by enumeration"""
+    # Average ranks are multiples of 0.5, so compare doubled integer sums
+    doubled = [int(round(r * 2)) for r in ranks]
+    target = int(round(observed * 2))
+    total = hits = 0
+    for subset in itertools.combinations(doubled, n1):
+        total += 1
+        if sum(subset) >= target:
+            hits += 1
+    return hits / total
+
+
+def mann_whitney_greater(
+    current: Sequence[float], baseline: Sequence[float]
+) -> Optional[Dict]:
+    """One-sided Mann-Whitney U test that `current` tends to exceed `baseline`
+
+    The p-value is exact (a permutation over the tie-averaged ranks) when
+    there are at most EXACT_LIMIT ways to split the samples, which covers
+    the small current runs a sweep produces; larger inputs use the normal
+    approximation with tie and continuity corrections.
+    Returns {"u", "z", "p_value", "exact"} or None when either side is empty.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2 or n1 + n2 < 3:
+        return None
+
+    combined = list(current) + list(baseline)
+    ranks = _ranks(combined)
+    rank_sum = sum(ranks[:n1])
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+
+    n = n1 + n2
+    counts: Dict[float, int] = {}
+    for value in combined:
+        counts[value] = counts.get(value, 0) + 1
+    tie_term = sum(t**3 - t for t in counts.values()) / (n * (n - 1))
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return {"u": u, "z": 0.0, "p_value": 1.0, "exact": False}
+
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    if math.comb(n, n1) <= EXACT_LIMIT:
+        p_value = _exact_p_greater(ranks, n1, rank_sum)
+        return {"u": u, "z": z, "p_value": p_value, "exact": True}
+    return {
+        "u": u,
+        "z": z,
+        "p_value": 0.5 * math.erfc(z / math.sqrt(2)),
+        "exact": False,
+    }
+
+
+def cliffs_delta(current: Sequence[float], baseline: Sequence[float]) -> float:
+    """Cliff's delta effect size in [-1, 1]; positive means `current` is larger"""
+    if not current or not baseline:
+        return 0.0
+    greater = sum(1 for c in current for b in baseline if c > b)
+    less = sum(1 for c in current for b in baseline if c < b)
+    return (greater - less) / (len(current) * len(baseline))
+
+
+def bootstrap_median_diff_ci(
+    current: Sequence[float],
+    baseline: Sequence[float],
+    confidence: float = 0.95,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+) -> Optional[Tuple[float, float]]:
+    """Bootstrap CI for median(current) - median(baseline)"""
+    if not current or not baseline:
+        return None
+
+    rng = random.Random(seed)
+    diffs = sorted(
+        percentile([rng.choice(current) for _ in current], 50)
+        - percentile([rng.choice(baseline) for _ in baseline], 50)
+        for _ in range(resamples)
+    )
+
+    alpha = (1.0 - confidence) / 2.0
+    return (
+        percentile(diffs, alpha * 100.0),
+        percentile(diffs, (1.0 - alpha) * 100.0),
+    )
+
+
+def linear_slope(values: Sequence[float]) -> Optional[float]:
+    """Least-squares slope of `values` against their index"""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / n
+    num = sum((i - mean_x) * (y - mean_y) for i, y in enumerate(values))
+    den = sum((i - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+def grows_monotonically(values: Sequence[float], tolerance: float = 0.0) -> bool:
+    """True when every step is non-decreasing (within `tolerance`) and the
+    series ends strictly higher than it starts"""
+    if len(values) < 3:
+        return False
+    steps_ok = all(b >= a - tolerance for a, b in zip(values, values[1:]))
+    return steps_ok and values[-1] > values[0]
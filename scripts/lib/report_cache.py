@@ -0,0 +1,115 @@
+"""
+Input-hash cache for generated reports
+
+A report is identified by a fingerprint of everything it is rendered
+from (see weekly_report.ReportContext.fingerprint). The manifest in
+artifacts/weekly-report-manifest.json maps each fingerprint to the file
+it produced, so a rerun with unchanged inputs reuses the file instead of
+rendering it again. ZIP bundles are keyed by the fingerprints of the
+reports they contain.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import time
+from typing import Dict, Iterable, Optional
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+MANIFEST_FILE = ARTIFACTS / "weekly-report-manifest.json"
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """sha256 of a file's contents, streamed"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(inputs: Dict) -> str:
+    """Stable hash of JSON-serializable report inputs"""
+    payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def bundle_key(fingerprints: Iterable[str], extra: str = "") -> str:
+    return fingerprint({"reports": sorted(fingerprints), "extra": extra})
+
+
+class ReportCache:
+    """Fingerprint -> output file manifest"""
+
+    def __init__(self, manifest_file: pathlib.Path = MANIFEST_FILE):
+        self.manifest_file = manifest_file
+        self.reports: Dict[str, Dict] = {}
+        self.bundles: Dict[str, Dict] = {}
+        try:
+            data = json.loads(manifest_file.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.reports = data.get("reports", {})
+            self.bundles = data.get("bundles", {})
+
+    @staticmethod
+    def _valid(entry: Optional[Dict]) -> Optional[pathlib.Path]:
+        if not entry:
+            return None
+        path = pathlib.Path(entry["file"])
+        try:
+            if path.stat().st_size == entry["bytes"]:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def lookup(self, key: str) -> Optional[pathlib.Path]:
+        """Output file recorded for `key`, if it still exists unchanged"""
+        return self._valid(self.reports.get(key))
+
+    def store(self, key: str, tenant: str, path: pathlib.Path) -> None:
+        # A tenant's file is overwritten in place, so older entries are stale
+        for old in [k for k, e in self.reports.items() if e["tenant"] == tenant]:
+            del self.reports[old]
+        self.reports[key] = {
+            "tenant": tenant,
+            "file": str(path),
+            "bytes": path.stat().st_size,
+            "generated": int(time.time() * 1000),
+        }
+
+    def lookup_bundle(self, key: str) -> Optional[pathlib.Path]:
+        return self._valid(self.bundles.get(key))
+
+    def store_bundle(self, key: str, path: pathlib.Path) -> None:
+        self.bundles = {
+            k: e for k, e in self.bundles.items() if self._valid(e) is not None
+        }
+        self.bundles[key] = {
+            "file": str(path),
+            "bytes": path.stat().st_size,
+            "generated": int(time.time() * 1000),
+        }
+
+    def save(self) -> None:
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "reports": self.reports,
+                    "bundles": self.bundles,
+                },
+                indent=2,
+            )
+        )
+        os.replace(tmp, self.manifest_file)
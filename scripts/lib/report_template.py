@@ -0,0 +1,489 @@
+"""
+Compiled HTML templates for the weekly report
+
+The page and its repeated fragments are ``string.Template`` objects
+compiled once at import (so once per worker process) and filled with
+pre-escaped values; repeated fragments are collected in lists and joined
+instead of concatenated. Chart data is embedded as compact JSON in a
+``<script type="application/json">`` block read by one static chart
+script.
+
+The charting library is pinned. By default reports load it from the CDN;
+in ``bundle`` mode they reference ``assets/<file>`` instead. That file is
+installed next to the reports in artifacts and carried once in the ZIP
+bundle, so reports work offline; copies that travel alone (email
+attachments) are rewritten to the CDN with ``with_cdn_assets``.
+``TEMPLATE_VERSION`` changes whenever any template source does.
+"""
+
+import hashlib
+import html
+import json
+import os
+import pathlib
+import shutil
+import urllib.request
+from string import Template
+from typing import Dict, List
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+VENDOR_DIR = ARTIFACTS / "vendor"
+
+PLOTLY_VERSION = "2.35.2"
+PLOTLY_FILE = f"plotly-{PLOTLY_VERSION}.min.js"
+PLOTLY_CDN = f"https://cdn.plot.ly/{PLOTLY_FILE}"
+# A local copy (e.g. from node_modules) avoids downloading the bundle
+PLOTLY_LOCAL = os.environ.get("FXZ_PLOTLY_JS")
+ASSET_DIR = "assets"
+ASSET_MODES = ("cdn", "bundle")
+
+STYLE = """\
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 20px;
+            background-color: #f8f9fa;
+            color: #333;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            overflow: hidden;
+        }
+        .header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            text-align: center;
+        }
+        .header h1 {
+            margin: 0;
+            font-size: 2.5em;
+            font-weight: 300;
+        }
+        .header p {
+            margin: 10px 0 0 0;
+            opacity: 0.9;
+            font-size: 1.1em;
+        }
+        .content {
+            padding: 30px;
+        }
+        .section {
+            margin-bottom: 40px;
+        }
+        .section h2 {
+            color: #2c3e50;
+            border-bottom: 2px solid #3498db;
+            padding-bottom: 10px;
+            margin-bottom: 20px;
+        }
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            margin-bottom: 30px;
+        }
+        .metric-card {
+            background: #f8f9fa;
+            border-radius: 8px;
+            padding: 20px;
+            border-left: 4px solid #3498db;
+        }
+        .metric-card.healthy {
+            border-left-color: #27ae60;
+        }
+        .metric-card.warning {
+            border-left-color: #f39c12;
+        }
+        .metric-card.critical {
+            border-left-color: #e74c3c;
+        }
+        .metric-value {
+            font-size: 2em;
+            font-weight: bold;
+            margin-bottom: 5px;
+        }
+        .metric-label {
+            color: #7f8c8d;
+            font-size: 0.9em;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }
+        .metric-target {
+            color: #95a5a6;
+            font-size: 0.8em;
+            margin-top: 5px;
+        }
+        .alert-item {
+            background: #fff5f5;
+            border: 1px solid #fed7d7;
+            border-radius: 4px;
+            padding: 15px;
+            margin-bottom: 10px;
+        }
+        .alert-item.warning {
+            background: #fffbeb;
+            border-color: #fed7aa;
+        }
+        .alert-item.info {
+            background: #ebf8ff;
+            border-color: #90cdf4;
+        }
+        .status-badge {
+            display: inline-block;
+            padding: 4px 12px;
+            border-radius: 20px;
+            font-size: 0.8em;
+            font-weight: bold;
+            text-transform: uppercase;
+        }
+        .status-healthy {
+            background: #d4edda;
+            color: #155724;
+        }
+        .status-warning {
+            background: #fff3cd;
+            color: #856404;
+        }
+        .status-critical {
+            background: #f8d7da;
+            color: #721c24;
+        }
+        .chart-container {
+            height: 400px;
+            margin: 20px 0;
+        }
+        .summary-table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 20px;
+        }
+        .summary-table th,
+        .summary-table td {
+            padding: 12px;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }
+        .summary-table th {
+            background-color: #f8f9fa;
+            font-weight: 600;
+        }
+        .footer {
+            background: #2c3e50;
+            color: white;
+            padding: 20px;
+            text-align: center;
+            font-size: 0.9em;
+        }
+        @media (max-width: 768px) {
+            .metrics-grid {
+                grid-template-columns: 1fr;
+            }
+            .container {
+                margin: 10px;
+                border-radius: 0;
+            }
+        }
+    </style>"""
+
+PAGE_SOURCE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Fixzit Weekly Report - $report_date</title>
+    <script src="$chart_src"></script>
+$style
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🏥 Fixzit Weekly Report</h1>
+            <p>Performance & Reliability Summary - Tenant: $tenant</p>
+            <p>$period_start - $period_end</p>
+        </div>
+
+        <div class="content">
+            <!-- Executive Summary -->
+            <div class="section">
+                <h2>📊 Executive Summary</h2>
+                <div class="metrics-grid">
+                    <div class="metric-card healthy">
+                        <div class="metric-value">$health_score%</div>
+                        <div class="metric-label">System Health Score</div>
+                        <div class="metric-target">Grade: $health_grade</div>
+                    </div>
+                    <div class="metric-card $budget_class">
+                        <div class="metric-value">$budget_icon</div>
+                        <div class="metric-label">Performance Budget</div>
+                        <div class="metric-target">$budget_text</div>
+                    </div>
+                    <div class="metric-card $alerts_class">
+                        <div class="metric-value">$alert_count</div>
+                        <div class="metric-label">Active Alerts</div>
+                        <div class="metric-target">Last 7 days</div>
+                    </div>
+                    <div class="metric-card">
+                        <div class="metric-value">$endpoints</div>
+                        <div class="metric-label">Monitored Endpoints</div>
+                        <div class="metric-target">Uptime tracking</div>
+                    </div>
+                </div>
+            </div>
+
+            <!-- SLO Status -->
+            <div class="section">
+                <h2>🎯 Service Level Objectives</h2>
+                <div class="metrics-grid">
+$slo_cards
+                </div>
+            </div>
+
+            <!-- Performance Metrics -->
+            <div class="section">
+                <h2>⚡ Core Web Vitals</h2>
+$vitals
+            </div>
+
+            <!-- Recent Alerts -->
+            <div class="section">
+                <h2>🚨 Recent Alerts</h2>
+$alerts
+            </div>
+
+            <!-- Recommendations -->
+            <div class="section">
+                <h2>💡 Recommendations</h2>
+                <ul>
+$recommendations
+                </ul>
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>Generated on $generated | Fixzit Performance & Reliability Report</p>
+            <p>Tenant: $tenant | Period: $period_start to $period_end</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+SLO_CARD_SOURCE = """\
+                    <div class="metric-card $status">
+                        <div class="metric-value">$value$unit</div>
+                        <div class="metric-label">$name</div>
+                        <div class="metric-target">Target: $target$unit</div>
+                        <span class="status-badge status-$status">$status</span>
+                    </div>"""
+
+VITALS_SOURCE = """\
+                <div class="metrics-grid">
+                    <div class="metric-card $fcp_class">
+                        <div class="metric-value">${fcp}ms</div>
+                        <div class="metric-label">First Contentful Paint</div>
+                        <div class="metric-target">Target: ≤ 1.8s</div>
+                    </div>
+                    <div class="metric-card $lcp_class">
+                        <div class="metric-value">${lcp}ms</div>
+                        <div class="metric-label">Largest Contentful Paint</div>
+                        <div class="metric-target">Target: ≤ 2.5s</div>
+                    </div>
+                    <div class="metric-card $cls_class">
+                        <div class="metric-value">$cls</div>
+                        <div class="metric-label">Cumulative Layout Shift</div>
+                        <div class="metric-target">Target: ≤ 0.1</div>
+                    </div>
+                </div>"""
+
+# Static, so the same script serves every report; data is read from JSON
+CHART_SOURCE = """
+                <div class="chart-container">
+                    <div id="performanceChart"></div>
+                </div>
+                <script type="application/json" id="chartData">$chart_json</script>
+                <script>
+                    var chartData = JSON.parse(
+                        document.getElementById('chartData').textContent
+                    );
+                    var traces = [];
+                    var colors = ['#3498db', '#e74c3c', '#f39c12', '#27ae60'];
+                    var colorIndex = 0;
+                    for (var route in chartData) {
+                        var data = chartData[route];
+                        traces.push({
+                            x: data.dates, y: data.fcp, name: route + ' - FCP',
+                            mode: 'lines+markers',
+                            line: { color: colors[colorIndex % colors.length] }
+                        });
+                        traces.push({
+                            x: data.dates, y: data.lcp, name: route + ' - LCP',
+                            mode: 'lines+markers',
+                            line: {
+                                color: colors[(colorIndex + 1) % colors.length],
+                                dash: 'dash'
+                            }
+                        });
+                        colorIndex += 2;
+                    }
+                    Plotly.newPlot('performanceChart', traces, {
+                        title: 'Performance Trends (Last 7 Days)',
+                        xaxis: { title: 'Date' },
+                        yaxis: { title: 'Time (ms)' },
+                        hovermode: 'x unified'
+                    }, {responsive: true});
+                </script>"""
+
+ALERT_SOURCE = """\
+                    <div class="alert-item $alert_class">
+                        <strong>$type</strong> - $message
+                        <br><small>🕒 $timestamp</small>
+                    </div>"""
+
+NO_METRICS = """\
+                <p>No performance metrics available. Run performance tests to \
+generate data.</p>"""
+NO_ALERTS = """\
+                <p>✅ No alerts in the past week. All systems are operating \
+normally.</p>"""
+
+SOURCES = (
+    STYLE,
+    PAGE_SOURCE,
+    SLO_CARD_SOURCE,
+    VITALS_SOURCE,
+    CHART_SOURCE,
+    ALERT_SOURCE,
+    NO_METRICS,
+    NO_ALERTS,
+    PLOTLY_FILE,
+)
+_DIGEST = hashlib.sha256("\0".join(SOURCES).encode("utf-8"))
+TEMPLATE_VERSION = _DIGEST.hexdigest()[:16]
+
+PAGE = Template(PAGE_SOURCE)
+SLO_CARD = Template(SLO_CARD_SOURCE)
+VITALS = Template(VITALS_SOURCE)
+CHART = Template(CHART_SOURCE)
+ALERT = Template(ALERT_SOURCE)
+
+
+def _e(value) -> str:
+    return html.escape(str(value))
+
+
+def compact_json(data) -> str:
+    """Smallest JSON encoding that is safe inside a <script> element"""
+    return json.dumps(data, separators=(",", ":")).replace("</", "<\\/")
+
+
+def chart_src(mode: str = "cdn") -> str:
+    return f"{ASSET_DIR}/{PLOTLY_FILE}" if mode == "bundle" else PLOTLY_CDN
+
+
+def chart_bundle() -> pathlib.Path:
+    """Local copy of the pinned charting bundle, fetched once if needed"""
+    if PLOTLY_LOCAL:
+        return pathlib.Path(PLOTLY_LOCAL)
+    target = VENDOR_DIR / PLOTLY_FILE
+    if not target.exists():
+        VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+        with urllib.request.urlopen(PLOTLY_CDN, timeout=60) as response:
+            data = response.read()
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    return target
+
+
+def install_bundle(directory: pathlib.Path) -> pathlib.Path:
+    """Copy the charting bundle to where bundle-mode reports in `directory`
+    look for it"""
+    source = chart_bundle()
+    target = directory / chart_src("bundle")
+    if not target.exists() or target.stat().st_size != source.stat().st_size:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    return target
+
+
+def with_cdn_assets(page: str) -> str:
+    """`page` loading the charting bundle from the CDN instead of assets/"""
+    return page.replace(f'src="{chart_src("bundle")}"', f'src="{PLOTLY_CDN}"')
+
+
+def _grade(value, good, poor) -> str:
+    return "healthy" if value <= good else "warning" if value <= poor else "critical"
+
+
+def render_slo_cards(slo_status: Dict) -> str:
+    return "\n".join(
+        SLO_CARD.substitute(
+            status=_e(slo.get("status", "unknown")),
+            value=_e(slo.get("current_value", 0)),
+            unit=_e(slo.get("unit", "")),
+            name=_e(slo.get("name", slo_id)),
+            target=_e(slo.get("target", 0)),
+        )
+        for slo_id, slo in slo_status.items()
+    )
+
+
+def render_vitals(latest_metrics: Dict, chart_data: Dict) -> str:
+    if not latest_metrics:
+        return NO_METRICS
+    fcp = latest_metrics.get("fcp", 0)
+    lcp = latest_metrics.get("lcp", 0)
+    cls = latest_metrics.get("cls", 0)
+    parts = [
+        VITALS.substitute(
+            fcp=_e(fcp),
+            lcp=_e(lcp),
+            cls=f"{cls:.3f}",
+            fcp_class=_grade(fcp, 1800, 3000),
+            lcp_class=_grade(lcp, 2500, 4000),
+            cls_class=_grade(cls, 0.1, 0.25),
+        )
+    ]
+    # Add performance trends chart if available
+    if chart_data:
+        parts.append(CHART.substitute(chart_json=compact_json(chart_data)))
+    return "\n".join(parts)
+
+
+def render_alerts(alerts: List[Dict], formatted_times: List[str]) -> str:
+    if not alerts:
+        return NO_ALERTS
+    items = [
+        ALERT.substitute(
+            alert_class=(
+                "warning"
+                if alert.get("severity", "info") in ["warning", "error"]
+                else "info"
+            ),
+            type=_e(alert.get("type", "Alert")),
+            message=_e(alert.get("message", "No message")),
+            timestamp=_e(timestamp),
+        )
+        for alert, timestamp in zip(alerts, formatted_times)
+    ]
+    return (
+        '                <div class="alerts-list">\n'
+        + "\n".join(items)
+        + "\n                </div>"
+    )
+
+
+def render_page(**values) -> str:
+    """Fill the page template; every value must already be HTML-safe"""
+    return PAGE.substitute(style=STYLE, **values)
@@ -0,0 +1,227 @@
+"""
+Route discovery from the Next.js ``app/`` directory
+
+Walks ``app/`` once for ``page.*`` files and resolves each to its URL:
+route groups like ``(app)`` and parallel-route slots like ``@modal`` are
+dropped, ``_private`` folders, intercepting routes and ``app/api`` are
+skipped, and dynamic segments (``[id]``, ``[...slug]``, ``[[...slug]]``)
+are recorded as parameters.
+
+The walk takes milliseconds, so the manifest is rebuilt from the tree on
+every run (memoized per process) rather than cached on disk, where any
+staleness check would cost as much as the walk. Dynamic routes only become
+sweepable URLs once sample values are supplied in route_params.json,
+either per parameter name or per route pattern::
+
+    {"params": {"id": "demo"}, "routes": {"/cms/[slug]": {"slug": "about"}}}
+"""
+
+import json
+import os
+import pathlib
+import re
+from typing import Callable, Dict, List, Optional
+
+from scripts.lib.budget_matcher import glob_to_regex, normalize_path
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+APP_DIR = ROOT / "app"
+PARAMS_FILE = pathlib.Path(os.environ.get("FXZ_ROUTE_PARAMS", "route_params.json"))
+ROUTES_FILE = pathlib.Path("routes.txt")
+
+MANIFEST_VERSION = 1
+PAGE_FILES = {"page.tsx", "page.ts", "page.jsx", "page.js", "page.mdx"}
+
+DYNAMIC = re.compile(r"^\[(\[)?(\.\.\.)?([^\]]+)\]?\]$")
+
+
+def _skip_dir(name: str, parent: pathlib.Path) -> bool:
+    if name.startswith(("_", ".")) or name == "node_modules":
+        return True
+    if name.startswith("(.") and ")" in name:  # intercepting route
+        return True
+    return parent == APP_DIR and name == "api"
+
+
+def find_pages(app_dir: pathlib.Path = APP_DIR) -> List[str]:
+    """Page files relative to `app_dir`, sorted"""
+    pages: List[str] = []
+    stack = [app_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not _skip_dir(entry.name, pathlib.Path(directory)):
+                    stack.append(pathlib.Path(entry.path))
+            elif entry.name in PAGE_FILES:
+                pages.append(pathlib.Path(entry.path).relative_to(app_dir).as_posix())
+    return sorted(pages)
+
+
+def resolve_page(page: str) -> Dict:
+    """Manifest entry for one page file path (relative to app/)"""
+    segments = page.split("/")[:-1]
+    parts, groups, params = [], [], []
+
+    for segment in segments:
+        if segment.startswith("(") and segment.endswith(")"):
+            groups.append(segment[1:-1])
+            continue
+        if segment.startswith("@"):
+            continue
+        match = DYNAMIC.match(segment)
+        if match:
+            optional, catch_all, name = match.groups()
+            params.append(
+                {"name": name, "catch_all": bool(catch_all), "optional": bool(optional)}
+            )
+        parts.append(segment)
+
+    return {
+        "route": "/" + "/".join(parts),
+        "file": f"app/{page}",
+        "groups": groups,
+        "params": params,
+    }
+
+
+def build_manifest(app_dir: pathlib.Path = APP_DIR) -> Dict:
+    pages = find_pages(app_dir)
+    routes: Dict[str, Dict] = {}
+    for page in pages:
+        entry = resolve_page(page)
+        # Two groups resolving to one URL is a Next build error; keep the first
+        routes.setdefault(entry["route"], entry)
+    return {
+        "version": MANIFEST_VERSION,
+        "routes": sorted(routes.values(), key=lambda r: r["route"]),
+    }
+
+
+_MANIFESTS: Dict[pathlib.Path, Dict] = {}
+
+
+def load_manifest(app_dir: pathlib.Path = APP_DIR) -> Dict:
+    """Manifest for `app_dir`, built once per process"""
+    if app_dir not in _MANIFESTS:
+        _MANIFESTS[app_dir] = build_manifest(app_dir)
+    return _MANIFESTS[app_dir]
+
+
+def _load_params() -> Dict:
+    if not PARAMS_FILE.exists():
+        return {}
+    try:
+        return json.loads(PARAMS_FILE.read_text())
+    except ValueError as e:
+        print(f"Error reading {PARAMS_FILE}: {e}")
+        return {}
+
+
+def concrete_url(entry: Dict, params: Dict) -> Optional[str]:
+    """Fill dynamic segments from sample params; None when any is missing"""
+    if not entry["params"]:
+        return entry["route"]
+
+    values = {
+        **params.get("params", {}),
+        **params.get("routes", {}).get(entry["route"], {}),
+    }
+    parts = []
+    for segment in entry["route"].strip("/").split("/"):
+        match = DYNAMIC.match(segment)
+        if not match:
+            parts.append(segment)
+            continue
+        optional, _, name = match.groups()
+        value = values.get(name)
+        if value is None:
+            if optional:
+                continue
+            return None
+        parts.extend(value if isinstance(value, list) else [str(value)])
+    return "/" + "/".join(parts)
+
+
+def manifest_routes(include_unresolved: bool = False) -> List[str]:
+    """Sweepable URLs from the manifest (dynamic routes need sample params)"""
+    params = _load_params()
+    urls: List[str] = []
+    for entry in load_manifest()["routes"]:
+        url = concrete_url(entry, params)
+        if url is None and include_unresolved:
+            url = entry["route"]
+        if url is not None and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def route_matcher(
+    manifest: Optional[Dict] = None, unknown: Optional[str] = "(other)"
+) -> Callable[[str], Optional[str]]:
+    """Compile a URL -> route pattern resolver (e.g. /cms/about -> /cms/[slug])
+
+    Static routes win over dynamic ones, and dynamic routes with fewer
+    parameters win over broader ones. Unmatched paths map to `unknown`
+    so arbitrary URLs cannot blow up per-route cardinality.
+    """
+    manifest = manifest or load_manifest()
+    static = {e["route"]: e["route"] for e in manifest["routes"] if not e["params"]}
+    dynamic = sorted(
+        (e for e in manifest["routes"] if e["params"]),
+        key=lambda e: (
+            any(p["catch_all"] for p in e["params"]),
+            len(e["params"]),
+            -len(e["route"]),
+        ),
+    )
+    patterns = [e["route"] for e in dynamic]
+    regex = (
+        re.compile(
+            "|".join(
+                f"(?:{glob_to_regex(route)})(?P<_route_{i}>)"
+                for i, route in enumerate(patterns)
+            )
+        )
+        if patterns
+        else None
+    )
+
+    def match(path: str) -> Optional[str]:
+        path = normalize_path(path)
+        if path in static:
+            return static[path]
+        found = regex.fullmatch(path) if regex is not None else None
+        if found is not None:
+            return patterns[int(found.lastgroup.rsplit("_", 1)[1])]
+        return unknown
+
+    return match
+
+
+def get_routes_to_test() -> List[str]:
+    """Routes for perf/UI sweeps: routes.txt when present, else the manifest"""
+    if ROUTES_FILE.exists():
+        try:
+            routes = []
+            with open(ROUTES_FILE, "r") as f:
+                for line in f:
+                    route = line.strip()
+                    if route and not route.startswith("#"):
+                        if not route.startswith("/"):
+                            route = "/" + route
+                        routes.append(route)
+            if routes:
+                return routes
+        except Exception as e:
+            print(f"Error reading routes.txt: {e}")
+
+    if not APP_DIR.exists():
+        print("No routes.txt or app/ directory found, testing root route only")
+        return ["/"]
+    return manifest_routes() or ["/"]
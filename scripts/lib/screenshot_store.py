@@ -0,0 +1,86 @@
+"""
+Content-addressed screenshot storage with perceptual change detection
+
+Screenshots are written as ``<sha256-prefix>.png`` so identical captures
+are stored once, and an index maps each route to its current file and
+perceptual hash. ``perceptual_hash`` is a 64-bit difference hash (dHash)
+when Pillow is installed; without it, an exact content hash is used, so
+any pixel change counts as a change.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pathlib
+from typing import Dict, Iterable, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+HASH_SIZE = 8
+# dHash bits allowed to differ before a page counts as visually changed
+CHANGE_THRESHOLD = 6
+
+
+def perceptual_hash(image_bytes: bytes) -> str:
+    """dHash of an encoded image ("d:" prefix), or a content hash ("c:")"""
+    if Image is None:
+        return "c:" + hashlib.sha256(image_bytes).hexdigest()[:16]
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        gray = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE))
+        pixels = list(gray.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"d:{bits:016x}"
+
+
+def changed(previous: Optional[str], current: str) -> bool:
+    """True when two hashes differ beyond the perceptual threshold"""
+    if not previous or previous[:2] != current[:2]:
+        return True
+    if current.startswith("d:"):
+        distance = bin(int(previous[2:], 16) ^ int(current[2:], 16)).count("1")
+        return distance > CHANGE_THRESHOLD
+    return previous != current
+
+
+def store(directory: pathlib.Path, data: bytes, suffix: str = ".png") -> str:
+    """Write `data` under its content hash; returns the file name"""
+    name = hashlib.sha256(data).hexdigest()[:20] + suffix
+    target = directory / name
+    if not target.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    return name
+
+
+def load_index(index_file: pathlib.Path) -> Dict[str, Dict]:
+    try:
+        return json.loads(index_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index_file: pathlib.Path, index: Dict[str, Dict]) -> None:
+    index_file.write_text(json.dumps(index, indent=2, sort_keys=True), "utf-8")
+
+
+def prune(directory: pathlib.Path, keep: Iterable[str], suffix: str = ".png") -> int:
+    """Delete stored captures no longer referenced by the index"""
+    keep = set(keep)
+    removed = 0
+    for path in directory.glob(f"*{suffix}"):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,220 @@
+"""
+Chromium performance trace reduction
+
+Turns a raw trace (as recorded by ``browser.start_tracing``) into a compact
+main-thread breakdown -- scripting, rendering, painting, GC, loading, other
+and idle milliseconds -- plus the top functions by self time from the V8
+CPU profile. Nested trace events are attributed by self time so nothing is
+counted twice.
+"""
+
+import json
+from typing import Dict, List, Optional
+
+TOP_N = 15
+
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "toplevel",
+    "blink.user_timing",
+    "loading",
+    "v8",
+    "v8.execute",
+    "disabled-by-default-v8.cpu_profiler",
+    "disabled-by-default-v8.gc",
+]
+
+# Trace event name -> breakdown bucket (DevTools timeline grouping)
+EVENT_BUCKETS = {
+    "scripting": {
+        "EvaluateScript",
+        "v8.compile",
+        "v8.compileModule",
+        "v8.evaluateModule",
+        "v8.produceCache",
+        "v8.run",
+        "V8.Execute",
+        "FunctionCall",
+        "TimerFire",
+        "EventDispatch",
+        "FireAnimationFrame",
+        "FireIdleCallback",
+        "RunMicrotasks",
+        "XHRReadyStateChange",
+        "XHRLoad",
+        "CompileScript",
+        "CompileCode",
+        "ParseOnBackground",
+    },
+    "rendering": {
+        "Layout",
+        "UpdateLayoutTree",
+        "RecalculateStyles",
+        "ScheduleStyleRecalculation",
+        "InvalidateLayout",
+        "HitTest",
+        "PrePaint",
+        "Layerize",
+        "UpdateLayer",
+        "UpdateLayerTree",
+        "IntersectionObserverController::computeIntersections",
+    },
+    "painting": {
+        "Paint",
+        "PaintImage",
+        "PaintSetup",
+        "CompositeLayers",
+        "RasterTask",
+        "Decode Image",
+        "Decode LazyPixelRef",
+        "Commit",
+    },
+    "gc": {
+        "MinorGC",
+        "MajorGC",
+        "GCEvent",
+        "BlinkGC.AtomicPhase",
+        "ThreadState::performIdleLazySweep",
+        "V8.GCScavenger",
+        "V8.GCFinalizeMC",
+        "V8.GCIncrementalMarking",
+        "V8.GC_MC_BACKGROUND_MARKING",
+    },
+    "loading": {
+        "ParseHTML",
+        "ParseAuthorStyleSheet",
+        "ResourceSendRequest",
+        "ResourceReceiveResponse",
+        "ResourceReceivedData",
+        "ResourceFinish",
+    },
+}
+BUCKET_OF = {name: bucket for bucket, names in EVENT_BUCKETS.items() for name in names}
+BUCKETS = ["scripting", "rendering", "painting", "gc", "loading", "other", "idle"]
+
+
+def _bucket(event: Dict) -> Optional[str]:
+    name = event.get("name", "")
+    if name in BUCKET_OF:
+        return BUCKET_OF[name]
+    if "GC" in name:
+        return "gc"
+    return None
+
+
+def _main_thread(events: List[Dict]):
+    """(pid, tid) of the busiest CrRendererMain thread"""
+    mains = {
+        (e["pid"], e["tid"])
+        for e in events
+        if e.get("ph") == "M"
+        and e.get("name") == "thread_name"
+        and e.get("args", {}).get("name") == "CrRendererMain"
+    }
+    busy: Dict = {}
+    for e in events:
+        key = (e.get("pid"), e.get("tid"))
+        if key in mains and e.get("ph") == "X":
+            busy[key] = busy.get(key, 0) + e.get("dur", 0)
+    return max(busy, key=busy.get) if busy else None
+
+
+def main_thread_breakdown(events: List[Dict]) -> Dict[str, float]:
+    """Self-time milliseconds per bucket on the renderer main thread"""
+    main = _main_thread(events)
+    totals = {bucket: 0.0 for bucket in BUCKETS}
+    if main is None:
+        return totals
+
+    slices = sorted(
+        (
+            e
+            for e in events
+            if (e.get("pid"), e.get("tid")) == main and e.get("ph") == "X"
+        ),
+        key=lambda e: (e["ts"], -e.get("dur", 0)),
+    )
+    if not slices:
+        return totals
+
+    # Stack of [end_ts, bucket, child_us, dur_us]; children inherit the bucket
+    stack: List[List] = []
+    window_start = slices[0]["ts"]
+    window_end = window_start
+    busy = 0.0
+
+    def pop():
+        _, bucket, child, dur = stack.pop()
+        totals[bucket or "other"] += (dur - child) / 1000.0
+
+    for e in slices:
+        ts, dur = e["ts"], e.get("dur", 0)
+        while stack and stack[-1][0] <= ts:
+            pop()
+        parent_bucket = stack[-1][1] if stack else None
+        if stack:
+            stack[-1][2] += dur
+        else:
+            busy += dur
+        stack.append([ts + dur, _bucket(e) or parent_bucket, 0, dur])
+        window_end = max(window_end, ts + dur)
+
+    while stack:
+        pop()
+
+    totals["idle"] = max(0.0, (window_end - window_start - busy) / 1000.0)
+    return {bucket: round(ms, 1) for bucket, ms in totals.items()}
+
+
+def top_functions(events: List[Dict], top_n: int = TOP_N) -> List[Dict]:
+    """Top functions by self time from V8 ProfileChunk events"""
+    nodes: Dict = {}
+    self_us: Dict = {}
+
+    for e in events:
+        if e.get("name") != "ProfileChunk":
+            continue
+        data = e.get("args", {}).get("data", {})
+        profile = data.get("cpuProfile", {})
+        for node in profile.get("nodes", []):
+            nodes[(e.get("id"), node["id"])] = node.get("callFrame", {})
+        samples = profile.get("samples", [])
+        deltas = data.get("timeDeltas", [])
+        # Each delta is the time since the previous sample; charge it to this one
+        for node_id, delta in zip(samples, deltas):
+            key = (e.get("id"), node_id)
+            self_us[key] = self_us.get(key, 0) + max(delta, 0)
+
+    by_function: Dict = {}
+    for key, us in self_us.items():
+        frame = nodes.get(key, {})
+        name = frame.get("functionName") or "(anonymous)"
+        if name in ("(idle)", "(program)", "(root)"):
+            continue
+        ident = (name, frame.get("url", ""), frame.get("lineNumber", -1))
+        by_function[ident] = by_function.get(ident, 0) + us
+
+    ranked = sorted(by_function.items(), key=lambda kv: kv[1], reverse=True)
+    return [
+        {
+            "function": name,
+            "url": url,
+            "line": line + 1 if line >= 0 else None,
+            "self_ms": round(us / 1000.0, 1),
+        }
+        for (name, url, line), us in ranked[:top_n]
+    ]
+
+
+def summarize_trace(trace, top_n: int = TOP_N) -> Dict:
+    """Summarize a trace given as bytes, a JSON string, or parsed JSON"""
+    if isinstance(trace, (bytes, str)):
+        trace = json.loads(trace)
+    events = trace.get("traceEvents", []) if isinstance(trace, dict) else trace
+
+    return {
+        "breakdown_ms": main_thread_breakdown(events),
+        "top_functions": top_functions(events, top_n=top_n),
+    }
@@ -0,0 +1,457 @@
+"""
+Append-only SQLite store for route performance trends
+
+Raw samples are appended to an indexed ``samples`` table and hourly/daily
+rollups are maintained incrementally with one upsert per bucket, so an
+insert costs O(1) regardless of how much history is kept. Readers query a
+route/date window instead of loading the whole history.
+
+Retention is tiered: raw samples are kept for RAW_RETENTION_DAYS, hourly
+rollups (with p50/p95) for HOURLY_RETENTION_DAYS and daily rollups
+forever. ``compact()`` finalizes percentiles for closed buckets and prunes
+expired rows; it only touches buckets changed since the last compaction.
+
+Every sample and rollup is tagged with the device profile it was measured
+under (see device_profiles.py); reads default to DEFAULT_PROFILE. Real-user
+(RUM) aggregates are written as finalized daily rollups under RUM_PROFILE
+by ``put_rollup()``, without raw samples.
+"""
+
+import json
+import pathlib
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from scripts.lib.perf_stats import percentile
+
+# Configuration
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ARTIFACTS = ROOT / "artifacts"
+DEFAULT_DB = ARTIFACTS / "perf-trends.db"
+
+# Profile assumed for samples recorded before profiles existed
+DEFAULT_PROFILE = "desktop-fast"
+# Pseudo-profile for field data ingested from web-vitals beacons
+RUM_PROFILE = "rum"
+
+# (sample key, column name) for every numeric metric tracked
+METRICS = [
+    ("ttfb", "ttfb"),
+    ("fcp", "fcp"),
+    ("lcp", "lcp"),
+    ("cls", "cls"),
+    ("tti", "tti"),
+    ("tbt", "tbt"),
+    ("inp", "inp"),
+    ("speedIndex", "speed_index"),
+    ("domContentLoaded", "dom_content_loaded"),
+    ("loadComplete", "load_complete"),
+]
+COLUMNS = [column for _, column in METRICS]
+
+# Rollup granularity -> strftime format of the bucket key
+GRANULARITIES = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+BUCKET_SPAN = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Retention tiers
+RAW_RETENTION_DAYS = 7
+HOURLY_RETENTION_DAYS = 90
+ROLLUP_PERCENTILES = (50, 75, 95)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    route TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    {", ".join(f"{c} REAL" for c in COLUMNS)},
+    extra TEXT,
+    profile TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}'
+);
+CREATE INDEX IF NOT EXISTS idx_samples_route_ts ON samples (route, ts);
+CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples (ts);
+"""
+
+# Columns added after the initial schema: (name, type). Each metric keeps
+# its own sample count, since a sample may lack some metrics (inp, tbt);
+# rows from before the counts existed have NULL there and fall back to `n`
+ROLLUP_EXTRA_COLUMNS = (
+    [("finalized", "INTEGER NOT NULL DEFAULT 0")]
+    + [(f"p{p}_{c}", "REAL") for c in COLUMNS for p in ROLLUP_PERCENTILES]
+    + [(f"n_{c}", "INTEGER") for c in COLUMNS]
+)
+
+ROLLUPS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {{table}} (
+    route TEXT NOT NULL,
+    profile TEXT NOT NULL DEFAULT '{DEFAULT_PROFILE}',
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    {", ".join(f"sum_{c} REAL NOT NULL DEFAULT 0" for c in COLUMNS)},
+    {", ".join(f"{name} {decl}" for name, decl in ROLLUP_EXTRA_COLUMNS)},
+    PRIMARY KEY (route, profile, granularity, bucket)
+)
+"""
+
+
+def tenant_db_path(tenant: str, directory: pathlib.Path = ARTIFACTS) -> pathlib.Path:
+    """Per-tenant trend store; the tenant name is made filename-safe"""
+    safe = re.sub(r"[^\w\-]+", "_", tenant)
+    return pathlib.Path(directory) / f"perf-trends-{safe}.db"
+
+
+def _bucket_keys(ts_ms: int) -> Dict[str, str]:
+    moment = datetime.fromtimestamp(ts_ms / 1000)
+    return {g: moment.strftime(fmt) for g, fmt in GRANULARITIES.items()}
+
+
+class TrendStore:
+    """Route performance history backed by a single SQLite file"""
+
+    def __init__(self, path: pathlib.Path = DEFAULT_DB):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(ROLLUPS_SCHEMA.format(table="rollups"))
+        self._migrate()
+
+    def _columns(self, table: str) -> set:
+        return {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+
+    def _migrate(self) -> None:
+        samples = self._columns("samples")
+        rollups = self._columns("rollups")
+        with self.conn:
+            if "profile" not in samples:
+                self.conn.execute(
+                    "ALTER TABLE samples ADD COLUMN profile TEXT NOT NULL "
+                    f"DEFAULT '{DEFAULT_PROFILE}'"
+                )
+            for column in COLUMNS:
+                if column not in samples:
+                    self.conn.execute(f"ALTER TABLE samples ADD COLUMN {column} REAL")
+                if f"sum_{column}" not in rollups:
+                    self.conn.execute(
+                        f"ALTER TABLE rollups ADD COLUMN sum_{column} "
+                        "REAL NOT NULL DEFAULT 0"
+                    )
+            for name, decl in ROLLUP_EXTRA_COLUMNS:
+                if name not in rollups:
+                    self.conn.execute(f"ALTER TABLE rollups ADD COLUMN {name} {decl}")
+
+            if "profile" not in rollups:
+                # The profile is part of the primary key, so rebuild the table
+                shared = ", ".join(sorted(self._columns("rollups")))
+                self.conn.execute("DROP TABLE IF EXISTS rollups_v2")
+                self.conn.execute(ROLLUPS_SCHEMA.format(table="rollups_v2"))
+                self.conn.execute(
+                    f"INSERT INTO rollups_v2 ({shared}) SELECT {shared} FROM rollups"
+                )
+                self.conn.execute("DROP TABLE rollups")
+                self.conn.execute("ALTER TABLE rollups_v2 RENAME TO rollups")
+
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rollups_bucket "
+                "ON rollups (granularity, bucket)"
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "TrendStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ writes
+
+    def _append(self, metrics: Dict) -> None:
+        route = metrics.get("route", "/")
+        profile = metrics.get("profile") or DEFAULT_PROFILE
+        ts = int(metrics.get("timestamp"))
+        values = [metrics.get(key) for key, _ in METRICS]
+        known = {"route", "profile", "timestamp", *(key for key, _ in METRICS)}
+        extra = {k: v for k, v in metrics.items() if k not in known}
+
+        self.conn.execute(
+            f"INSERT INTO samples (route, profile, ts, {', '.join(COLUMNS)}, extra) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in COLUMNS)}, ?)",
+            [route, profile, ts, *values, json.dumps(extra) if extra else None],
+        )
+
+        # A missing metric adds to neither its sum nor its count
+        sums = [0 if v is None else v for v in values]
+        counts = [0 if v is None else 1 for v in values]
+        for granularity, bucket in _bucket_keys(ts).items():
+            self.conn.execute(
+                f"INSERT INTO rollups (route, profile, granularity, bucket, n, "
+                f"{', '.join(f'sum_{c}' for c in COLUMNS)}, "
+                f"{', '.join(f'n_{c}' for c in COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, 1, {', '.join('?' for _ in COLUMNS * 2)}) "
+                "ON CONFLICT (route, profile, granularity, bucket) "
+                "DO UPDATE SET n = n + 1, finalized = 0, "
+                + ", ".join(f"sum_{c} = sum_{c} + excluded.sum_{c}" for c in COLUMNS)
+                + ", "
+                + ", ".join(
+                    f"n_{c} = COALESCE(n_{c}, n) + excluded.n_{c}" for c in COLUMNS
+                ),
+                [route, profile, granularity, bucket, *sums, *counts],
+            )
+
+    def append(self, metrics: Dict) -> None:
+        """Append one sample and update its hourly and daily rollups"""
+        if not metrics:
+            return
+        with self.conn:
+            self._append(metrics)
+
+    def append_many(self, samples: Iterable[Dict]) -> int:
+        """Append several samples in one transaction"""
+        count = 0
+        with self.conn:
+            for metrics in samples:
+                if metrics:
+                    self._append(metrics)
+                    count += 1
+        return count
+
+    def put_rollup(
+        self,
+        route: str,
+        profile: str,
+        granularity: str,
+        bucket: str,
+        n: int,
+        stats: Dict[str, Dict],
+    ) -> None:
+        """Replace one finalized rollup from pre-aggregated stats.
+
+        `stats` maps sample keys to {"mean", "p50", "p75", "p95"}. The row
+        stores sums, so each mean is scaled by `n` to keep averages exact
+        even when metrics were reported a different number of times.
+        """
+        columns = ["route", "profile", "granularity", "bucket", "n", "finalized"]
+        values = [route, profile, granularity, bucket, n, 1]
+        for key, column in METRICS:
+            metric = stats.get(key) or {}
+            reported = metric.get("mean") is not None
+            columns += [f"sum_{column}", f"n_{column}"]
+            values += [metric["mean"] * n if reported else 0, n if reported else 0]
+            for pct in ROLLUP_PERCENTILES:
+                columns.append(f"p{pct}_{column}")
+                values.append(metric.get(f"p{pct}"))
+
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[4:])
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO rollups ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT (route, profile, granularity, bucket) DO UPDATE SET "
+                f"{updates}",
+                values,
+            )
+
+    def import_json(self, trends_file: pathlib.Path) -> int:
+        """One-off import of a legacy perf-trends.json file"""
+        trends_data = json.loads(pathlib.Path(trends_file).read_text())
+        samples = [
+            {"route": route, **sample}
+            for route, route_data in trends_data.get("trends", {}).items()
+            for sample in route_data.get("samples", [])
+            if sample.get("timestamp")
+        ]
+        return self.append_many(samples)
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM samples LIMIT 1").fetchone() is None
+
+    # ------------------------------------------------------------------- reads
+
+    def routes(self) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT route FROM rollups ORDER BY route"
+        ).fetchall()
+        return [row["route"] for row in rows]
+
+    def samples(
+        self,
+        route: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        profile: Optional[str] = None,
+    ) -> List[Dict]:
+        """Raw samples in [start_ms, end_ms), oldest first (any profile by default)"""
+        clauses, params = [], []
+        if route is not None:
+            clauses.append("route = ?")
+            params.append(route)
+        if profile is not None:
+            clauses.append("profile = ?")
+            params.append(profile)
+        if start_ms is not None:
+            clauses.append("ts >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            clauses.append("ts < ?")
+            params.append(end_ms)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = self.conn.execute(
+            f"SELECT * FROM samples {where} ORDER BY ts", params
+        ).fetchall()
+
+        result = []
+        for row in rows:
+            sample = {
+                "route": row["route"],
+                "profile": row["profile"],
+                "timestamp": row["ts"],
+            }
+            for key, column in METRICS:
+                if row[column] is not None:
+                    sample[key] = row[column]
+            if row["extra"]:
+                sample.update(json.loads(row["extra"]))
+            result.append(sample)
+        return result
+
+    def rollups(
+        self,
+        granularity: str = "day",
+        route: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        profile: str = DEFAULT_PROFILE,
+    ) -> Dict[str, Dict[str, Dict]]:
+        """Averages per route and bucket for one profile: {route: {bucket: {...}}}
+
+        `start`/`end` are inclusive bucket keys (e.g. "2025-01-31" for
+        daily rollups). Each entry mirrors the legacy daily_averages shape
+        ({"date", "samples_count", "fcp_avg", ...}); an average is None when
+        no sample in the bucket reported that metric.
+        """
+        clauses = ["granularity = ?", "profile = ?"]
+        params = [granularity, profile]
+        if route is not None:
+            clauses.append("route = ?")
+            params.append(route)
+        if start is not None:
+            clauses.append("bucket >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("bucket <= ?")
+            params.append(end)
+
+        rows = self.conn.execute(
+            f"SELECT * FROM rollups WHERE {' AND '.join(clauses)} "
+            "ORDER BY route, bucket",
+            params,
+        ).fetchall()
+
+        result: Dict[str, Dict[str, Dict]] = {}
+        for row in rows:
+            n = row["n"]
+            entry = {"date": row["bucket"], "samples_count": n}
+            for key, column in METRICS:
+                count = row[f"n_{column}"]
+                count = n if count is None else count
+                entry[f"{key}_avg"] = row[f"sum_{column}"] / count if count else None
+                if row["finalized"]:
+                    for pct in ROLLUP_PERCENTILES:
+                        entry[f"{key}_p{pct}"] = row[f"p{pct}_{column}"]
+            result.setdefault(row["route"], {})[row["bucket"]] = entry
+        return result
+
+    def daily_averages(
+        self,
+        days: int = 7,
+        route: Optional[str] = None,
+        profile: str = DEFAULT_PROFILE,
+    ) -> Dict:
+        """Daily rollups for the last `days` calendar days (including today)"""
+        start = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        return self.rollups("day", route=route, start=start, profile=profile)
+
+    def profiles(self) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT profile FROM rollups ORDER BY profile"
+        ).fetchall()
+        return [row["profile"] for row in rows]
+
+    # -------------------------------------------------------------- retention
+
+    def _finalize_bucket(
+        self, route: str, profile: str, granularity: str, bucket: str
+    ) -> None:
+        start = datetime.strptime(bucket, GRANULARITIES[granularity])
+        end = start + BUCKET_SPAN[granularity]
+        rows = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM samples "
+            "WHERE route = ? AND profile = ? AND ts >= ? AND ts < ?",
+            [
+                route,
+                profile,
+                int(start.timestamp() * 1000),
+                int(end.timestamp() * 1000),
+            ],
+        ).fetchall()
+
+        assignments, params = ["finalized = 1"], []
+        for column in COLUMNS:
+            values = [row[column] for row in rows if row[column] is not None]
+            for pct in ROLLUP_PERCENTILES:
+                assignments.append(f"p{pct}_{column} = ?")
+                params.append(percentile(values, pct))
+
+        self.conn.execute(
+            f"UPDATE rollups SET {', '.join(assignments)} "
+            "WHERE route = ? AND profile = ? AND granularity = ? AND bucket = ?",
+            [*params, route, profile, granularity, bucket],
+        )
+
+    def compact(
+        self,
+        now: Optional[datetime] = None,
+        raw_days: int = RAW_RETENTION_DAYS,
+        hourly_days: int = HOURLY_RETENTION_DAYS,
+    ) -> Dict[str, int]:
+        """Finalize closed buckets and apply the retention tiers.
+
+        Percentiles are only computed for closed buckets that received
+        samples since they were last finalized, and always before the raw
+        samples backing them expire, so repeated runs are cheap.
+        """
+        now = now or datetime.now()
+        stats = {"finalized": 0, "samples_pruned": 0, "hourly_pruned": 0}
+        raw_cutoff = int((now - timedelta(days=raw_days)).timestamp() * 1000)
+
+        with self.conn:
+            for granularity, fmt in GRANULARITIES.items():
+                open_bucket = now.strftime(fmt)
+                pending = self.conn.execute(
+                    "SELECT route, profile, bucket FROM rollups "
+                    "WHERE granularity = ? AND finalized = 0 AND bucket < ?",
+                    [granularity, open_bucket],
+                ).fetchall()
+                for row in pending:
+                    self._finalize_bucket(
+                        row["route"], row["profile"], granularity, row["bucket"]
+                    )
+                stats["finalized"] += len(pending)
+
+            stats["samples_pruned"] = self.conn.execute(
+                "DELETE FROM samples WHERE ts < ?", [raw_cutoff]
+            ).rowcount
+            stats["hourly_pruned"] = self.conn.execute(
+                "DELETE FROM rollups WHERE granularity = 'hour' AND bucket < ?",
+                [(now - timedelta(days=hourly_days)).strftime(GRANULARITIES["hour"])],
+            ).rowcount
+
+        return stats
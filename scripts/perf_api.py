@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+OpenAPI-Driven API Latency Benchmark
+Generates a representative request per operation in openapi.yaml, replays
+each against the locally running app over a keep-alive connection and
+reports p50/p95/p99 latency and payload size per operation, flagging
+regressions against a stored baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib.app_server import NEXT_ENTRY, SERVERS, app_server, resolve_entry
+from scripts.lib.auth_state import (
+    DEFAULT_ROLE,
+    ROLES,
+    cookie_header,
+    ensure_storage_state,
+)
+from scripts.lib.openapi_requests import (
+    METHODS,
+    SAFE_METHODS,
+    SPEC_FILE,
+    STUBS_FILE,
+    build_operations,
+    load_spec,
+    load_stubs,
+)
+from scripts.lib.perf_stats import percentile
+from scripts.perf_load import (
+    REQUEST_TIMEOUT,
+    KeepAliveConnection,
+    latency_summary,
+    reconnect_delay,
+    record_error,
+)
+from scripts.perf_regressions import compare
+
+# Configuration
+ART = pathlib.Path("artifacts")
+ART.mkdir(exist_ok=True)
+
+RESULTS_FILE = ART / "perf-api.json"
+BASELINE_FILE = ART / "perf-api-baseline.json"
+
+ITERATIONS = int(os.environ.get("FXZ_API_ITERATIONS", "20"))
+WARMUP = 2
+API_TOKEN = os.environ.get("FXZ_API_TOKEN")
+
+# Payloads growing more than this against the baseline are flagged too
+MAX_PAYLOAD_GROWTH = 0.10
+
+
+def request_headers(operation, cookie=None):
+    headers = dict(operation["headers"])
+    if operation["auth"]:
+        if API_TOKEN:
+            headers["Authorization"] = f"Bearer {API_TOKEN}"
+        elif cookie:
+            headers["Cookie"] = cookie
+    body = None
+    if operation["body"] is not None and operation["method"] not in ("GET", "HEAD"):
+        body = json.dumps(operation["body"]).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    return headers, body
+
+
+async def benchmark_operation(host, port, operation, iterations, cookie=None):
+    """Replay one operation sequentially on a single keep-alive connection"""
+    headers, body = request_headers(operation, cookie)
+    conn = KeepAliveConnection(host, port)
+    latencies, ttfbs, sizes = [], [], []
+    statuses, errors = {}, {"count": 0, "types": {}}
+    failures = 0
+    try:
+        for i in range(WARMUP + iterations):
+            try:
+                status, ttfb, total, size = await asyncio.wait_for(
+                    conn.request(
+                        operation["method"],
+                        operation["url"],
+                        body=body,
+                        headers=headers,
+                        accept="application/json",
+                    ),
+                    REQUEST_TIMEOUT,
+                )
+            except Exception as e:
+                record_error(errors, e)
+                await conn.close()
+                failures += 1
+                await asyncio.sleep(reconnect_delay(failures))
+                continue
+            failures = 0
+            if i < WARMUP:
+                continue
+            statuses[status] = statuses.get(status, 0) + 1
+            latencies.append(total * 1000)
+            ttfbs.append(ttfb * 1000)
+            sizes.append(size)
+    finally:
+        await conn.close()
+
+    summary = latency_summary(latencies)
+    summary.pop("histogram")
+    return {
+        "method": operation["method"],
+        "path": operation["path"],
+        "url": operation["url"],
+        "requests": len(latencies),
+        "errors": errors,
+        "status": statuses,
+        "latency_ms": summary,
+        "ttfb_p50_ms": round(percentile(ttfbs, 50), 2) if ttfbs else None,
+        "payload_bytes": int(percentile(sizes, 50)) if sizes else None,
+        "request_bytes": len(body) if body else 0,
+        "synthetic": operation["synthetic"],
+        # Raw samples let the next run test against this one statistically
+        "samples_ms": [round(v, 3) for v in latencies],
+    }
+
+
+async def run_benchmark(base_url, operations, iterations, cookie=None):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    results = {}
+    for operation in operations:
+        result = await benchmark_operation(host, port, operation, iterations, cookie)
+        results[operation["id"]] = result
+        latency = result["latency_ms"]
+        codes = ",".join(str(c) for c in sorted(result["status"])) or "-"
+        print(
+            f"   {operation['id']:<60} p50={latency['p50']}ms "
+            f"p95={latency['p95']}ms p99={latency['p99']}ms "
+            f"{result['payload_bytes'] or 0}B [{codes}]"
+        )
+    return results
+
+
+def compare_baseline(results, baseline):
+    """Per-operation latency and payload regressions against `baseline`"""
+    regressions = {}
+    for op_id, result in results.items():
+        before = baseline.get("operations", {}).get(op_id)
+        if not before:
+            continue
+        if set(result["status"]) != set(before.get("status", {})):
+            # A different status mix means a different code path, not a slowdown
+            continue
+        latency = compare(result["samples_ms"], before.get("samples_ms", []))
+        payload = None
+        if before.get("payload_bytes") and result["payload_bytes"] is not None:
+            growth = result["payload_bytes"] / before["payload_bytes"] - 1
+            payload = {
+                "current": result["payload_bytes"],
+                "baseline": before["payload_bytes"],
+                "relative_change": round(growth, 4),
+                "regressed": growth > MAX_PAYLOAD_GROWTH,
+            }
+        if (latency and latency["regressed"]) or (payload and payload["regressed"]):
+            regressions[op_id] = {"latency": latency, "payload": payload}
+    return regressions
+
+
+def main(args: argparse.Namespace = None):
+    """Benchmark API operations from the OpenAPI spec"""
+    if args is None:
+        parser = argparse.ArgumentParser(description="Benchmark API latency")
+        parser.add_argument(
+            "--spec", default=str(SPEC_FILE), help="OpenAPI document to read"
+        )
+        parser.add_argument(
+            "--stubs",
+            default=str(STUBS_FILE),
+            help="Stub data for operations that need fixtures "
+            "(default: FXZ_API_STUBS or api_stubs.json)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=ITERATIONS,
+            help="Measured requests per operation (default: FXZ_API_ITERATIONS)",
+        )
+        parser.add_argument(
+            "--match", help="Only operations whose id contains this substring"
+        )
+        parser.add_argument(
+            "--include-writes",
+            action="store_true",
+            help="Also replay POST/PUT/PATCH/DELETE (mutates the local database)",
+        )
+        parser.add_argument(
+            "--synthetic",
+            action="store_true",
+            help="Replay operations whose path ids are made up instead of skipping",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store this run as the baseline for later comparisons",
+        )
+        parser.add_argument(
+            "--role",
+            default=DEFAULT_ROLE,
+            help=f"Authenticate secured operations as this role ({', '.join(ROLES)}; "
+            "FXZ_API_TOKEN sends a bearer token instead)",
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            default=NEXT_ENTRY,
+            help="App backend serving /api (default: next)",
+        )
+        args = parser.parse_args()
+
+    print("🎯 Starting API Latency Benchmark")
+    print("=" * 50)
+
+    spec = load_spec(pathlib.Path(args.spec))
+    methods = METHODS if args.include_writes else SAFE_METHODS
+    operations = build_operations(
+        spec, load_stubs(pathlib.Path(args.stubs)), methods, args.match
+    )
+    skipped = [op["id"] for op in operations if op["skip"]]
+    needs_fixture = [
+        op["id"] for op in operations if op["synthetic"] and not args.synthetic
+    ]
+    selected = [
+        op
+        for op in operations
+        if op["id"] not in skipped and op["id"] not in needs_fixture
+    ]
+    print(
+        f"📋 {len(selected)} of {len(operations)} operations selected "
+        f"({len(needs_fixture)} need stub data, {len(skipped)} skipped by stubs)"
+    )
+
+    with app_server(entry=resolve_entry(args.server)) as server:
+        storage_state = None
+        if not API_TOKEN:
+            storage_state = ensure_storage_state(server.url, args.role)
+        cookie = cookie_header(storage_state, server.url)
+        results = asyncio.run(
+            run_benchmark(server.url, selected, args.iterations, cookie)
+        )
+
+    baseline = {}
+    if BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text())
+    regressions = compare_baseline(results, baseline)
+
+    report = {
+        "timestamp": int(time.time() * 1000),
+        "spec": str(args.spec),
+        "iterations": args.iterations,
+        "role": args.role,
+        "operations": results,
+        "needs_fixture": needs_fixture,
+        "skipped": skipped,
+        "baseline_timestamp": baseline.get("timestamp"),
+        "regressions": regressions,
+    }
+    RESULTS_FILE.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 API latency results saved to: {RESULTS_FILE}")
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps(report, indent=2))
+        print(f"📌 Baseline updated: {BASELINE_FILE}")
+        return 0
+
+    if regressions:
+        print(f"❌ {len(regressions)} operations regressed against the baseline:")
+        for op_id, regression in regressions.items():
+            latency, payload = regression["latency"], regression["payload"]
+            if latency and latency["regressed"]:
+                print(
+                    f"   • {op_id}: median {latency['baseline_median']:.1f}ms → "
+                    f"{latency['current_median']:.1f}ms (p={latency['p_value']})"
+                )
+            if payload and payload["regressed"]:
+                print(
+                    f"   • {op_id}: payload {payload['baseline']}B → "
+                    f"{payload['current']}B"
+                )
+        return 1
+
+    print("✅ No API latency regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  API benchmark interrupted")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 API benchmark failed: {e}")
+        sys.exit(1)
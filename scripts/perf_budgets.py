@@ -4,205 +4,128 @@ Performance Budget Testing Script for Fixzit Streamlit Application
 Launches the app, collects performance metrics, and enforces budgets.
 """
 
+import argparse
 import json
 import os
 import sys
 import time
-import subprocess
-import signal
 import pathlib
-from contextlib import contextmanager
 from playwright.sync_api import sync_playwright
 
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib import cdp_metrics
+from scripts.lib.app_server import (
+    SERVERS,
+    app_server,
+    ensure_next_build,
+    is_next_entry,
+    resolve_entry,
+)
+from scripts.lib.auth_state import DEFAULT_ROLE, ROLES, ensure_storage_state
+from scripts.lib.budget_matcher import BudgetMatcher
+from scripts.lib.bundle_stats import (
+    analyze_build,
+    chunk_growth,
+    previous_build,
+    record_build,
+)
+from scripts.lib.device_profiles import DEFAULT_PROFILE, PROFILES, context_options
+from scripts.lib.har_summary import (
+    RENDER_BLOCKING_SCRIPT,
+    har_path_for,
+    summarize_har_file,
+)
+from scripts.lib.perf_stats import summarize
+from scripts.lib.route_manifest import get_routes_to_test
+
 # Configuration
 ART = pathlib.Path("artifacts")
 ART.mkdir(exist_ok=True)
 
 BUDGETS_FILE = pathlib.Path("perf_budgets.json")
 STREAMLIT_FILE = os.environ.get("FXZ_APP_ENTRY", "app.py")
-APP_PORT = int(os.environ.get("FXZ_APP_PORT", "5000"))
-APP_URL = f"http://localhost:{APP_PORT}"
 
 TIMEOUT = 60_000  # 60 seconds
+SAMPLES = int(os.environ.get("FXZ_PERF_SAMPLES", "1"))
+HAR_DIR = ART / "har"
 
+# Metrics summarized in multi-sample mode
+SAMPLED_METRICS = ["ttfb", "fcp", "lcp", "cls", "tti", "tbt", "inp", "speedIndex"]
 
-@contextmanager
-def run_streamlit():
-    """Launch Streamlit app and wait for it to be ready"""
-    print(f"🚀 Starting Streamlit app on port {APP_PORT}...")
-
-    proc = subprocess.Popen(
-        [
-            "streamlit",
-            "run",
-            STREAMLIT_FILE,
-            "--server.port",
-            str(APP_PORT),
-            "--server.headless",
-            "true",
-            "--server.address",
-            "0.0.0.0",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-
-    try:
-        # Wait until server is up
-        started = False
-        t0 = time.time()
-
-        while time.time() - t0 < 40:
-            if proc.poll() is not None:
-                raise RuntimeError(
-                    f"Streamlit process exited early with code {proc.returncode}"
-                )
-
-            if proc.stdout:
-                line = proc.stdout.readline()
-            else:
-                line = ""
-            if not line:
-                time.sleep(0.1)
-                continue
-
-            print(f"📡 {line.strip()}")
-
-            if "Running on" in line and f":{APP_PORT}/" in line:
-                started = True
-                print("✅ Streamlit server is ready!")
-                break
+# Metrics measured in bytes (first-load JS from the Next.js build)
+BYTE_METRICS = {"firstLoadJs", "firstLoadJsGrowth"}
+# Growth allowed per route between consecutive builds unless budgeted
+BUNDLE_GROWTH_BYTES = int(os.environ.get("FXZ_BUNDLE_GROWTH_KB", "200")) * 1024
 
-        if not started:
-            raise RuntimeError("Streamlit did not start in time.")
 
-        # Give it a moment to fully initialize
-        time.sleep(2)
-        yield
+def new_context(browser, profile=DEFAULT_PROFILE, har_file=None, storage_state=None):
+    """Browser context for a profile, optionally recording a HAR and
+    seeded with a saved login (`storage_state` file)"""
+    options = context_options(profile)
+    if storage_state is not None:
+        options["storage_state"] = storage_state
+    if har_file is not None:
+        options.update(record_har_path=str(har_file), record_har_content="omit")
+    return browser.new_context(**options)
 
-    finally:
-        print("🛑 Shutting down Streamlit...")
-        try:
-            os.kill(proc.pid, signal.SIGTERM)
-            proc.wait(timeout=5)
-        except Exception as e:
-            print(f"Warning: Failed to gracefully shutdown: {e}")
-            try:
-                os.kill(proc.pid, signal.SIGKILL)
-            except Exception:
-                pass
 
-
-def collect_metrics(page, path="/"):
+def attach_resources(metrics, har_file, page_index=None):
+    """Attach the HAR byte breakdown to metrics (after the context closed)"""
+    try:
+        resources = summarize_har_file(har_file, page_index=page_index)
+    except Exception as e:
+        print(f"Warning: Could not summarize {har_file}: {e}")
+        return
+    resources["render_blocking"] = metrics.pop("renderBlocking", [])
+    resources["har"] = str(har_file)
+    metrics["resources"] = resources
+
+
+def describe_resources(resources):
+    """Short human-readable attribution lines for a budget violation"""
+    if not resources:
+        return []
+    lines = [
+        f"{resources['requests']} requests, {resources['bytes'] / 1024:.0f} KB "
+        "transferred"
+    ]
+    for kind, stats in list(resources["by_type"].items())[:3]:
+        lines.append(f"{kind}: {stats['bytes'] / 1024:.0f} KB ({stats['requests']})")
+    for chunk in resources["largest_js"][:3]:
+        lines.append(f"JS {chunk['bytes'] / 1024:.0f} KB {chunk['url']}")
+    for blocking in resources["render_blocking"][:3]:
+        lines.append(f"render-blocking {blocking['type']}: {blocking['url']}")
+    return lines
+
+
+def collect_metrics(
+    page, base_url, path="/", profile=DEFAULT_PROFILE, capture_resources=False
+):
     """Collect performance metrics from a page"""
-    print(f"📊 Collecting metrics for: {path}")
-
-    # Inject performance observers
-    page.add_init_script(
-        """
-        (() => {
-            window.__fxzMetrics = {
-                cls: 0,
-                lcp: undefined,
-                fid: undefined,
-                navigationStart: performance.timeOrigin
-            };
-            
-            if ('PerformanceObserver' in window) {
-                try {
-                    // Cumulative Layout Shift
-                    let clsValue = 0;
-                    const clsObserver = new PerformanceObserver((list) => {
-                        for (const entry of list.getEntries()) {
-                            if (!entry.hadRecentInput) {
-                                clsValue += entry.value;
-                            }
-                        }
-                        window.__fxzMetrics.cls = clsValue;
-                    });
-                    clsObserver.observe({ type: 'layout-shift', buffered: true });
-
-                    // Largest Contentful Paint
-                    const lcpObserver = new PerformanceObserver((list) => {
-                        const entries = list.getEntries();
-                        const lastEntry = entries[entries.length - 1];
-                        if (lastEntry) {
-                            window.__fxzMetrics.lcp = lastEntry.startTime;
-                        }
-                    });
-                    lcpObserver.observe({ type: 'largest-contentful-paint', buffered: true });
-
-                    // First Input Delay (approximate)
-                    const fidObserver = new PerformanceObserver((list) => {
-                        for (const entry of list.getEntries()) {
-                            window.__fxzMetrics.fid = entry.processingStart - entry.startTime;
-                        }
-                    });
-                    fidObserver.observe({ type: 'first-input', buffered: true });
-                } catch (e) {
-                    console.warn('Performance observers setup failed:', e);
-                }
-            }
-        })();
-    """
-    )
+    print(f"📊 Collecting metrics for: {path} [{profile}]")
+
+    # Inject performance observers and apply the device profile via CDP
+    session = cdp_metrics.install(page, profile)
 
     # Navigate to the page
-    full_url = f"{APP_URL}{path}"
+    full_url = f"{base_url}{path}"
     print(f"🔍 Loading: {full_url}")
 
     page.goto(full_url, wait_until="networkidle", timeout=TIMEOUT)
 
-    # Wait for page to settle
-    page.wait_for_timeout(2000)
-
-    # Collect all metrics
-    metrics = page.evaluate(
-        """
-        () => {
-            const nav = performance.getEntriesByType('navigation')[0] || {};
-            const paints = performance.getEntriesByType('paint') || [];
-            
-            const fcp = (paints.find(p => p.name === 'first-contentful-paint') || {}).startTime || 0;
-            const lcp = window.__fxzMetrics?.lcp || 0;
-            const cls = window.__fxzMetrics?.cls || 0;
-            const fid = window.__fxzMetrics?.fid || 0;
-            
-            // Navigation Timing metrics
-            const ttfb = nav.responseStart || 0;
-            const domContentLoaded = nav.domContentLoadedEventEnd || 0;
-            const loadComplete = nav.loadEventEnd || 0;
-            
-            // Calculate TTI approximation (when main thread becomes idle)
-            const tti = Math.max(fcp, domContentLoaded);
-            
-            // Total Blocking Time approximation
-            const tbt = Math.max(0, (nav.domInteractive || 0) - fcp - 50);
-            
-            // Speed Index approximation
-            const speedIndex = fcp + (lcp - fcp) * 0.5;
-            
-            return {
-                path: window.location.pathname,
-                timestamp: Date.now(),
-                ttfb: Math.round(ttfb),
-                fcp: Math.round(fcp),
-                lcp: Math.round(lcp),
-                cls: parseFloat(cls.toFixed(4)),
-                fid: Math.round(fid),
-                tti: Math.round(tti),
-                tbt: Math.round(tbt),
-                speedIndex: Math.round(speedIndex),
-                domContentLoaded: Math.round(domContentLoaded),
-                loadComplete: Math.round(loadComplete)
-            };
-        }
-    """
-    )
+    # Wait for the main thread to go quiet, then collect all metrics
+    metrics = cdp_metrics.collect(page, session)
+    metrics["path"] = metrics.pop("pathname")
+    metrics["profile"] = profile
+    if capture_resources:
+        metrics["renderBlocking"] = page.evaluate(RENDER_BLOCKING_SCRIPT)
 
     print(
-        f"✅ Metrics collected: FCP={metrics['fcp']}ms, LCP={metrics['lcp']}ms, CLS={metrics['cls']}"
+        f"✅ Metrics collected: FCP={metrics['fcp']}ms, LCP={metrics['lcp']}ms, "
+        f"CLS={metrics['cls']}, TBT={metrics['tbt']}ms "
+        f"({len(metrics['longTasks'])} long tasks), INP={metrics['inp']}ms"
     )
     return metrics
 
@@ -223,13 +146,46 @@ def load_budgets():
     return json.loads(BUDGETS_FILE.read_text())
 
 
-def check_budgets(metrics, budgets):
-    """Check if metrics meet budget requirements"""
+def _format_value(metric_key, value):
+    if metric_key in BYTE_METRICS:
+        return f"{value / 1024:.1f} KB"
+    return f"{value:.3f}" if metric_key == "cls" else f"{value:.0f}ms"
+
+
+def resolve_thresholds(matcher, path, profile=None):
+    """Budget thresholds for a path, with profile overrides merged in.
+
+    Base thresholds are pages[path], else the matching route, else global;
+    profiles[profile].global is then merged over the base, and the
+    profile's matching page or route over that. `matcher` is the
+    BudgetMatcher built once from the loaded budgets, so route patterns are
+    compiled once per run (see scripts.lib.budget_matcher).
+    """
+    return matcher.thresholds(path, profile)
+
+
+def check_budgets(metrics, matcher, defaults=None):
+    """Check if metrics meet budget requirements.
+
+    `metrics` is either a single sample ({"fcp": 1234, ...}) or a
+    multi-sample summary ({"fcp": {"p50": ..., "p75": ..., "ci": ...}}).
+    A budget is either a plain number or a per-percentile mapping such as
+    {"p75": 2500, "p95": 4000}. Plain numbers are compared against the
+    median of a summary; a single sample cannot estimate a tail, so it is
+    compared against the loosest percentile budget.
+
+    Bundle metrics (gzipped first-load JS bytes and their growth since the
+    previous build) are checked the same way; `defaults` supplies
+    thresholds the budgets file does not set.
+    """
     violations = []
     path = metrics.get("path", "/")
 
-    # Get budget thresholds (page-specific or global)
-    thresholds = budgets.get("pages", {}).get(path, budgets["global"])
+    # Get budget thresholds (profile/page-specific or global)
+    thresholds = {
+        **(defaults or {}),
+        **resolve_thresholds(matcher, path, metrics.get("profile")),
+    }
 
     checks = [
         ("fcp", "first_contentful_paint_ms", "FCP"),
@@ -238,68 +194,380 @@ def check_budgets(metrics, budgets):
         ("tbt", "total_blocking_time_ms", "TBT"),
         ("tti", "time_to_interactive_ms", "TTI"),
         ("speedIndex", "speed_index_ms", "Speed Index"),
+        ("inp", "interaction_to_next_paint_ms", "INP"),
+        ("firstLoadJs", "first_load_js_bytes", "First Load JS"),
+        ("firstLoadJsGrowth", "first_load_js_growth_bytes", "First Load JS growth"),
     ]
 
     for metric_key, budget_key, display_name in checks:
         if budget_key not in thresholds:
             continue
 
-        actual_value = metrics.get(metric_key, 0)
-        budget_value = thresholds[budget_key]
-
-        if actual_value > budget_value:
-            if metric_key == "cls":
-                violations.append(
-                    f"{display_name}: {actual_value:.3f} > {budget_value:.3f}"
+        actual = metrics.get(metric_key)
+        if actual is None:
+            continue
+        budget = thresholds[budget_key]
+
+        if isinstance(actual, dict):
+            limits = budget if isinstance(budget, dict) else {"p50": budget}
+            for pct_key, budget_value in limits.items():
+                actual_value = actual.get(pct_key)
+                if actual_value is None or actual_value <= budget_value:
+                    continue
+                ci = (actual.get("ci") or {}).get(pct_key)
+                ci_text = (
+                    f" (95% CI {_format_value(metric_key, ci[0])}"
+                    f"–{_format_value(metric_key, ci[1])})"
+                    if ci
+                    else ""
                 )
-            else:
                 violations.append(
-                    f"{display_name}: {actual_value}ms > {budget_value}ms"
+                    f"{display_name} {pct_key}: "
+                    f"{_format_value(metric_key, actual_value)} > "
+                    f"{_format_value(metric_key, budget_value)}{ci_text}"
                 )
+            continue
+
+        budget_value = max(budget.values()) if isinstance(budget, dict) else budget
+        if actual > budget_value:
+            violations.append(
+                f"{display_name}: {_format_value(metric_key, actual)} > "
+                f"{_format_value(metric_key, budget_value)}"
+            )
 
     return violations
 
 
-def main():
+def check_bundles(matcher):
+    """Enforce first-load JS budgets on the current .next build.
+
+    Every route's gzipped first-load JS is checked against
+    `first_load_js_bytes`, and its growth since the previous recorded build
+    against `first_load_js_growth_bytes` (FXZ_BUNDLE_GROWTH_KB by default).
+    The build is then appended to the bundle history.
+    """
+    analysis = analyze_build()
+    previous = previous_build(analysis["build_id"])
+    before = (previous or {}).get("routes", {})
+    defaults = {"first_load_js_growth_bytes": BUNDLE_GROWTH_BYTES}
+
+    results, violations = [], []
+    for route, stats in analysis["routes"].items():
+        metrics = {"path": route, "firstLoadJs": stats["first_load_gzip"]}
+        if route in before:
+            metrics["firstLoadJsGrowth"] = (
+                stats["first_load_gzip"] - before[route]["first_load_gzip"]
+            )
+        route_violations = check_budgets(metrics, matcher, defaults)
+        results.append({**metrics, "violations": route_violations})
+        violations.extend(f"{route}: {v}" for v in route_violations)
+
+    record_build(analysis)
+    report = {
+        "timestamp": analysis["timestamp"],
+        "build_id": analysis["build_id"],
+        "previous_build_id": previous and previous["build_id"],
+        "shared_gzip": analysis["shared"]["gzip"],
+        "routes": results,
+        "grown_chunks": chunk_growth(analysis, previous) if previous else [],
+        "violations": violations,
+        "passed": not violations,
+    }
+    (ART / "perf-bundles.json").write_text(json.dumps(report, indent=2))
+    return report
+
+
+def sample_path(
+    browser,
+    base_url,
+    path,
+    samples,
+    cache,
+    profile=DEFAULT_PROFILE,
+    har=False,
+    storage_state=None,
+):
+    """Take `samples` navigations of `path` with a cold or warm cache.
+
+    Cold samples use a brand-new browser context per navigation. Warm
+    samples share one context that is primed with an unmeasured
+    navigation first, so every measured load hits a populated HTTP cache.
+    Each sample runs in a fresh page so observers never accumulate.
+
+    With `har`, every context records a HAR; warm samples share one HAR
+    and are attributed by page order (the primer is page 0).
+    """
+    results = []
+
+    if cache == "warm":
+        har_file = har_path_for(HAR_DIR, path, profile, cache) if har else None
+        context = new_context(browser, profile, har_file, storage_state)
+        try:
+            primer = context.new_page()
+            cdp_metrics.install(primer, profile)
+            primer.goto(f"{base_url}{path}", wait_until="networkidle", timeout=TIMEOUT)
+            primer.close()
+            for _ in range(samples):
+                page = context.new_page()
+                results.append(collect_metrics(page, base_url, path, profile, har))
+                page.close()
+        finally:
+            context.close()
+        if har_file:
+            for i, metrics in enumerate(results):
+                attach_resources(metrics, har_file, page_index=i + 1)
+        return results
+
+    for i in range(samples):
+        har_file = har_path_for(HAR_DIR, path, profile, cache, i) if har else None
+        context = new_context(browser, profile, har_file, storage_state)
+        try:
+            metrics = collect_metrics(context.new_page(), base_url, path, profile, har)
+        finally:
+            context.close()
+        if har_file:
+            attach_resources(metrics, har_file)
+        results.append(metrics)
+
+    return results
+
+
+def summarize_samples(path, cache, samples, profile=DEFAULT_PROFILE):
+    """Reduce raw samples to per-metric percentiles with bootstrap CIs"""
+    summary = {
+        "path": path,
+        "profile": profile,
+        "cache": cache,
+        "samples": len(samples),
+    }
+    for key in SAMPLED_METRICS:
+        summary[key] = summarize(s.get(key) for s in samples)
+    return summary
+
+
+def run_single_sample(
+    browser,
+    base_url,
+    test_paths,
+    matcher,
+    profile=DEFAULT_PROFILE,
+    har=False,
+    storage_state=None,
+):
+    """Default mode: one navigation per path, each in a fresh context"""
+    all_metrics = []
+    all_violations = []
+
+    for path in test_paths:
+        print(f"\n🧪 Testing: {path}")
+
+        try:
+            har_file = har_path_for(HAR_DIR, path, profile) if har else None
+            context = new_context(browser, profile, har_file, storage_state)
+            try:
+                metrics = collect_metrics(
+                    context.new_page(), base_url, path, profile, har
+                )
+            finally:
+                context.close()
+            if har_file:
+                attach_resources(metrics, har_file)
+            all_metrics.append(metrics)
+
+            violations = check_budgets(metrics, matcher)
+            if violations:
+                all_violations.extend([f"{path}: {v}" for v in violations])
+                print(f"❌ Budget violations for {path}:")
+                for violation in violations:
+                    print(f"   • {violation}")
+                for line in describe_resources(metrics.get("resources") or {}):
+                    print(f"     ↳ {line}")
+            else:
+                print(f"✅ {path} meets all budget requirements")
+
+        except Exception as e:
+            print(f"❌ Failed to test {path}: {e}")
+            all_violations.append(f"{path}: Test failed - {e}")
+
+    return all_metrics, [], all_violations
+
+
+def run_multi_sample(
+    browser,
+    base_url,
+    test_paths,
+    matcher,
+    samples,
+    caches,
+    profile=DEFAULT_PROFILE,
+    har=False,
+    storage_state=None,
+):
+    """Statistical mode: N cold and/or warm navigations per path"""
+    all_metrics = []
+    summaries = []
+    all_violations = []
+
+    for path in test_paths:
+        for cache in caches:
+            print(f"\n🧪 Testing: {path} ({samples} {cache}-cache samples)")
+
+            try:
+                raw = sample_path(
+                    browser,
+                    base_url,
+                    path,
+                    samples,
+                    cache,
+                    profile,
+                    har,
+                    storage_state,
+                )
+                all_metrics.extend(raw)
+
+                summary = summarize_samples(path, cache, raw, profile)
+                summaries.append(summary)
+                for key in ("fcp", "lcp", "cls"):
+                    stats = summary[key]
+                    print(
+                        f"   {key.upper()}: p50={stats['p50']} p75={stats['p75']} "
+                        f"p95={stats['p95']}"
+                    )
+
+                violations = check_budgets(summary, matcher)
+                if violations:
+                    all_violations.extend(
+                        [f"{path} [{cache}]: {v}" for v in violations]
+                    )
+                    print(f"❌ Budget violations for {path} [{cache}]:")
+                    for violation in violations:
+                        print(f"   • {violation}")
+                    worst = max(raw, key=lambda m: m.get("lcp", 0))
+                    for line in describe_resources(worst.get("resources") or {}):
+                        print(f"     ↳ {line}")
+                else:
+                    print(f"✅ {path} [{cache}] meets all budget requirements")
+
+            except Exception as e:
+                print(f"❌ Failed to test {path} [{cache}]: {e}")
+                all_violations.append(f"{path} [{cache}]: Test failed - {e}")
+
+    return all_metrics, summaries, all_violations
+
+
+def main(args: argparse.Namespace = None):
     """Main performance testing function"""
+    if args is None:
+        parser = argparse.ArgumentParser(description="Enforce performance budgets")
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=SAMPLES,
+            help="Navigations per path and cache mode (default: FXZ_PERF_SAMPLES or 1)",
+        )
+        parser.add_argument(
+            "--cache",
+            choices=["cold", "warm", "both"],
+            default="both",
+            help="Cache state to sample in multi-sample mode",
+        )
+        parser.add_argument(
+            "--profile",
+            choices=sorted(PROFILES),
+            default=DEFAULT_PROFILE,
+            help="Device profile (default: FXZ_PERF_PROFILE or desktop-fast)",
+        )
+        parser.add_argument(
+            "--har",
+            action="store_true",
+            help="Record a HAR per navigation and attribute bytes per route",
+        )
+        parser.add_argument(
+            "--role",
+            default=DEFAULT_ROLE,
+            help=f"Log in once as this role ({', '.join(ROLES)}; default: "
+            "FXZ_PERF_ROLE or anonymous)",
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            help="App backend to measure (default: from FXZ_APP_ENTRY)",
+        )
+        parser.add_argument(
+            "--bundles-only",
+            action="store_true",
+            help="Only check first-load JS budgets of the Next.js build",
+        )
+        args = parser.parse_args()
+
     print("🎯 Starting Performance Budget Testing")
     print("=" * 50)
 
     budgets = load_budgets()
-    all_metrics = []
-    all_violations = []
+    matcher = BudgetMatcher(budgets)
+    caches = ["cold", "warm"] if args.cache == "both" else [args.cache]
+    entry = resolve_entry(args.server, STREAMLIT_FILE)
+
+    if args.bundles_only or is_next_entry(entry):
+        # Byte budgets need no browser, so a bloated build fails here first
+        ensure_next_build()
+        bundles = check_bundles(matcher)
+        print(
+            f"📦 First-load JS checked for {len(bundles['routes'])} routes "
+            f"(build {bundles['build_id']})"
+        )
+        if bundles["violations"]:
+            print(f"❌ Found {len(bundles['violations'])} bundle budget violations:")
+            for violation in bundles["violations"]:
+                print(f"   • {violation}")
+            for chunk in bundles["grown_chunks"][:5]:
+                label = "new" if chunk["new"] else "grew"
+                print(
+                    f"   ↳ {chunk['chunk']} ({label}, "
+                    f"+{_format_value('firstLoadJs', chunk['growth'])})"
+                )
+            (ART / "perf-budget-violations.txt").write_text(
+                "\n".join(bundles["violations"])
+            )
+            sys.exit(1)
+        print("✅ All routes meet first-load JS budgets")
+        if args.bundles_only:
+            return 0
 
-    # Test pages
-    test_paths = ["/"]  # Add more paths as needed
+    # Test pages (routes.txt or the app/ route manifest)
+    test_paths = get_routes_to_test()
+    print(f"📍 Paths to test: {', '.join(test_paths)}")
 
-    with run_streamlit():
+    with app_server(entry=entry) as server:
+        storage_state = ensure_storage_state(server.url, args.role)
         with sync_playwright() as p:
             browser = p.chromium.launch(
                 headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
             )
-            context = browser.new_context(viewport={"width": 1366, "height": 768})
-            page = context.new_page()
 
             try:
-                for path in test_paths:
-                    print(f"\n🧪 Testing: {path}")
-
-                    try:
-                        metrics = collect_metrics(page, path)
-                        all_metrics.append(metrics)
-
-                        violations = check_budgets(metrics, budgets)
-                        if violations:
-                            all_violations.extend([f"{path}: {v}" for v in violations])
-                            print(f"❌ Budget violations for {path}:")
-                            for violation in violations:
-                                print(f"   • {violation}")
-                        else:
-                            print(f"✅ {path} meets all budget requirements")
-
-                    except Exception as e:
-                        print(f"❌ Failed to test {path}: {e}")
-                        all_violations.append(f"{path}: Test failed - {e}")
+                if args.samples > 1:
+                    all_metrics, summaries, all_violations = run_multi_sample(
+                        browser,
+                        server.url,
+                        test_paths,
+                        matcher,
+                        args.samples,
+                        caches,
+                        args.profile,
+                        args.har,
+                        storage_state,
+                    )
+                else:
+                    all_metrics, summaries, all_violations = run_single_sample(
+                        browser,
+                        server.url,
+                        test_paths,
+                        matcher,
+                        args.profile,
+                        args.har,
+                        storage_state,
+                    )
 
             finally:
                 browser.close()
@@ -309,6 +577,7 @@ def main():
         "timestamp": int(time.time() * 1000),
         "budgets": budgets,
         "metrics": all_metrics,
+        "summaries": summaries,
         "violations": all_violations,
         "passed": len(all_violations) == 0,
     }
@@ -316,8 +585,20 @@ def main():
     (ART / "perf-budget-results.json").write_text(json.dumps(results, indent=2))
 
     if all_metrics:
-        # Save latest metrics for health dashboard
-        (ART / "perf-metrics.json").write_text(json.dumps(all_metrics[-1], indent=2))
+        # Save latest metrics for health dashboard (the root page when tested)
+        latest = next(
+            (m for m in reversed(all_metrics) if m.get("path") == "/"), all_metrics[-1]
+        )
+        (ART / "perf-metrics.json").write_text(json.dumps(latest, indent=2))
+
+    resources = {
+        f"{m['path']} [{m['profile']}]": m["resources"]
+        for m in all_metrics
+        if m.get("resources")
+    }
+    if resources:
+        # Compact per-route byte attribution (last sample per route)
+        (ART / "perf-resources.json").write_text(json.dumps(resources, indent=2))
 
     # Report results
     print("\n" + "=" * 50)
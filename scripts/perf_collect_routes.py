@@ -4,170 +4,57 @@ Performance Collection for Multiple Routes
 Collects performance metrics across multiple routes for trend analysis
 """
 
+import argparse
 import json
 import os
 import sys
 import time
-import subprocess
-import signal
 import pathlib
-from contextlib import contextmanager
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from playwright.sync_api import sync_playwright
-from datetime import datetime
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib import cdp_metrics
+from scripts.lib.app_server import SERVERS, app_server, resolve_entry
+from scripts.lib.auth_state import DEFAULT_ROLE, ROLES, ensure_storage_state
+from scripts.lib.device_profiles import DEFAULT_PROFILE, PROFILES, context_options
+from scripts.lib.route_manifest import get_routes_to_test
+from scripts.lib.trace_summary import TRACE_CATEGORIES, summarize_trace
+from scripts.lib.trend_store import TrendStore
+from scripts.lib.perf_stats import percentile
+from scripts.perf_regressions import (
+    MIN_CURRENT_SAMPLES,
+    detect_regressions,
+    write_report,
+)
 
 # Configuration
 ART = pathlib.Path("artifacts")
 ART.mkdir(exist_ok=True)
 
-ROUTES_FILE = pathlib.Path("routes.txt")
-TRENDS_FILE = ART / "perf-trends.json"
+TRENDS_FILE = ART / "perf-trends.json"  # legacy format, imported once
+TRENDS_DB = ART / "perf-trends.db"
+TRACES_DIR = ART / "traces"
 STREAMLIT_FILE = os.environ.get("FXZ_APP_ENTRY", "app.py")
-APP_PORT = int(os.environ.get("FXZ_APP_PORT", "5000"))
-APP_URL = f"http://localhost:{APP_PORT}"
 
 TIMEOUT = 60_000  # 60 seconds
+WORKERS = int(os.environ.get("FXZ_PERF_WORKERS", "1"))
+# Navigations per route; enough for a rank test against the baseline
+SAMPLES = int(os.environ.get("FXZ_SWEEP_SAMPLES", str(MIN_CURRENT_SAMPLES)))
 
 
-def get_routes_to_test():
-    """Get routes from routes.txt file"""
-    if not ROUTES_FILE.exists():
-        print("No routes.txt file found, testing root route only")
-        return ["/"]
-
-    try:
-        routes = []
-        with open(ROUTES_FILE, "r") as f:
-            for line in f:
-                route = line.strip()
-                if route and not route.startswith("#"):
-                    if not route.startswith("/"):
-                        route = "/" + route
-                    routes.append(route)
-
-        return routes if routes else ["/"]
-
-    except Exception as e:
-        print(f"Error reading routes.txt: {e}")
-        return ["/"]
-
-
-@contextmanager
-def run_streamlit():
-    """Launch Streamlit app and wait for it to be ready"""
-    print(f"🚀 Starting Streamlit app on port {APP_PORT}...")
-
-    proc = subprocess.Popen(
-        [
-            "streamlit",
-            "run",
-            STREAMLIT_FILE,
-            "--server.port",
-            str(APP_PORT),
-            "--server.headless",
-            "true",
-            "--server.address",
-            "0.0.0.0",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-
-    try:
-        # Wait until server is up
-        started = False
-        t0 = time.time()
-
-        while time.time() - t0 < 40:
-            if proc.poll() is not None:
-                raise RuntimeError(
-                    f"Streamlit process exited early with code {proc.returncode}"
-                )
-
-            if proc.stdout:
-                line = proc.stdout.readline()
-            else:
-                line = ""
-            if not line:
-                time.sleep(0.1)
-                continue
-
-            print(f"📡 {line.strip()}")
-
-            if "Running on" in line and f":{APP_PORT}/" in line:
-                started = True
-                print("✅ Streamlit server is ready!")
-                break
-
-        if not started:
-            raise RuntimeError("Streamlit did not start in time.")
-
-        # Give it a moment to fully initialize
-        time.sleep(2)
-        yield
-
-    finally:
-        print("🛑 Shutting down Streamlit...")
-        try:
-            os.kill(proc.pid, signal.SIGTERM)
-            proc.wait(timeout=5)
-        except Exception as e:
-            print(f"Warning: Failed to gracefully shutdown: {e}")
-            try:
-                os.kill(proc.pid, signal.SIGKILL)
-            except Exception:
-                pass
-
-
-def collect_route_metrics(page, route="/"):
+def collect_route_metrics(page, base_url, route="/", profile=DEFAULT_PROFILE):
     """Collect performance metrics for a specific route"""
-    print(f"📊 Collecting metrics for: {route}")
-
-    # Inject performance observers
-    page.add_init_script(
-        """
-        (() => {
-            window.__fxzMetrics = {
-                cls: 0,
-                lcp: undefined,
-                fid: undefined,
-                navigationStart: performance.timeOrigin
-            };
-            
-            if ('PerformanceObserver' in window) {
-                try {
-                    // Cumulative Layout Shift
-                    let clsValue = 0;
-                    const clsObserver = new PerformanceObserver((list) => {
-                        for (const entry of list.getEntries()) {
-                            if (!entry.hadRecentInput) {
-                                clsValue += entry.value;
-                            }
-                        }
-                        window.__fxzMetrics.cls = clsValue;
-                    });
-                    clsObserver.observe({ type: 'layout-shift', buffered: true });
-
-                    // Largest Contentful Paint
-                    const lcpObserver = new PerformanceObserver((list) => {
-                        const entries = list.getEntries();
-                        const lastEntry = entries[entries.length - 1];
-                        if (lastEntry) {
-                            window.__fxzMetrics.lcp = lastEntry.startTime;
-                        }
-                    });
-                    lcpObserver.observe({ type: 'largest-contentful-paint', buffered: true });
-
-                } catch (e) {
-                    console.warn('Performance observers setup failed:', e);
-                }
-            }
-        })();
-    """
-    )
+    print(f"📊 Collecting metrics for: {route} [{profile}]")
+
+    # Inject performance observers and apply the device profile via CDP
+    session = cdp_metrics.install(page, profile)
 
     # Navigate to the route
-    full_url = f"{APP_URL}{route}"
+    full_url = f"{base_url}{route}"
     print(f"🔍 Loading: {full_url}")
 
     try:
@@ -176,54 +63,16 @@ def collect_route_metrics(page, route="/"):
         print(f"❌ Failed to load {route}: {e}")
         return None
 
-    # Wait for page to settle
-    page.wait_for_timeout(2000)
-
-    # Collect all metrics
+    # Wait for the main thread to go quiet, then collect all metrics
     try:
-        metrics = page.evaluate(
-            """
-            () => {
-                const nav = performance.getEntriesByType('navigation')[0] || {};
-                const paints = performance.getEntriesByType('paint') || [];
-                
-                const fcp = (paints.find(p => p.name === 'first-contentful-paint') || {}).startTime || 0;
-                const lcp = window.__fxzMetrics?.lcp || 0;
-                const cls = window.__fxzMetrics?.cls || 0;
-                
-                // Navigation Timing metrics
-                const ttfb = nav.responseStart || 0;
-                const domContentLoaded = nav.domContentLoadedEventEnd || 0;
-                const loadComplete = nav.loadEventEnd || 0;
-                
-                // Calculate TTI approximation
-                const tti = Math.max(fcp, domContentLoaded);
-                
-                // Total Blocking Time approximation
-                const tbt = Math.max(0, (nav.domInteractive || 0) - fcp - 50);
-                
-                // Speed Index approximation
-                const speedIndex = fcp + (lcp - fcp) * 0.5;
-                
-                return {
-                    route: window.location.pathname,
-                    timestamp: Date.now(),
-                    ttfb: Math.round(ttfb),
-                    fcp: Math.round(fcp),
-                    lcp: Math.round(lcp),
-                    cls: parseFloat(cls.toFixed(4)),
-                    tti: Math.round(tti),
-                    tbt: Math.round(tbt),
-                    speedIndex: Math.round(speedIndex),
-                    domContentLoaded: Math.round(domContentLoaded),
-                    loadComplete: Math.round(loadComplete)
-                };
-            }
-        """
-        )
+        metrics = cdp_metrics.collect(page, session)
+        metrics["route"] = metrics.pop("pathname")
+        metrics["profile"] = profile
 
         print(
-            f"✅ Metrics collected: FCP={metrics['fcp']}ms, LCP={metrics['lcp']}ms, CLS={metrics['cls']}"
+            f"✅ Metrics collected: FCP={metrics['fcp']}ms, LCP={metrics['lcp']}ms, "
+            f"CLS={metrics['cls']}, TBT={metrics['tbt']}ms "
+            f"({len(metrics['longTasks'])} long tasks)"
         )
         return metrics
 
@@ -232,120 +81,275 @@ def collect_route_metrics(page, route="/"):
         return None
 
 
-def load_existing_trends():
-    """Load existing trend data"""
-    if TRENDS_FILE.exists():
+def open_trend_store():
+    """Open the trend store, importing a legacy perf-trends.json once"""
+    store = TrendStore(TRENDS_DB)
+    if store.is_empty() and TRENDS_FILE.exists():
+        try:
+            imported = store.import_json(TRENDS_FILE)
+            print(f"📥 Imported {imported} legacy samples from {TRENDS_FILE}")
+        except Exception as e:
+            print(f"Warning: Could not import {TRENDS_FILE}: {e}")
+    return store
+
+
+def trace_path_for(route, profile):
+    """Where the raw Chromium trace for a route is kept"""
+    slug = re.sub(r"[^\w\-]+", "_", route.strip("/")) or "root"
+    return TRACES_DIR / f"{slug}-{profile}.json"
+
+
+def traced_route_metrics(browser, page, base_url, route, profile):
+    """Collect route metrics while recording a Chromium performance trace.
+
+    The trace is reduced to a main-thread breakdown and top functions,
+    stored on the metrics as "trace"; the raw trace is written to disk
+    and pruned later unless the route regresses.
+    """
+    browser.start_tracing(page=page, categories=TRACE_CATEGORIES)
+    try:
+        metrics = collect_route_metrics(page, base_url, route, profile)
+    finally:
+        raw = browser.stop_tracing()
+
+    if metrics:
         try:
-            return json.loads(TRENDS_FILE.read_text())
-        except Exception:
-            pass
-
-    return {"version": "1.0", "created_at": datetime.now().isoformat(), "trends": {}}
-
-
-def save_trends(trends_data):
-    """Save trend data to file"""
-    trends_data["updated_at"] = datetime.now().isoformat()
-    TRENDS_FILE.write_text(json.dumps(trends_data, indent=2))
-
-
-def add_metrics_to_trends(trends_data, metrics):
-    """Add new metrics to trend data"""
-    if not metrics:
-        return
-
-    route = metrics.get("route", "/")
-    timestamp = metrics.get("timestamp")
-    date_key = datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d")
-
-    # Initialize route data if not exists
-    if route not in trends_data["trends"]:
-        trends_data["trends"][route] = {
-            "route": route,
-            "samples": [],
-            "daily_averages": {},
-        }
-
-    # Add sample
-    trends_data["trends"][route]["samples"].append(metrics)
-
-    # Keep only last 100 samples per route
-    trends_data["trends"][route]["samples"] = trends_data["trends"][route]["samples"][
-        -100:
-    ]
-
-    # Calculate daily average for this date
-    date_samples = [
-        sample
-        for sample in trends_data["trends"][route]["samples"]
-        if datetime.fromtimestamp(sample["timestamp"] / 1000).strftime("%Y-%m-%d")
-        == date_key
-    ]
-
-    if date_samples:
-        daily_avg = {
-            "date": date_key,
-            "samples_count": len(date_samples),
-            "fcp_avg": sum(s.get("fcp", 0) for s in date_samples) / len(date_samples),
-            "lcp_avg": sum(s.get("lcp", 0) for s in date_samples) / len(date_samples),
-            "cls_avg": sum(s.get("cls", 0) for s in date_samples) / len(date_samples),
-            "ttfb_avg": sum(s.get("ttfb", 0) for s in date_samples) / len(date_samples),
-        }
-
-        trends_data["trends"][route]["daily_averages"][date_key] = daily_avg
-
-
-def main():
+            metrics["trace"] = summarize_trace(raw)
+            TRACES_DIR.mkdir(exist_ok=True)
+            trace_path_for(metrics["route"], profile).write_bytes(raw)
+        except Exception as e:
+            print(f"Warning: Could not summarize trace for {route}: {e}")
+    return metrics
+
+
+def prune_traces(keep_routes, profile):
+    """Delete raw traces for this profile except those of `keep_routes`"""
+    if not TRACES_DIR.exists():
+        return []
+    keep = {trace_path_for(route, profile) for route in keep_routes}
+    kept = []
+    for trace_file in TRACES_DIR.glob(f"*-{profile}.json"):
+        if trace_file in keep:
+            kept.append(trace_file)
+        else:
+            trace_file.unlink(missing_ok=True)
+    return kept
+
+
+def shard_routes(routes, workers):
+    """Split routes round-robin into at most `workers` non-empty shards"""
+    workers = max(1, min(workers, len(routes)))
+    return [routes[i::workers] for i in range(workers)]
+
+
+def collect_shard(
+    base_url,
+    routes,
+    profile=DEFAULT_PROFILE,
+    trace=False,
+    storage_state=None,
+    samples=1,
+):
+    """Collect metrics for a shard of routes in its own browser.
+
+    Every route is loaded `samples` times, each in a fresh browser context
+    and page so observers, caches and storage never leak between
+    measurements; authenticated sweeps seed each context from the saved
+    `storage_state` file. Only the first sample of a route is traced.
+    Returns a list of (route, metrics) tuples, one per sample; metrics is
+    None when collection failed.
+    """
+    results = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(
+            headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
+        )
+        try:
+            for route in routes:
+                print(f"\n🧪 Testing: {route} ({samples} samples)")
+                for i in range(samples):
+                    context = browser.new_context(
+                        **context_options(profile), storage_state=storage_state
+                    )
+                    try:
+                        page = context.new_page()
+                        if trace and i == 0:
+                            metrics = traced_route_metrics(
+                                browser, page, base_url, route, profile
+                            )
+                        else:
+                            metrics = collect_route_metrics(
+                                page, base_url, route, profile
+                            )
+                        results.append((route, metrics))
+                    finally:
+                        context.close()
+        finally:
+            browser.close()
+
+    return results
+
+
+def collect_all(
+    base_url,
+    routes,
+    workers=1,
+    profile=DEFAULT_PROFILE,
+    trace=False,
+    storage_state=None,
+    samples=1,
+):
+    """Collect metrics for all routes, sharding across worker processes.
+
+    Results are returned in the order of `routes` regardless of which
+    worker finished first.
+    """
+    shards = shard_routes(routes, workers)
+    if len(shards) <= 1:
+        collected = collect_shard(
+            base_url, routes, profile, trace, storage_state, samples
+        )
+    else:
+        print(f"⚙️  Sharding {len(routes)} routes across {len(shards)} workers")
+        collected = []
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            futures = [
+                pool.submit(
+                    collect_shard,
+                    base_url,
+                    shard,
+                    profile,
+                    trace,
+                    storage_state,
+                    samples,
+                )
+                for shard in shards
+            ]
+            for future in as_completed(futures):
+                collected.extend(future.result())
+
+    # Stable sort, so a route's samples stay in the order they were taken
+    order = {route: i for i, route in enumerate(routes)}
+    collected.sort(key=lambda item: order.get(item[0], len(order)))
+    return collected
+
+
+def main(args: argparse.Namespace = None):
     """Main function to collect performance trends"""
+    if args is None:
+        parser = argparse.ArgumentParser(
+            description="Collect performance metrics across routes"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Number of parallel browser workers (default: FXZ_PERF_WORKERS or 1)",
+        )
+        parser.add_argument(
+            "--profile",
+            choices=sorted(PROFILES),
+            default=DEFAULT_PROFILE,
+            help="Device profile (default: FXZ_PERF_PROFILE or desktop-fast)",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=SAMPLES,
+            help="Navigations per route (default: FXZ_SWEEP_SAMPLES or "
+            f"{MIN_CURRENT_SAMPLES}); fewer weakens regression detection",
+        )
+        parser.add_argument(
+            "--trace",
+            action="store_true",
+            help="Record a Chromium trace per route (raw kept only on regression)",
+        )
+        parser.add_argument(
+            "--role",
+            default=DEFAULT_ROLE,
+            help=f"Log in once as this role ({', '.join(ROLES)}; default: "
+            "FXZ_PERF_ROLE or anonymous)",
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            help="App backend to measure (default: from FXZ_APP_ENTRY)",
+        )
+        args = parser.parse_args()
+
     print("🎯 Starting Performance Trend Collection")
     print("=" * 50)
 
     routes = get_routes_to_test()
     print(f"📍 Routes to test: {', '.join(routes)}")
 
-    # Load existing trends
-    trends_data = load_existing_trends()
     all_metrics = []
 
-    with run_streamlit():
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
-            )
-            context = browser.new_context(viewport={"width": 1366, "height": 768})
-            page = context.new_page()
-
-            try:
-                for route in routes:
-                    print(f"\n🧪 Testing: {route}")
+    t0 = time.time()
+    with app_server(entry=resolve_entry(args.server, STREAMLIT_FILE)) as server:
+        storage_state = ensure_storage_state(server.url, args.role)
+        collected = collect_all(
+            server.url,
+            routes,
+            workers=args.workers,
+            profile=args.profile,
+            trace=args.trace,
+            storage_state=storage_state,
+            samples=max(1, args.samples),
+        )
 
-                    metrics = collect_route_metrics(page, route)
-                    if metrics:
-                        all_metrics.append(metrics)
-                        add_metrics_to_trends(trends_data, metrics)
-                    else:
-                        print(f"❌ Failed to collect metrics for {route}")
+    for route, metrics in collected:
+        if metrics:
+            all_metrics.append(metrics)
+        else:
+            print(f"❌ Failed to collect metrics for {route}")
 
-            finally:
-                browser.close()
+    print(f"⏱️  Sweep finished in {time.time() - t0:.1f}s")
 
     # Save trends
     if all_metrics:
-        save_trends(trends_data)
+        with open_trend_store() as store:
+            store.append_many(all_metrics)
+            compaction = store.compact()
+            regressions = detect_regressions(
+                store, since_ms=int(t0 * 1000), profile=args.profile
+            )
+        print(
+            f"🗜️  Trend compaction: {compaction['finalized']} buckets finalized, "
+            f"{compaction['samples_pruned']} raw samples and "
+            f"{compaction['hourly_pruned']} hourly rollups expired"
+        )
+        if args.trace:
+            regressed = {r["route"] for r in regressions["regressions"]}
+            kept = {str(f) for f in prune_traces(regressed, args.profile)}
+            for r in regressions["regressions"]:
+                trace_file = str(trace_path_for(r["route"], args.profile))
+                if trace_file in kept:
+                    r["trace"] = trace_file
+            print(f"🧵 Kept {len(kept)} raw trace(s) for regressed routes")
+        write_report(regressions)
 
         # Also save individual metrics for compatibility
         (ART / "perf-routes-latest.json").write_text(json.dumps(all_metrics, indent=2))
 
-        print(f"\n✅ Collected metrics for {len(all_metrics)} routes")
-        print(f"💾 Trends saved to: {TRENDS_FILE}")
-
-        # Show summary
+        by_route = {}
         for metrics in all_metrics:
-            route = metrics["route"]
-            fcp = metrics["fcp"]
-            lcp = metrics["lcp"]
-            cls = metrics["cls"]
-            print(f"   📊 {route}: FCP={fcp}ms, LCP={lcp}ms, CLS={cls}")
+            by_route.setdefault(metrics["route"], []).append(metrics)
+        print(
+            f"\n✅ Collected {len(all_metrics)} samples for {len(by_route)} routes"
+        )
+        print(f"💾 Trends saved to: {TRENDS_DB}")
+
+        # Show summary (medians across each route's samples)
+        for route, samples in by_route.items():
+            fcp, lcp, cls = (
+                percentile([s[k] for s in samples if s.get(k) is not None], 50)
+                for k in ("fcp", "lcp", "cls")
+            )
+            print(
+                f"   📊 {route} (n={len(samples)}): FCP={fcp}ms, LCP={lcp}ms, "
+                f"CLS={cls}"
+            )
     else:
         print("❌ No metrics collected")
         return 1
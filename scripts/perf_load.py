@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTTP Load Generation for Routes
+Drives increasing concurrency levels against the locally launched app with
+keep-alive connections and records TTFB and full-response latency per route,
+producing latency-vs-throughput curves to show where the server saturates
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib.app_server import SERVERS, app_server, resolve_entry
+from scripts.lib.auth_state import (
+    DEFAULT_ROLE,
+    ROLES,
+    cookie_header,
+    ensure_storage_state,
+)
+from scripts.lib.perf_stats import percentile
+from scripts.lib.route_manifest import get_routes_to_test
+
+# Configuration
+ART = pathlib.Path("artifacts")
+ART.mkdir(exist_ok=True)
+
+STREAMLIT_FILE = os.environ.get("FXZ_APP_ENTRY", "app.py")
+LOAD_FILE = ART / "perf-load.json"
+
+CONCURRENCY_STEPS = [1, 2, 4, 8, 16, 32]
+STEP_DURATION = 10.0  # seconds per route per concurrency level
+# Routes loaded by default; the full manifest would take hours
+ROUTE_LIMIT = int(os.environ.get("FXZ_LOAD_ROUTE_LIMIT", "5"))
+REQUEST_TIMEOUT = 30.0
+# Reconnect delay after a failed request, doubling while failures persist
+RECONNECT_BACKOFF = 0.05
+RECONNECT_BACKOFF_MAX = 1.0
+
+# Histogram bucket upper bounds in ms (last bucket is open-ended)
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+# A step is past the knee when throughput gains stall while p95 latency climbs
+KNEE_MIN_THROUGHPUT_GAIN = 0.10
+KNEE_MIN_LATENCY_GROWTH = 1.5
+
+
+class KeepAliveConnection:
+    """Minimal HTTP/1.1 client connection reused across requests"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+    async def _read_body(self, headers):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            size = 0
+            while True:
+                line = await self.reader.readline()
+                chunk = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if chunk == 0:
+                    # Trailers end with an empty line
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return size
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            await self.reader.readexactly(length)
+            return length
+        # No length: the body ends with the connection, so it can't be reused
+        body = await self.reader.read()
+        await self.close()
+        return len(body)
+
+    async def get(self, path, headers=None):
+        """Issue a GET and return (status, ttfb_s, total_s, bytes)"""
+        return await self.request("GET", path, headers=headers, accept="text/html,*/*")
+
+    async def request(self, method, path, body=None, headers=None, accept="*/*"):
+        """Issue any request and return (status, ttfb_s, total_s, bytes)"""
+        if self.writer is None:
+            await self._connect()
+
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            f"Accept: {accept}",
+            "User-Agent: fixzit-perf-load",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+        start = time.perf_counter()
+        self.writer.write(request)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        ttfb = time.perf_counter() - start
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        # HEAD, 1xx, 204 and 304 responses never carry a body
+        no_body = method == "HEAD" or status in (204, 304) or status < 200
+        size = 0 if no_body else await self._read_body(headers)
+        total = time.perf_counter() - start
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, ttfb, total, size
+
+
+def record_error(errors, exc):
+    """Count a failed request in `errors`, keyed by exception type"""
+    errors["count"] += 1
+    name = type(exc).__name__
+    errors["types"][name] = errors["types"].get(name, 0) + 1
+
+
+def reconnect_delay(failures):
+    """Backoff before reconnecting after `failures` consecutive errors"""
+    return min(RECONNECT_BACKOFF * 2 ** (failures - 1), RECONNECT_BACKOFF_MAX)
+
+
+def histogram(values_ms):
+    """Counts per latency bucket: [{"le": bound_ms, "count": n}, ...]"""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in values_ms:
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    bounds = HISTOGRAM_BOUNDS_MS + [None]
+    return [{"le": b, "count": c} for b, c in zip(bounds, counts)]
+
+
+def latency_summary(values_ms):
+    return {
+        "p50": round(percentile(values_ms, 50), 2) if values_ms else None,
+        "p95": round(percentile(values_ms, 95), 2) if values_ms else None,
+        "p99": round(percentile(values_ms, 99), 2) if values_ms else None,
+        "histogram": histogram(values_ms),
+    }
+
+
+async def run_step(host, port, route, concurrency, duration, cookie=None):
+    """Hammer one route with `concurrency` keep-alive workers for `duration`.
+
+    Redirects are not followed; they are counted separately and kept out
+    of the latency histograms, since they only time the redirect itself
+    (e.g. middleware sending an anonymous request to /login).
+    """
+    ttfbs, totals = [], []
+    errors = {"count": 0, "status": {}, "types": {}}
+    redirects = {}
+    headers = {"Cookie": cookie} if cookie else None
+    transferred = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal transferred
+        conn = KeepAliveConnection(host, port)
+        failures = 0
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    status, ttfb, total, size = await asyncio.wait_for(
+                        conn.get(route, headers), REQUEST_TIMEOUT
+                    )
+                except Exception as e:
+                    record_error(errors, e)
+                    await conn.close()
+                    # Don't spin against a server that refuses connections
+                    failures += 1
+                    remaining = deadline - time.perf_counter()
+                    await asyncio.sleep(
+                        max(0, min(reconnect_delay(failures), remaining))
+                    )
+                    continue
+                failures = 0
+                if 300 <= status < 400:
+                    redirects[status] = redirects.get(status, 0) + 1
+                    continue
+                if status >= 400:
+                    errors["status"][status] = errors["status"].get(status, 0) + 1
+                ttfbs.append(ttfb * 1000)
+                totals.append(total * 1000)
+                transferred += size
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(totals),
+        "throughput_rps": round(len(totals) / elapsed, 2) if elapsed else 0,
+        "bytes": transferred,
+        "redirects": redirects,
+        "errors": errors,
+        "ttfb_ms": latency_summary(ttfbs),
+        "total_ms": latency_summary(totals),
+    }
+
+
+def find_knee(curve):
+    """First concurrency level where throughput stalls but p95 keeps rising"""
+    for prev, step in zip(curve, curve[1:]):
+        prev_rps, rps = prev["throughput_rps"], step["throughput_rps"]
+        prev_p95, p95 = prev["total_ms"]["p95"], step["total_ms"]["p95"]
+        if not prev_rps or not prev_p95 or p95 is None:
+            continue
+        gain = (rps - prev_rps) / prev_rps
+        growth = p95 / prev_p95
+        if gain < KNEE_MIN_THROUGHPUT_GAIN and growth >= KNEE_MIN_LATENCY_GROWTH:
+            return {
+                "concurrency": step["concurrency"],
+                "max_throughput_rps": max(s["throughput_rps"] for s in curve),
+            }
+    return None
+
+
+def representative_routes(routes, limit):
+    """Up to `limit` routes, one per top-level section, shallowest first"""
+    if limit <= 0 or len(routes) <= limit:
+        return routes
+    picked, sections = [], set()
+    # Stable sort keeps discovery order within each depth
+    for route in sorted(routes, key=lambda r: r.count("/")):
+        section = route.strip("/").split("/")[0]
+        if section not in sections:
+            sections.add(section)
+            picked.append(route)
+        if len(picked) == limit:
+            break
+    return picked
+
+
+async def run_load(base_url, routes, steps, duration, cookie=None):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    curves = {}
+
+    for route in routes:
+        print(f"\n🧪 Loading: {route}")
+        curve = []
+        for concurrency in steps:
+            step = await run_step(host, port, route, concurrency, duration, cookie)
+            curve.append(step)
+            print(
+                f"   c={concurrency:<3} {step['throughput_rps']:>8.1f} rps  "
+                f"TTFB p95={step['ttfb_ms']['p95']}ms  "
+                f"total p95={step['total_ms']['p95']}ms  "
+                f"redirects={sum(step['redirects'].values())}  "
+                f"errors={step['errors']['count']}"
+            )
+        if curve and not any(s["requests"] for s in curve):
+            print("   ⚠️  Only redirects or errors; is the route behind a login?")
+        knee = find_knee(curve)
+        if knee:
+            print(f"   📉 Saturates around concurrency {knee['concurrency']}")
+        curves[route] = {"curve": curve, "knee": knee}
+
+    return curves
+
+
+def main(args: argparse.Namespace = None):
+    """Run the load sweep and save latency-vs-throughput curves"""
+    if args is None:
+        parser = argparse.ArgumentParser(description="Measure TTFB under load")
+        parser.add_argument(
+            "--concurrency",
+            default=",".join(str(c) for c in CONCURRENCY_STEPS),
+            help="Comma-separated concurrency levels",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=STEP_DURATION,
+            help="Seconds per route per concurrency level",
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            help="App backend to measure (default: from FXZ_APP_ENTRY)",
+        )
+        parser.add_argument(
+            "--routes",
+            help="Comma-separated routes to load (default: a representative "
+            "subset of the route manifest)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=ROUTE_LIMIT,
+            help="Routes picked from the manifest, one per section "
+            "(default: FXZ_LOAD_ROUTE_LIMIT or 5; 0 loads all)",
+        )
+        parser.add_argument(
+            "--role",
+            default=DEFAULT_ROLE,
+            help=f"Log in once as this role ({', '.join(ROLES)}; default: "
+            "FXZ_PERF_ROLE or anonymous)",
+        )
+        args = parser.parse_args()
+
+    print("🎯 Starting Load Generation")
+    print("=" * 50)
+
+    steps = [int(c) for c in str(args.concurrency).split(",") if c.strip()]
+    if args.routes:
+        routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    else:
+        discovered = get_routes_to_test()
+        routes = representative_routes(discovered, args.limit)
+        if len(routes) < len(discovered):
+            print(f"📍 Loading {len(routes)} of {len(discovered)} routes (--limit)")
+    estimate = len(routes) * len(steps) * args.duration
+    print(
+        f"⏳ {len(routes)} routes × {len(steps)} levels × {args.duration:g}s "
+        f"≈ {estimate / 60:.1f} min"
+    )
+
+    with app_server(entry=resolve_entry(args.server, STREAMLIT_FILE)) as server:
+        storage_state = ensure_storage_state(server.url, args.role)
+        cookie = cookie_header(storage_state, server.url)
+        curves = asyncio.run(run_load(server.url, routes, steps, args.duration, cookie))
+
+    LOAD_FILE.write_text(
+        json.dumps(
+            {
+                "timestamp": int(time.time() * 1000),
+                "concurrency_steps": steps,
+                "step_duration_s": args.duration,
+                "role": args.role,
+                "routes": curves,
+            },
+            indent=2,
+        )
+    )
+    print(f"\n💾 Load curves saved to: {LOAD_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  Load generation interrupted")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 Load generation failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Detection
+Compares the latest run's samples per route against a rolling baseline
+from the trend store and flags statistically significant slowdowns
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib.device_profiles import DEFAULT_PROFILE
+from scripts.lib.perf_stats import (
+    bootstrap_median_diff_ci,
+    cliffs_delta,
+    mann_whitney_greater,
+    percentile,
+)
+from scripts.lib.trend_store import TrendStore
+
+# Configuration
+ART = pathlib.Path("artifacts")
+ART.mkdir(exist_ok=True)
+
+TRENDS_DB = ART / "perf-trends.db"
+LATEST_FILE = ART / "perf-routes-latest.json"
+REGRESSIONS_FILE = ART / "perf-regressions.json"
+
+# Metrics where larger is slower
+METRICS = ["ttfb", "fcp", "lcp", "cls", "tbt", "inp"]
+
+BASELINE_DAYS = 7
+MIN_BASELINE_SAMPLES = 5
+# Fewer current samples than this cannot carry a rank test; they are
+# flagged only when clearly outside the baseline's BASELINE_QUANTILE
+MIN_CURRENT_SAMPLES = 3
+BASELINE_QUANTILE = 95
+ALPHA = 0.05
+MIN_RELATIVE_CHANGE = 0.10  # ignore significant but tiny shifts
+
+
+def compare(current, baseline, alpha=ALPHA, min_change=MIN_RELATIVE_CHANGE):
+    """Compare two sample sets for one metric; None if not comparable.
+
+    With at least MIN_CURRENT_SAMPLES current samples the decision is a
+    one-sided Mann-Whitney test (exact for small sets). With fewer, a
+    current median is a regression only when it exceeds the baseline's
+    BASELINE_QUANTILE by `min_change`, so a lone sample is judged against
+    the baseline's spread rather than its ranks.
+    """
+    if not current or len(baseline) < MIN_BASELINE_SAMPLES:
+        return None
+
+    test = mann_whitney_greater(current, baseline)
+    if test is None:
+        return None
+
+    current_median = percentile(current, 50)
+    baseline_median = percentile(baseline, 50)
+    relative = (
+        (current_median - baseline_median) / baseline_median
+        if baseline_median
+        else 0.0
+    )
+    ci = bootstrap_median_diff_ci(current, baseline)
+    baseline_upper = percentile(baseline, BASELINE_QUANTILE)
+
+    if len(current) >= MIN_CURRENT_SAMPLES:
+        method = "exact-rank" if test["exact"] else "rank"
+        regressed = test["p_value"] < alpha and relative >= min_change
+    else:
+        method = "quantile"
+        regressed = current_median > baseline_upper * (1 + min_change)
+
+    return {
+        "current_median": round(current_median, 4),
+        "baseline_median": round(baseline_median, 4),
+        "current_n": len(current),
+        "baseline_n": len(baseline),
+        "relative_change": round(relative, 4),
+        "median_diff_ci95": [round(ci[0], 4), round(ci[1], 4)] if ci else None,
+        "cliffs_delta": round(cliffs_delta(current, baseline), 4),
+        "p_value": round(test["p_value"], 6),
+        f"baseline_p{BASELINE_QUANTILE}": round(baseline_upper, 4),
+        "method": method,
+        "regressed": regressed,
+    }
+
+
+def detect_regressions(
+    store,
+    since_ms,
+    profile=DEFAULT_PROFILE,
+    baseline_days=BASELINE_DAYS,
+    alpha=ALPHA,
+    min_change=MIN_RELATIVE_CHANGE,
+):
+    """Compare samples recorded since `since_ms` against the preceding
+    `baseline_days` of history for every route under `profile`"""
+    baseline_start = since_ms - baseline_days * 86_400_000
+    current = store.samples(start_ms=since_ms, profile=profile)
+    baseline = store.samples(start_ms=baseline_start, end_ms=since_ms, profile=profile)
+
+    by_route = {}
+    for label, samples in (("current", current), ("baseline", baseline)):
+        for sample in samples:
+            by_route.setdefault(sample["route"], {"current": [], "baseline": []})
+            by_route[sample["route"]][label].append(sample)
+
+    routes = {}
+    regressions = []
+    for route, sets in sorted(by_route.items()):
+        if not sets["current"]:
+            continue
+
+        routes[route] = {}
+        for metric in METRICS:
+            result = compare(
+                [s[metric] for s in sets["current"] if s.get(metric) is not None],
+                [s[metric] for s in sets["baseline"] if s.get(metric) is not None],
+                alpha=alpha,
+                min_change=min_change,
+            )
+            if result is None:
+                continue
+            routes[route][metric] = result
+            if result["regressed"]:
+                regressions.append({"route": route, "metric": metric, **result})
+
+    regressions.sort(key=lambda r: r["cliffs_delta"], reverse=True)
+    return {
+        "timestamp": int(time.time() * 1000),
+        "profile": profile,
+        "since": since_ms,
+        "baseline_days": baseline_days,
+        "alpha": alpha,
+        "min_relative_change": min_change,
+        "regressions": regressions,
+        "routes": routes,
+    }
+
+
+def write_report(report):
+    """Persist a regression report and print a short summary"""
+    REGRESSIONS_FILE.write_text(json.dumps(report, indent=2))
+
+    if report["regressions"]:
+        print(f"🐢 {len(report['regressions'])} significant slowdown(s):")
+        for r in report["regressions"]:
+            print(
+                f"   • {r['route']} {r['metric'].upper()}: "
+                f"{r['baseline_median']:.0f} → {r['current_median']:.0f} "
+                f"({r['relative_change']:+.0%}, p={r['p_value']:.4f}, "
+                f"δ={r['cliffs_delta']:+.2f})"
+            )
+    else:
+        print("✅ No statistically significant regressions against baseline")
+    print(f"💾 Regression report saved to: {REGRESSIONS_FILE}")
+
+
+def latest_run_start():
+    """Earliest timestamp in the latest route sweep, if any"""
+    if not LATEST_FILE.exists():
+        return None
+    try:
+        timestamps = [m["timestamp"] for m in json.loads(LATEST_FILE.read_text())]
+        return min(timestamps) if timestamps else None
+    except Exception:
+        return None
+
+
+def main(args: argparse.Namespace = None):
+    """Detect regressions for the latest run"""
+    if args is None:
+        parser = argparse.ArgumentParser(
+            description="Detect performance regressions against trend history"
+        )
+        parser.add_argument(
+            "--since",
+            type=int,
+            help="Epoch ms where the current run starts (default: latest sweep)",
+        )
+        parser.add_argument("--profile", default=DEFAULT_PROFILE)
+        parser.add_argument("--baseline-days", type=int, default=BASELINE_DAYS)
+        parser.add_argument("--alpha", type=float, default=ALPHA)
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit non-zero when a regression is flagged",
+        )
+        args = parser.parse_args()
+
+    since = args.since or latest_run_start()
+    if since is None or not TRENDS_DB.exists():
+        print("❌ No trend data or latest run to compare")
+        return 1
+
+    with TrendStore(TRENDS_DB) as store:
+        report = detect_regressions(
+            store,
+            since,
+            profile=args.profile,
+            baseline_days=args.baseline_days,
+            alpha=args.alpha,
+        )
+    write_report(report)
+
+    if args.fail_on_regression and report["regressions"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  Regression detection interrupted")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 Regression detection failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Memory Soak Testing for Routes
+Navigates to each route (or a route sequence) repeatedly within one browser
+session, samples JS heap, DOM node and event-listener counts after a forced
+GC, and flags routes whose memory grows across iterations
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib.app_server import SERVERS, app_server, resolve_entry
+from scripts.lib.auth_state import DEFAULT_ROLE, ROLES, ensure_storage_state
+from scripts.lib.budget_matcher import BudgetMatcher
+from scripts.lib.device_profiles import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    apply_throttling,
+    context_options,
+)
+from scripts.lib.perf_stats import grows_monotonically, linear_slope
+from scripts.lib.route_manifest import get_routes_to_test
+from scripts.perf_budgets import load_budgets, resolve_thresholds
+
+# Configuration
+ART = pathlib.Path("artifacts")
+ART.mkdir(exist_ok=True)
+
+STREAMLIT_FILE = os.environ.get("FXZ_APP_ENTRY", "app.py")
+SOAK_FILE = ART / "perf-soak.json"
+
+TIMEOUT = 60_000  # 60 seconds
+ITERATIONS = int(os.environ.get("FXZ_SOAK_ITERATIONS", "10"))
+WARMUP_ITERATIONS = 1  # first load allocates caches that are not leaks
+# Light static page visited between passes of a single-route unit, so the
+# route unmounts and remounts every iteration instead of pushing to itself
+NEUTRAL_ROUTE = os.environ.get("FXZ_SOAK_NEUTRAL_ROUTE", "/offline")
+NEUTRAL_FALLBACK = "/"
+
+# CDP Performance.getMetrics counter -> (report key, budget key)
+COUNTERS = {
+    "JSHeapUsedSize": ("js_heap_bytes", "js_heap_growth_bytes_per_iteration"),
+    "Nodes": ("dom_nodes", "dom_nodes_growth_per_iteration"),
+    "JSEventListeners": ("event_listeners", "event_listeners_growth_per_iteration"),
+}
+
+# Prefer in-app (client-side) navigation so the JS heap survives between
+# iterations, which is how long-lived dashboard sessions behave
+SOFT_NAVIGATE_SCRIPT = """
+async (route) => {
+    const router = window.next && window.next.router;
+    if (!router || typeof router.push !== 'function') return false;
+    await router.push(route);
+    return true;
+}
+"""
+
+
+def navigate(page, base_url, route):
+    """Client-side navigation when the app exposes a router, else a full load"""
+    try:
+        if page.url.startswith(base_url) and page.evaluate(
+            SOFT_NAVIGATE_SCRIPT, route
+        ):
+            page.wait_for_load_state("networkidle", timeout=TIMEOUT)
+            return "soft"
+    except Exception:
+        pass
+    page.goto(f"{base_url}{route}", wait_until="networkidle", timeout=TIMEOUT)
+    return "hard"
+
+
+def sample_memory(session):
+    """Force a full GC, then read heap/DOM/listener counters via CDP"""
+    session.send("HeapProfiler.collectGarbage")
+    counters = {
+        m["name"]: m["value"]
+        for m in session.send("Performance.getMetrics").get("metrics", [])
+    }
+    return {key: counters.get(name, 0) for name, (key, _) in COUNTERS.items()}
+
+
+def analyse(label, samples, thresholds):
+    """Fit growth slopes and check them against soak budgets"""
+    measured = samples[WARMUP_ITERATIONS:]
+    result = {"label": label, "iterations": len(samples), "samples": samples}
+    violations = []
+    leak_suspects = []
+
+    for _, (key, budget_key) in COUNTERS.items():
+        series = [s[key] for s in measured]
+        slope = linear_slope(series)
+        monotonic = grows_monotonically(series)
+        result[f"{key}_slope"] = round(slope, 2) if slope is not None else None
+        result[f"{key}_monotonic"] = monotonic
+
+        if monotonic:
+            leak_suspects.append(key)
+        budget = thresholds.get(budget_key)
+        if budget is not None and slope is not None and slope > budget:
+            violations.append(f"{key} grows {slope:.1f}/iteration > {budget}")
+
+    result["leak_suspects"] = leak_suspects
+    result["violations"] = violations
+    return result
+
+
+def soak_pass(routes, neutral=NEUTRAL_ROUTE):
+    """Routes visited per iteration; a lone route is preceded by `neutral`"""
+    if len(routes) != 1:
+        return routes
+    if routes[0] == neutral:
+        neutral = NEUTRAL_FALLBACK
+    return [neutral, routes[0]]
+
+
+def soak(context, base_url, routes, iterations, profile):
+    """Repeatedly visit `routes` in one page, sampling after every pass"""
+    routes = soak_pass(routes)
+    page = context.new_page()
+    session = context.new_cdp_session(page)
+    session.send("Performance.enable")
+    apply_throttling(session, profile)
+
+    samples = []
+    modes = set()
+    try:
+        for i in range(iterations):
+            for route in routes:
+                modes.add(navigate(page, base_url, route))
+            samples.append({"iteration": i, **sample_memory(session)})
+    finally:
+        page.close()
+
+    if modes == {"hard"}:
+        print("   ⚠️  No client-side router found; full reloads reset the heap")
+    return samples
+
+
+def main(args: argparse.Namespace = None):
+    """Run soak iterations for every route and optional route sequence"""
+    if args is None:
+        parser = argparse.ArgumentParser(description="Detect memory growth per route")
+        parser.add_argument("--iterations", type=int, default=ITERATIONS)
+        parser.add_argument(
+            "--sequence",
+            action="append",
+            default=[],
+            help="Comma-separated route sequence to soak as one unit (repeatable)",
+        )
+        parser.add_argument(
+            "--profile",
+            choices=sorted(PROFILES),
+            default=DEFAULT_PROFILE,
+            help="Device profile (default: FXZ_PERF_PROFILE or desktop-fast)",
+        )
+        parser.add_argument(
+            "--role",
+            default=DEFAULT_ROLE,
+            help=f"Log in once as this role ({', '.join(ROLES)}; default: "
+            "FXZ_PERF_ROLE or anonymous)",
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            help="App backend to measure (default: from FXZ_APP_ENTRY)",
+        )
+        args = parser.parse_args()
+
+    print("🎯 Starting Memory Soak Testing")
+    print("=" * 50)
+
+    matcher = BudgetMatcher(load_budgets())
+    units = [(route, [route]) for route in get_routes_to_test()]
+    for sequence in args.sequence:
+        units.append((sequence, [r.strip() for r in sequence.split(",") if r.strip()]))
+
+    results = []
+    with app_server(entry=resolve_entry(args.server, STREAMLIT_FILE)) as server:
+        storage_state = ensure_storage_state(server.url, args.role)
+        with sync_playwright() as p:
+            browser = p.chromium.launch(
+                headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+            try:
+                for label, routes in units:
+                    print(f"\n🧪 Soaking: {label} ({args.iterations} iterations)")
+                    context = browser.new_context(
+                        **context_options(args.profile), storage_state=storage_state
+                    )
+                    try:
+                        samples = soak(
+                            context, server.url, routes, args.iterations, args.profile
+                        )
+                    except Exception as e:
+                        print(f"❌ Soak failed for {label}: {e}")
+                        results.append({"label": label, "error": str(e)})
+                        continue
+                    finally:
+                        context.close()
+
+                    thresholds = resolve_thresholds(matcher, routes[0], args.profile)
+                    result = analyse(label, samples, thresholds)
+                    results.append(result)
+
+                    print(
+                        f"   heap {result['js_heap_bytes_slope']} B/iter, "
+                        f"nodes {result['dom_nodes_slope']}/iter, "
+                        f"listeners {result['event_listeners_slope']}/iter"
+                    )
+                    for key in result["leak_suspects"]:
+                        print(f"   🔺 {key} grew on every iteration")
+                    for violation in result["violations"]:
+                        print(f"   ❌ {violation}")
+            finally:
+                browser.close()
+
+    violations = [
+        f"{r['label']}: {v}" for r in results for v in r.get("violations", [])
+    ]
+    SOAK_FILE.write_text(
+        json.dumps(
+            {
+                "timestamp": int(time.time() * 1000),
+                "profile": args.profile,
+                "iterations": args.iterations,
+                "results": results,
+                "violations": violations,
+                "passed": not violations,
+            },
+            indent=2,
+        )
+    )
+
+    print("\n" + "=" * 50)
+    print(f"💾 Soak results saved to: {SOAK_FILE}")
+    if violations:
+        print(f"❌ Found {len(violations)} memory growth budget violations")
+        return 1
+    print("✅ No memory growth budget violations")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  Soak testing interrupted")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 Soak testing failed: {e}")
+        sys.exit(1)
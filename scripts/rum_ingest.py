@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Real-User Web Vitals Ingestion
+Streams web-vitals beacon JSONL exports from production, aggregates LCP,
+CLS, INP, TTFB and FCP per tenant, route and day with DDSketch quantile
+sketches, and merges the results into the per-tenant trend stores that the
+weekly report charts
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the parent directory to Python path to import shared script helpers
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from scripts.lib.ddsketch import DDSketch
+from scripts.lib.route_manifest import route_matcher
+from scripts.lib.trend_store import (
+    GRANULARITIES,
+    RUM_PROFILE,
+    TrendStore,
+    tenant_db_path,
+)
+
+# Configuration
+ART = pathlib.Path("artifacts")
+ART.mkdir(exist_ok=True)
+
+RUM_DIR = ART / "rum"
+STATE_FILE = ART / "rum-state.json"
+SUMMARY_FILE = ART / "rum-summary.json"
+
+# Sketches are kept this long so late beacons still merge into their day
+STATE_DAYS = int(os.environ.get("FXZ_RUM_STATE_DAYS", "14"))
+DEFAULT_TENANT = os.environ.get("FXZ_TENANT", "default")
+
+# web-vitals metric name -> trend sample key
+METRIC_KEYS = {"LCP": "lcp", "CLS": "cls", "INP": "inp", "TTFB": "ttfb", "FCP": "fcp"}
+SUMMARY_QUANTILES = (50, 75, 95)
+
+ROUTE_FIELDS = ("route", "page", "pathname", "path", "url", "href")
+TENANT_FIELDS = ("tenant", "tenantId", "orgId", "org_id")
+TIME_FIELDS = ("timestamp", "ts", "time", "receivedAt")
+
+CHUNK_SIZE = 1 << 20
+
+
+def beacon_files(paths):
+    """Expand files, directories and globs into beacon export files"""
+    files = []
+    for raw in paths or [str(RUM_DIR)]:
+        path = pathlib.Path(raw)
+        if path.is_dir():
+            candidates = sorted(path.glob("*.jsonl")) + sorted(path.glob("*.jsonl.gz"))
+        elif any(ch in raw for ch in "*?["):
+            candidates = sorted(pathlib.Path().glob(raw))
+        else:
+            candidates = [path] if path.exists() else []
+        files.extend(c for c in candidates if c not in files)
+    return files
+
+
+def _timestamp_ms(value):
+    if isinstance(value, (int, float)):
+        # Seconds since the epoch are ~1e9, milliseconds ~1e12
+        return int(value * 1000) if value < 1e11 else int(value)
+    if isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return int(moment.timestamp() * 1000)
+    return None
+
+
+def _first(record, fields):
+    for field in fields:
+        if record.get(field) not in (None, ""):
+            return record[field]
+    return None
+
+
+def parse_beacon(record):
+    """Yield (tenant, path, ts_ms, metric_key, value) for one beacon record.
+
+    A record is either a single web-vitals metric ({"name", "value", ...})
+    or a batch ({"metrics": [...]}) sharing the record's page context.
+    """
+    metrics = record.get("metrics")
+    if not isinstance(metrics, list):
+        metrics = [record]
+    for metric in metrics:
+        context = {**record, **metric}
+        key = METRIC_KEYS.get(str(context.get("name", "")).upper())
+        value = context.get("value")
+        path = _first(context, ROUTE_FIELDS)
+        ts = _timestamp_ms(_first(context, TIME_FIELDS))
+        if key is None or not isinstance(value, (int, float)) or not path or not ts:
+            continue
+        tenant = str(_first(context, TENANT_FIELDS) or DEFAULT_TENANT)
+        yield tenant, str(path), ts, key, float(value)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_gz_lines(path, cursor):
+    """Yield decompressed lines past the consumed prefix of a gzipped export.
+
+    The cursor keeps the decompressed offset and a hash of everything up to
+    it, so an export that grew (e.g. an appended gzip member) only yields
+    its new lines, while a different export under the same name is read
+    from the start.
+    """
+    offset = cursor.get("offset", 0)
+    consumed, prefix = 0, hashlib.sha256()
+    with gzip.open(path, "rb") as f:
+        while consumed < offset:
+            chunk = f.read(min(CHUNK_SIZE, offset - consumed))
+            if not chunk:
+                break
+            prefix.update(chunk)
+            consumed += len(chunk)
+        if offset and (consumed < offset or prefix.hexdigest() != cursor.get("prefix")):
+            f.seek(0)
+            consumed, prefix = 0, hashlib.sha256()
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # incomplete record; read it once it is finished
+            consumed += len(line)
+            prefix.update(line)
+            yield line
+    cursor.update(offset=consumed, prefix=prefix.hexdigest())
+
+
+def read_new_lines(path, cursor, seen_gz):
+    """Yield complete lines not consumed yet; `cursor` is updated in place.
+
+    Plain files are tailed from the saved byte offset (restarting when the
+    file was rotated or truncated). Gzipped exports are recognized by the
+    hash of their content in `seen_gz`, so a copied, renamed or touched
+    export is never counted twice.
+    """
+    stat = path.stat()
+    if path.suffix == ".gz":
+        digest = file_digest(path)
+        if digest in seen_gz:
+            return
+        yield from _read_gz_lines(path, cursor)
+        seen_gz[digest] = str(path)
+        return
+
+    offset = cursor.get("offset", 0)
+    if cursor.get("inode") != stat.st_ino or stat.st_size < offset:
+        offset = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # still being written; pick it up next run
+            offset += len(line)
+            yield line
+    cursor.update(inode=stat.st_ino, offset=offset)
+
+
+def load_state(reset=False):
+    if reset or not STATE_FILE.exists():
+        return {"cursors": {}, "sketches": {}, "gz": {}}
+    state = json.loads(STATE_FILE.read_text())
+    state["sketches"] = {
+        key: {metric: DDSketch.from_dict(data) for metric, data in metrics.items()}
+        for key, metrics in state.get("sketches", {}).items()
+    }
+    state.setdefault("cursors", {})
+    state.setdefault("gz", {})
+    return state
+
+
+def save_state(state):
+    STATE_FILE.write_text(
+        json.dumps(
+            {
+                "cursors": state["cursors"],
+                # content hash -> path of every fully read gzipped export
+                "gz": state["gz"],
+                "sketches": {
+                    key: {metric: s.to_dict() for metric, s in metrics.items()}
+                    for key, metrics in state["sketches"].items()
+                },
+            }
+        )
+    )
+
+
+def _state_key(tenant, route, day):
+    return "\t".join((tenant, route, day))
+
+
+def ingest(files, state, match_route, oldest_day):
+    """Stream beacons into the sketches; returns (touched keys, stats)"""
+    touched = set()
+    stats = {"files": 0, "lines": 0, "beacons": 0, "invalid": 0, "late": 0}
+    day_format = GRANULARITIES["day"]
+
+    for path in files:
+        cursor = state["cursors"].setdefault(str(path.resolve()), {})
+        stats["files"] += 1
+        for line in read_new_lines(path, cursor, state["gz"]):
+            stats["lines"] += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                stats["invalid"] += 1
+                continue
+            if not isinstance(record, dict):
+                stats["invalid"] += 1
+                continue
+
+            for tenant, url, ts, metric, value in parse_beacon(record):
+                day = datetime.fromtimestamp(ts / 1000).strftime(day_format)
+                if day < oldest_day:
+                    stats["late"] += 1
+                    continue
+                key = _state_key(tenant, match_route(url), day)
+                sketches = state["sketches"].setdefault(key, {})
+                sketches.setdefault(metric, DDSketch()).add(value)
+                touched.add(key)
+                stats["beacons"] += 1
+
+    return touched, stats
+
+
+def sketch_stats(sketch):
+    stats = {"count": sketch.count, "mean": sketch.mean}
+    for pct in SUMMARY_QUANTILES:
+        stats[f"p{pct}"] = sketch.quantile(pct / 100.0)
+    return stats
+
+
+def tenant_db(tenant):
+    return tenant_db_path(tenant, ART)
+
+
+def flush(state, touched):
+    """Replace the daily RUM rollup of every touched (tenant, route, day)"""
+    by_tenant = {}
+    for key in touched:
+        tenant, route, day = key.split("\t")
+        by_tenant.setdefault(tenant, []).append((route, day, state["sketches"][key]))
+
+    for tenant, rows in by_tenant.items():
+        with TrendStore(tenant_db(tenant)) as store:
+            for route, day, sketches in rows:
+                stats = {metric: sketch_stats(s) for metric, s in sketches.items()}
+                # Page views ~ the most frequently reported metric
+                views = max(s.count for s in sketches.values())
+                store.put_rollup(route, RUM_PROFILE, "day", day, views, stats)
+    return by_tenant
+
+
+def prune_state(state, oldest_day):
+    expired = [k for k in state["sketches"] if k.split("\t")[2] < oldest_day]
+    for key in expired:
+        del state["sketches"][key]
+    return len(expired)
+
+
+def summarize(state):
+    """Latest day per tenant and route with p50/p75/p95 per metric"""
+    latest = {}
+    for key, sketches in state["sketches"].items():
+        tenant, route, day = key.split("\t")
+        current = latest.setdefault(tenant, {}).get(route)
+        if current is None or day > current["date"]:
+            latest[tenant][route] = {
+                "date": day,
+                **{metric: sketch_stats(s) for metric, s in sketches.items()},
+            }
+    return latest
+
+
+def main(args: argparse.Namespace = None):
+    """Ingest new beacons and update per-tenant RUM trends"""
+    if args is None:
+        parser = argparse.ArgumentParser(description="Ingest web-vitals beacons")
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help=f"Beacon JSONL files, directories or globs (default: {RUM_DIR})",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Forget cursors and sketches and re-aggregate from scratch",
+        )
+        args = parser.parse_args()
+
+    print("🎯 Starting RUM Ingestion")
+    print("=" * 50)
+
+    files = beacon_files(args.paths)
+    if not files:
+        print("⚠️  No beacon files found")
+        return 0
+
+    t0 = time.time()
+    oldest_day = (datetime.now() - timedelta(days=STATE_DAYS)).strftime(
+        GRANULARITIES["day"]
+    )
+    state = load_state(reset=args.full)
+    touched, stats = ingest(files, state, route_matcher(), oldest_day)
+    tenants = flush(state, touched)
+    expired = prune_state(state, oldest_day)
+    save_state(state)
+
+    summary = summarize(state)
+    SUMMARY_FILE.write_text(
+        json.dumps(
+            {"timestamp": int(time.time() * 1000), **stats, "tenants": summary},
+            indent=2,
+        )
+    )
+
+    print(
+        f"📥 {stats['beacons']} beacons from {stats['lines']} new lines in "
+        f"{stats['files']} files ({stats['invalid']} invalid, {stats['late']} "
+        f"older than {STATE_DAYS} days) in {time.time() - t0:.1f}s"
+    )
+    for tenant, rows in sorted(tenants.items()):
+        print(f"🏢 {tenant}: {len(rows)} route-days updated → {tenant_db(tenant)}")
+    if expired:
+        print(f"🗜️  Dropped {expired} expired route-day sketches")
+    print(f"💾 RUM summary saved to: {SUMMARY_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  RUM ingestion interrupted")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 RUM ingestion failed: {e}")
+        sys.exit(1)
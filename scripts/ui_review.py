@@ -1,26 +1,42 @@
 # scripts/ui_review.py
 from __future__ import annotations
+import argparse
 import os
 import sys
-import time
 import json
 import re
-import signal
-import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from scripts.lib.app_server import SERVERS, app_server, is_next_entry, resolve_entry
+from scripts.lib.auth_state import ensure_storage_state
+from scripts.lib.route_manifest import get_routes_to_test
+from scripts.lib.screenshot_store import (
+    changed,
+    load_index,
+    perceptual_hash,
+    prune,
+    save_index,
+    store,
+)
+
 ART = ROOT / "artifacts"
 SHOT = ART / "screenshots"
 ART.mkdir(exist_ok=True)
 SHOT.mkdir(exist_ok=True)
+SHOT_INDEX = SHOT / "index.json"
 
 ENTRY_CAND = ["app.py", "streamlit_app.py", "main.py"]
 PAGES_DIR = ROOT / "pages"
-PORT = int(os.environ.get("FIXZIT_PORT", "8501"))
-BASE = f"http://127.0.0.1:{PORT}"
+PORT: Optional[int] = (
+    int(os.environ["FIXZIT_PORT"]) if os.environ.get("FIXZIT_PORT") else None
+)
+ROLE: Optional[str] = os.environ.get("FXZ_UI_ROLE") or None
+WORKERS = int(os.environ.get("FXZ_UI_WORKERS") or min(4, os.cpu_count() or 1))
 
 
 def find_entry() -> Path:
@@ -32,7 +48,12 @@ def find_entry() -> Path:
     sys.exit(1)
 
 
-def discover_pages() -> List[str]:
+def discover_pages(entry: str) -> List[str]:
+    # Next.js backend: URL routes from the app/ route manifest
+    if is_next_entry(entry):
+        return get_routes_to_test()
+
+    # Streamlit fallback: sidebar page labels from pages/*.py
     names: List[str] = ["Home"]
     if PAGES_DIR.exists():
         for f in sorted(PAGES_DIR.glob("*.py")):
@@ -48,46 +69,56 @@ def discover_pages() -> List[str]:
     return uniq
 
 
-def wait_server(url: str, timeout: float = 30.0) -> None:
-    start = time.time()
-    last_err = None
-    while time.time() - start < timeout:
+def _navigate(page, base: str, route: str) -> None:
+    if route.startswith("/"):
+        page.goto(base + route, wait_until="networkidle", timeout=25000)
+    # Home first
+    elif route == "Home":
+        page.goto(base, wait_until="networkidle", timeout=25000)
+    else:
+        # Try clicking via sidebar label
+        page.goto(base, wait_until="domcontentloaded", timeout=25000)
         try:
-            r = requests.get(url, timeout=2)
-            if r.status_code in (200, 404):
-                return
-        except Exception as e:
-            last_err = e
-        time.sleep(0.5)
-    raise RuntimeError(f"Dev server not responding at {url}: {last_err}")
-
-
-def launch_server(entry: Path) -> subprocess.Popen:
-    cmd = [
-        sys.executable,
-        "-m",
-        "streamlit",
-        "run",
-        str(entry),
-        "--server.headless",
-        "true",
-        "--server.port",
-        str(PORT),
-        "--browser.gatherUsageStats",
-        "false",
-    ]
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    wait_server(BASE)
-    return proc
-
-
-def playwright_review(routes: List[str]) -> Dict[str, Any]:
+            page.get_by_text(route, exact=True).first.click(timeout=4000)
+            page.wait_for_load_state("networkidle", timeout=20000)
+        except Exception:
+            from urllib.parse import quote
+
+            page.goto(
+                f"{base}/?page={quote(route)}",
+                wait_until="networkidle",
+                timeout=25000,
+            )
+
+
+def _capture(page, has_issues: bool, prior: Optional[Dict[str, str]]) -> Dict:
+    # A viewport capture is cheap; only go full-page when something changed
+    phash = perceptual_hash(page.screenshot())
+    prior = prior or {}
+    if (
+        not has_issues
+        and not changed(prior.get("phash"), phash)
+        and (SHOT / prior.get("file", "")).is_file()
+    ):
+        # Keep the reference hash with its file so slow drift still adds up
+        return {"phash": prior["phash"], "file": prior["file"]}
+    return {"phash": phash, "file": store(SHOT, page.screenshot(full_page=True))}
+
+
+def review_shard(
+    base: str,
+    routes: List[str],
+    storage_state: Optional[str],
+    previous: Dict[str, Dict],
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict]]:
+    """Review a shard of routes in one browser; returns (issues, captures)"""
     from playwright.sync_api import sync_playwright
 
     issues: List[Dict[str, Any]] = []
+    captures: Dict[str, Dict] = {}
     with sync_playwright() as pw:
         browser = pw.chromium.launch(headless=True)
-        context = browser.new_context()
+        context = browser.new_context(storage_state=storage_state)
         for route in routes:
             page = context.new_page()
             console_errors: List[str] = []
@@ -96,7 +127,7 @@ def playwright_review(routes: List[str]) -> Dict[str, Any]:
             page.on(
                 "console",
                 lambda msg: (
-                    console_errors.append(msg.text) if msg.type() == "error" else None
+                    console_errors.append(msg.text) if msg.type == "error" else None
                 ),
             )
             page.on(
@@ -107,49 +138,83 @@ def playwright_review(routes: List[str]) -> Dict[str, Any]:
                     else None
                 ),
             )
-            url = BASE
+            route_issues: List[Dict[str, Any]] = []
             try:
-                # Home first
-                if route == "Home":
-                    page.goto(url, wait_until="networkidle", timeout=25000)
-                else:
-                    # Try clicking via sidebar label
-                    page.goto(url, wait_until="domcontentloaded", timeout=25000)
-                    try:
-                        page.get_by_text(route, exact=True).first.click(timeout=4000)
-                        page.wait_for_load_state("networkidle", timeout=20000)
-                    except Exception:
-                        from urllib.parse import quote
-
-                        page.goto(
-                            f"{url}/?page={quote(route)}",
-                            wait_until="networkidle",
-                            timeout=25000,
-                        )
-
-                # Screenshot
-                safe = "root" if route == "Home" else re.sub(r"[^\w\-]+", "_", route)
-                page.screenshot(path=str(SHOT / f"{safe}.png"), full_page=True)
-
-                # Log issues
-                for m in console_errors:
-                    issues.append({"route": route, "type": "console", "message": m})
-                for f in failed:
-                    issues.append(
-                        {
-                            "route": route,
-                            "type": "http",
-                            "message": f"HTTP {f['status']}",
-                            "extra": {"url": f["url"]},
-                        }
-                    )
+                _navigate(page, base, route)
             except Exception as e:
-                issues.append({"route": route, "type": "pageerror", "message": str(e)})
+                route_issues.append(
+                    {"route": route, "type": "pageerror", "message": str(e)}
+                )
+
+            # Log issues
+            for m in console_errors:
+                route_issues.append({"route": route, "type": "console", "message": m})
+            for f in failed:
+                route_issues.append(
+                    {
+                        "route": route,
+                        "type": "http",
+                        "message": f"HTTP {f['status']}",
+                        "extra": {"url": f["url"]},
+                    }
+                )
+            issues.extend(route_issues)
+
+            try:
+                captures[route] = _capture(
+                    page, bool(route_issues), previous.get(route)
+                )
+            except Exception as e:
+                print(f"[ui] Screenshot failed for {route}: {e}")
             finally:
                 page.close()
         context.close()
         browser.close()
-    return {"issues": issues, "routes": routes}
+    return issues, captures
+
+
+def playwright_review(
+    base: str,
+    routes: List[str],
+    storage_state: Optional[str] = None,
+    workers: int = WORKERS,
+) -> Dict[str, Any]:
+    previous = load_index(SHOT_INDEX)
+    workers = max(1, min(workers, len(routes)))
+    shards = [routes[i::workers] for i in range(workers)]
+
+    if len(shards) == 1:
+        results = [review_shard(base, routes, storage_state, previous)]
+    else:
+        print(f"[ui] Reviewing {len(routes)} routes across {len(shards)} workers")
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            results = list(
+                pool.map(
+                    review_shard,
+                    [base] * len(shards),
+                    shards,
+                    [storage_state] * len(shards),
+                    [previous] * len(shards),
+                )
+            )
+
+    order = {route: i for i, route in enumerate(routes)}
+    issues = sorted(
+        (issue for shard_issues, _ in results for issue in shard_issues),
+        key=lambda issue: order.get(issue["route"], len(order)),
+    )
+    index = dict(previous)
+    for _, captures in results:
+        index.update(captures)
+    save_index(SHOT_INDEX, index)
+    prune(SHOT, (entry["file"] for entry in index.values()))
+
+    screenshots = {
+        route: f"screenshots/{index[route]['file']}"
+        for route in routes
+        if route in index
+    }
+    return {"issues": issues, "routes": routes, "screenshots": screenshots}
 
 
 def write_reports(result: Dict[str, Any]) -> None:
@@ -173,26 +238,29 @@ def write_reports(result: Dict[str, Any]) -> None:
     (ART / "ui-report.md").write_text("\n".join(lines), encoding="utf-8")
 
 
-def main() -> None:
-    entry = find_entry()
-    routes = discover_pages()
-    proc = launch_server(entry)
-    try:
-        result = playwright_review(routes)
-        write_reports(result)
-        blocking = [i for i in result["issues"] if i["type"] != "a11y"]
-        if blocking:
-            sys.exit(1)
-        print("UI review OK → artifacts/ui-report.md")
-    finally:
-        try:
-            if proc.poll() is None:
-                if os.name == "nt":
-                    proc.terminate()
-                else:
-                    os.kill(proc.pid, signal.SIGTERM)
-        except Exception:
-            pass
+def main(args: argparse.Namespace = None) -> None:
+    if args is None:
+        parser = argparse.ArgumentParser(description="Review app pages for UI issues")
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            help="App backend to review (default: from FXZ_APP_ENTRY)",
+        )
+        args = parser.parse_args()
+
+    entry = resolve_entry(args.server)
+    if not is_next_entry(entry):
+        entry = str(find_entry())
+    # Routes must match the backend actually launched
+    routes = discover_pages(entry)
+    with app_server(entry=entry, port=PORT) as server:
+        storage_state = ensure_storage_state(server.url, ROLE)
+        result = playwright_review(server.url, routes, storage_state)
+    write_reports(result)
+    blocking = [i for i in result["issues"] if i["type"] != "a11y"]
+    if blocking:
+        sys.exit(1)
+    print("UI review OK → artifacts/ui-report.md")
 
 
 if __name__ == "__main__":
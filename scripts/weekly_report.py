@@ -5,13 +5,16 @@ Creates comprehensive weekly performance and reliability reports per tenant
 """
 
 import argparse
+import html
 import json
 import os
 import pathlib
 import sys
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List
 import requests
 
 # Add the parent directory to Python path to import services
@@ -20,6 +23,8 @@ sys.path.append(str(pathlib.Path(__file__).parent.parent))
 from services.slo_service import slo_service
 from services.performance_service import performance_service
 from services.uptime_service import uptime_service
+from scripts.lib import report_cache, report_template
+from scripts.lib.trend_store import RUM_PROFILE, TrendStore, tenant_db_path
 
 # Import tenant utilities
 try:
@@ -47,37 +52,58 @@ EMAIL_WEBHOOK = os.environ.get("FXZ_EMAIL_WEBHOOK")
 ALERT_TO = os.environ.get("FXZ_ALERT_TO", "ops@yourco.com")
 EMAIL_DOMAIN = os.environ.get("EMAIL_DOMAIN", "fixzit.co")
 
+WORKERS = int(os.environ.get("FXZ_REPORT_WORKERS") or os.cpu_count() or 1)
+ASSETS = os.environ.get("FXZ_REPORT_ASSETS", "cdn")
+TIMINGS_FILE = ART / "weekly-report-timings.json"
 
-def generate_performance_chart_data(tenant: str = None):
-    """Generate data for performance trend charts for specific tenant"""
-    if tenant is None:
-        tenant = current_tenant()
 
-    # Try tenant-specific trends first, then fall back to global
-    trends_file = ART / f"perf-trends-{tenant}.json"
-    if not trends_file.exists():
-        trends_file = ART / "perf-trends.json"
+def _chart_series(daily_averages, days=7):
+    dates = sorted(daily_averages.keys())[-days:]
+    return {
+        "dates": dates,
+        "fcp": [daily_averages[date]["fcp_avg"] for date in dates],
+        "lcp": [daily_averages[date]["lcp_avg"] for date in dates],
+        "cls": [daily_averages[date]["cls_avg"] for date in dates],
+    }
 
-    if not trends_file.exists():
-        return {}
+
+def _chart_source(tenant: str):
+    """Trend store or legacy JSON file backing a tenant's charts, if any"""
+    # Try tenant-specific trends first, then fall back to global
+    for trends_db in (tenant_db_path(tenant, ART), ART / "perf-trends.db"):
+        if trends_db.exists():
+            return trends_db
+
+    # Legacy JSON trend files
+    for trends_file in (ART / f"perf-trends-{tenant}.json", ART / "perf-trends.json"):
+        if trends_file.exists():
+            return trends_file
+    return None
+
+
+def _load_chart_source(source: pathlib.Path):
+    if source.suffix == ".db":
+        try:
+            with TrendStore(source) as store:
+                # Field data (see rum_ingest.py) beats lab data when present
+                if RUM_PROFILE in store.profiles():
+                    daily = store.daily_averages(days=7, profile=RUM_PROFILE)
+                else:
+                    daily = store.daily_averages(days=7)
+            return {route: _chart_series(days) for route, days in daily.items()}
+        except Exception as e:
+            print(f"Warning: Could not query trend store: {e}")
+            return {}
 
     try:
-        trends_data = json.loads(trends_file.read_text())
+        trends_data = json.loads(source.read_text())
         chart_data = {}
 
         for route, route_data in trends_data.get("trends", {}).items():
             daily_averages = route_data.get("daily_averages", {})
 
             if daily_averages:
-                dates = list(daily_averages.keys())
-                dates.sort()
-
-                chart_data[route] = {
-                    "dates": dates[-7:],  # Last 7 days
-                    "fcp": [daily_averages[date]["fcp_avg"] for date in dates[-7:]],
-                    "lcp": [daily_averages[date]["lcp_avg"] for date in dates[-7:]],
-                    "cls": [daily_averages[date]["cls_avg"] for date in dates[-7:]],
-                }
+                chart_data[route] = _chart_series(daily_averages)
 
         return chart_data
     except Exception as e:
@@ -85,378 +111,135 @@ def generate_performance_chart_data(tenant: str = None):
         return {}
 
 
-def generate_html_report(tenant: str = None):
-    """Generate comprehensive HTML report for a specific tenant"""
-    if tenant is None:
-        tenant = current_tenant()
-
-    # Get tenant-specific data
-    slo_status = slo_service.calculate_slo_status()
-    health_score = uptime_service.get_system_health_score()
-    budget_results = performance_service.get_budget_results()
-    latest_metrics = performance_service.get_latest_metrics()
-    recent_alerts = uptime_service.get_alerts()[:10]
-    chart_data = generate_performance_chart_data(tenant)
-
-    # Calculate report period
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
-
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Fixzit Weekly Report - {end_date.strftime('%Y-%m-%d')}</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f8f9fa;
-            color: #333;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 2.5em;
-            font-weight: 300;
-        }}
-        .header p {{
-            margin: 10px 0 0 0;
-            opacity: 0.9;
-            font-size: 1.1em;
-        }}
-        .content {{
-            padding: 30px;
-        }}
-        .section {{
-            margin-bottom: 40px;
-        }}
-        .section h2 {{
-            color: #2c3e50;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 10px;
-            margin-bottom: 20px;
-        }}
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .metric-card {{
-            background: #f8f9fa;
-            border-radius: 8px;
-            padding: 20px;
-            border-left: 4px solid #3498db;
-        }}
-        .metric-card.healthy {{
-            border-left-color: #27ae60;
-        }}
-        .metric-card.warning {{
-            border-left-color: #f39c12;
-        }}
-        .metric-card.critical {{
-            border-left-color: #e74c3c;
-        }}
-        .metric-value {{
-            font-size: 2em;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        .metric-label {{
-            color: #7f8c8d;
-            font-size: 0.9em;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        .metric-target {{
-            color: #95a5a6;
-            font-size: 0.8em;
-            margin-top: 5px;
-        }}
-        .alert-item {{
-            background: #fff5f5;
-            border: 1px solid #fed7d7;
-            border-radius: 4px;
-            padding: 15px;
-            margin-bottom: 10px;
-        }}
-        .alert-item.warning {{
-            background: #fffbeb;
-            border-color: #fed7aa;
-        }}
-        .alert-item.info {{
-            background: #ebf8ff;
-            border-color: #90cdf4;
-        }}
-        .status-badge {{
-            display: inline-block;
-            padding: 4px 12px;
-            border-radius: 20px;
-            font-size: 0.8em;
-            font-weight: bold;
-            text-transform: uppercase;
-        }}
-        .status-healthy {{
-            background: #d4edda;
-            color: #155724;
-        }}
-        .status-warning {{
-            background: #fff3cd;
-            color: #856404;
-        }}
-        .status-critical {{
-            background: #f8d7da;
-            color: #721c24;
-        }}
-        .chart-container {{
-            height: 400px;
-            margin: 20px 0;
-        }}
-        .summary-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }}
-        .summary-table th,
-        .summary-table td {{
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }}
-        .summary-table th {{
-            background-color: #f8f9fa;
-            font-weight: 600;
-        }}
-        .footer {{
-            background: #2c3e50;
-            color: white;
-            padding: 20px;
-            text-align: center;
-            font-size: 0.9em;
-        }}
-        @media (max-width: 768px) {{
-            .metrics-grid {{
-                grid-template-columns: 1fr;
-            }}
-            .container {{
-                margin: 10px;
-                border-radius: 0;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🏥 Fixzit Weekly Report</h1>
-            <p>Performance & Reliability Summary - Tenant: {tenant}</p>
-            <p>{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}</p>
-        </div>
-        
-        <div class="content">
-            <!-- Executive Summary -->
-            <div class="section">
-                <h2>📊 Executive Summary</h2>
-                <div class="metrics-grid">
-                    <div class="metric-card healthy">
-                        <div class="metric-value">{health_score.get('score', 0):.1f}%</div>
-                        <div class="metric-label">System Health Score</div>
-                        <div class="metric-target">Grade: {health_score.get('grade', 'N/A')}</div>
-                    </div>
-                    <div class="metric-card {'healthy' if budget_results and budget_results.get('passed') else 'critical'}">
-                        <div class="metric-value">{'✅' if budget_results and budget_results.get('passed') else '❌'}</div>
-                        <div class="metric-label">Performance Budget</div>
-                        <div class="metric-target">{'All budgets met' if budget_results and budget_results.get('passed') else f'{len(budget_results.get("violations", []))} violations' if budget_results else 'No data'}</div>
-                    </div>
-                    <div class="metric-card {'healthy' if len(recent_alerts) == 0 else 'warning'}">
-                        <div class="metric-value">{len(recent_alerts)}</div>
-                        <div class="metric-label">Active Alerts</div>
-                        <div class="metric-target">Last 7 days</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-value">{health_score.get('endpoints_monitored', 0)}</div>
-                        <div class="metric-label">Monitored Endpoints</div>
-                        <div class="metric-target">Uptime tracking</div>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- SLO Status -->
-            <div class="section">
-                <h2>🎯 Service Level Objectives</h2>
-                <div class="metrics-grid">
-"""
+def load_chart_data(tenants: List[str]) -> Dict[str, dict]:
+    """Chart data for many tenants, reading each trend source only once.
 
-    # Add SLO cards
-    for slo_id, slo in slo_status.items():
-        status_class = (
-            slo.get("status", "unknown")
-            .replace("healthy", "healthy")
-            .replace("warning", "warning")
-            .replace("critical", "critical")
-        )
-        status_badge_class = f"status-{status_class}"
-
-        html_content += f"""
-                    <div class="metric-card {status_class}">
-                        <div class="metric-value">{slo.get('current_value', 0)}{slo.get('unit', '')}</div>
-                        <div class="metric-label">{slo.get('name', slo_id)}</div>
-                        <div class="metric-target">Target: {slo.get('target', 0)}{slo.get('unit', '')}</div>
-                        <span class="status-badge {status_badge_class}">{slo.get('status', 'unknown')}</span>
-                    </div>
-"""
+    Tenants without their own trend store share the global one, so a run
+    over hundreds of such tenants queries it a single time.
+    """
+    by_source: Dict[pathlib.Path, List[str]] = {}
+    charts = {}
+    for tenant in tenants:
+        source = _chart_source(tenant)
+        if source is None:
+            charts[tenant] = {}
+        else:
+            by_source.setdefault(source, []).append(tenant)
 
-    # Continue with performance metrics
-    html_content += """
-                </div>
-            </div>
-            
-            <!-- Performance Metrics -->
-            <div class="section">
-                <h2>⚡ Core Web Vitals</h2>
-"""
+    for source, source_tenants in by_source.items():
+        data = _load_chart_source(source)
+        for tenant in source_tenants:
+            charts[tenant] = data
+    return charts
 
-    if latest_metrics:
-        fcp = latest_metrics.get("fcp", 0)
-        lcp = latest_metrics.get("lcp", 0)
-        cls = latest_metrics.get("cls", 0)
-
-        html_content += f"""
-                <div class="metrics-grid">
-                    <div class="metric-card {'healthy' if fcp <= 1800 else 'warning' if fcp <= 3000 else 'critical'}">
-                        <div class="metric-value">{fcp}ms</div>
-                        <div class="metric-label">First Contentful Paint</div>
-                        <div class="metric-target">Target: ≤ 1.8s</div>
-                    </div>
-                    <div class="metric-card {'healthy' if lcp <= 2500 else 'warning' if lcp <= 4000 else 'critical'}">
-                        <div class="metric-value">{lcp}ms</div>
-                        <div class="metric-label">Largest Contentful Paint</div>
-                        <div class="metric-target">Target: ≤ 2.5s</div>
-                    </div>
-                    <div class="metric-card {'healthy' if cls <= 0.1 else 'warning' if cls <= 0.25 else 'critical'}">
-                        <div class="metric-value">{cls:.3f}</div>
-                        <div class="metric-label">Cumulative Layout Shift</div>
-                        <div class="metric-target">Target: ≤ 0.1</div>
-                    </div>
-                </div>
-"""
 
-        # Add performance trends chart if available
-        if chart_data:
-            html_content += (
-                """
-                <div class="chart-container">
-                    <div id="performanceChart"></div>
-                </div>
-                <script>
-                    var chartData = """
-                + json.dumps(chart_data)
-                + """;
-                    
-                    var traces = [];
-                    var colors = ['#3498db', '#e74c3c', '#f39c12', '#27ae60'];
-                    var colorIndex = 0;
-                    
-                    for (var route in chartData) {
-                        var data = chartData[route];
-                        
-                        traces.push({
-                            x: data.dates,
-                            y: data.fcp,
-                            name: route + ' - FCP',
-                            mode: 'lines+markers',
-                            line: { color: colors[colorIndex % colors.length] }
-                        });
-                        
-                        traces.push({
-                            x: data.dates,
-                            y: data.lcp,
-                            name: route + ' - LCP',
-                            mode: 'lines+markers',
-                            line: { color: colors[(colorIndex + 1) % colors.length], dash: 'dash' }
-                        });
-                        
-                        colorIndex += 2;
-                    }
-                    
-                    var layout = {
-                        title: 'Performance Trends (Last 7 Days)',
-                        xaxis: { title: 'Date' },
-                        yaxis: { title: 'Time (ms)' },
-                        hovermode: 'x unified'
-                    };
-                    
-                    Plotly.newPlot('performanceChart', traces, layout, {responsive: true});
-                </script>
-"""
+def generate_performance_chart_data(tenant: str = None):
+    """Generate data for performance trend charts for specific tenant"""
+    if tenant is None:
+        tenant = current_tenant()
+    return load_chart_data([tenant])[tenant]
+
+
+class ReportContext:
+    """Inputs for one report run.
+
+    SLO status, health score, budget results, latest metrics and alerts are
+    not tenant-scoped, so they are computed once and shared by every
+    report; tenant-scoped inputs are fetched in batches via `prefetch`.
+    `assets` selects how reports load the charting library (see
+    scripts.lib.report_template). The context is plain data, so it can be
+    shipped to worker processes.
+    """
+
+    def __init__(self, now: datetime = None, assets: str = "cdn"):
+        self.assets = assets
+        self.end_date = now or datetime.now()
+        self.start_date = self.end_date - timedelta(days=7)
+        self._shared = None
+        self._charts: Dict[str, dict] = {}
+        self._trend_digests: Dict[pathlib.Path, str] = {}
+
+    def shared(self) -> dict:
+        if self._shared is None:
+            self._shared = {
+                "slo_status": slo_service.calculate_slo_status(),
+                "health_score": uptime_service.get_system_health_score(),
+                "budget_results": performance_service.get_budget_results(),
+                "latest_metrics": performance_service.get_latest_metrics(),
+                "recent_alerts": uptime_service.get_alerts()[:10],
+            }
+        return self._shared
+
+    def prefetch(self, tenants: List[str]) -> "ReportContext":
+        """Load tenant-scoped inputs for all `tenants` in one batch"""
+        self.shared()
+        missing = [t for t in tenants if t not in self._charts]
+        if missing:
+            self._charts.update(load_chart_data(missing))
+        return self
+
+    def chart_data(self, tenant: str) -> dict:
+        if tenant not in self._charts:
+            self.prefetch([tenant])
+        return self._charts[tenant]
+
+    def _trend_digest(self, source: pathlib.Path) -> str:
+        if source not in self._trend_digests:
+            # Recent SQLite writes may still live in the write-ahead log
+            parts = [source, source.with_name(source.name + "-wal")]
+            self._trend_digests[source] = ":".join(
+                report_cache.file_digest(p) for p in parts if p.exists()
             )
-    else:
-        html_content += """
-                <p>No performance metrics available. Run performance tests to generate data.</p>
-"""
-
-    # Add alerts section
-    html_content += """
-            </div>
-            
-            <!-- Recent Alerts -->
-            <div class="section">
-                <h2>🚨 Recent Alerts</h2>
-"""
+        return self._trend_digests[source]
+
+    def fingerprint(self, tenant: str) -> str:
+        """Hash of everything `tenant`'s report is rendered from"""
+        source = _chart_source(tenant)
+        return report_cache.fingerprint(
+            {
+                "tenant": tenant,
+                "template": report_template.TEMPLATE_VERSION,
+                "assets": self.assets,
+                "period": self.end_date.strftime("%Y-%m-%d"),
+                "trends": [str(source), self._trend_digest(source)] if source else None,
+                "inputs": self.shared(),
+            }
+        )
 
-    if recent_alerts:
-        html_content += """
-                <div class="alerts-list">
-"""
-        for alert in recent_alerts[:5]:  # Show only top 5
-            severity = alert.get("severity", "info")
-            alert_class = "warning" if severity in ["warning", "error"] else "info"
-            timestamp = datetime.fromisoformat(alert.get("datetime", "")).strftime(
-                "%m/%d %H:%M"
-            )
 
-            html_content += f"""
-                    <div class="alert-item {alert_class}">
-                        <strong>{alert.get('type', 'Alert')}</strong> - {alert.get('message', 'No message')}
-                        <br><small>🕒 {timestamp}</small>
-                    </div>
-"""
-        html_content += """
-                </div>
-"""
+def generate_html_report(tenant: str = None, context: ReportContext = None):
+    """Generate comprehensive HTML report for a specific tenant"""
+    if tenant is None:
+        tenant = current_tenant()
+    if context is None:
+        context = ReportContext()
+
+    # Shared inputs are computed once per run, chart data per tenant
+    shared = context.shared()
+    slo_status = shared["slo_status"]
+    health_score = shared["health_score"]
+    budget_results = shared["budget_results"]
+    latest_metrics = shared["latest_metrics"]
+    recent_alerts = shared["recent_alerts"]
+    chart_data = context.chart_data(tenant)
+
+    # Report period is fixed for the whole run
+    end_date = context.end_date
+    start_date = context.start_date
+
+    budget_passed = bool(budget_results and budget_results.get("passed"))
+    if budget_passed:
+        budget_text = "All budgets met"
+    elif budget_results:
+        budget_text = f'{len(budget_results.get("violations", []))} violations'
     else:
-        html_content += """
-                <p>✅ No alerts in the past week. All systems are operating normally.</p>
-"""
+        budget_text = "No data"
 
-    # Add recommendations
-    html_content += """
-            </div>
-            
-            <!-- Recommendations -->
-            <div class="section">
-                <h2>💡 Recommendations</h2>
-                <ul>
-"""
+    shown_alerts = recent_alerts[:5]  # Show only top 5
+    alert_times = [
+        datetime.fromisoformat(alert.get("datetime", "")).strftime("%m/%d %H:%M")
+        for alert in shown_alerts
+    ]
 
     recommendations = []
 
@@ -486,25 +269,27 @@ def generate_html_report(tenant: str = None):
             "✅ All systems are performing well. Continue current monitoring practices."
         )
 
-    for rec in recommendations:
-        html_content += f"<li>{rec}</li>"
-
-    # Close HTML
-    html_content += f"""
-                </ul>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p>Generated on {end_date.strftime('%Y-%m-%d at %H:%M:%S')} | Fixzit Performance & Reliability Report</p>
-            <p>Tenant: {tenant} | Period: {start_date.strftime('%B %d')} to {end_date.strftime('%B %d, %Y')}</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-    return html_content
+    tenant_html = html.escape(tenant)
+    return report_template.render_page(
+        report_date=end_date.strftime("%Y-%m-%d"),
+        chart_src=report_template.chart_src(context.assets),
+        tenant=tenant_html,
+        period_start=start_date.strftime("%B %d"),
+        period_end=end_date.strftime("%B %d, %Y"),
+        health_score=f"{health_score.get('score', 0):.1f}",
+        health_grade=html.escape(str(health_score.get("grade", "N/A"))),
+        budget_class="healthy" if budget_passed else "critical",
+        budget_icon="✅" if budget_passed else "❌",
+        budget_text=budget_text,
+        alerts_class="healthy" if len(recent_alerts) == 0 else "warning",
+        alert_count=len(recent_alerts),
+        endpoints=html.escape(str(health_score.get("endpoints_monitored", 0))),
+        slo_cards=report_template.render_slo_cards(slo_status),
+        vitals=report_template.render_vitals(latest_metrics, chart_data),
+        alerts=report_template.render_alerts(shown_alerts, alert_times),
+        recommendations="\n".join(f"<li>{rec}</li>" for rec in recommendations),
+        generated=end_date.strftime("%Y-%m-%d at %H:%M:%S"),
+    )
 
 
 def send_email_report(html_content):
@@ -543,17 +328,173 @@ def send_email_report(html_content):
         return False
 
 
-def zip_reports(files: List[pathlib.Path]) -> pathlib.Path:
-    """Bundle multiple reports into a ZIP file"""
+def bundle_path() -> pathlib.Path:
     ts = datetime.now().strftime("%Y%m%d-%H%M")
-    zip_path = ART / f"weekly-reports-{ts}.zip"
+    return ART / f"weekly-reports-{ts}.zip"
+
+
+def add_bundle_assets(zf: zipfile.ZipFile, assets: str) -> None:
+    """Store the pinned charting bundle once for every report in the ZIP"""
+    if assets == "bundle":
+        zf.write(
+            report_template.chart_bundle(),
+            report_template.chart_src(assets),
+        )
 
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file_path in files:
-            if file_path.exists():
-                zf.write(file_path, file_path.name)
 
-    return zip_path
+# Report context of the current run, installed once per worker process
+_WORKER_CONTEXT = None
+
+
+def _init_worker(context: ReportContext) -> None:
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = context
+
+
+def render_tenant_report(tenant: str, context: ReportContext = None) -> dict:
+    """Generate and save one tenant's report; runs in a worker process"""
+    t0 = time.perf_counter()
+    try:
+        html_content = generate_html_report(tenant, context or _WORKER_CONTEXT)
+        report_file = ART / f"weekly-report-{tenant}.html"
+        report_file.write_text(html_content, encoding="utf-8")
+    except Exception as e:
+        return {
+            "tenant": tenant,
+            "ok": False,
+            "error": str(e),
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+    return {
+        "tenant": tenant,
+        "ok": True,
+        "file": str(report_file),
+        "bytes": len(html_content),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def _completed(tenants: List[str], workers: int, context: ReportContext):
+    """Yield tenant results as they finish, in a pool when workers > 1"""
+    if workers <= 1 or len(tenants) <= 1:
+        for tenant in tenants:
+            yield render_tenant_report(tenant, context)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tenants)),
+        initializer=_init_worker,
+        initargs=(context,),
+    ) as pool:
+        futures = [pool.submit(render_tenant_report, t) for t in tenants]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def generate_all(
+    tenants: List[str],
+    workers: int = WORKERS,
+    do_zip: bool = False,
+    assets: str = "cdn",
+    force: bool = False,
+):
+    """Render every tenant's report across `workers` processes.
+
+    Reports whose input fingerprint is unchanged since they were written
+    are reused (unless `force`), and so is a ZIP of exactly those reports.
+    Shared inputs and the chart data of reports that do need rendering are
+    loaded once up front and handed to each worker. Finished reports are
+    streamed into the ZIP bundle as they complete, so bundling overlaps
+    rendering. Returns (results, zip_path).
+    """
+    context = ReportContext(assets=assets)
+    cache = report_cache.ReportCache()
+    keys = {tenant: context.fingerprint(tenant) for tenant in tenants}
+    if assets == "bundle":
+        # Standalone reports in artifacts/ resolve assets/ next to themselves
+        report_template.install_bundle(ART)
+
+    results, pending = [], []
+    for tenant in tenants:
+        cached = None if force else cache.lookup(keys[tenant])
+        if cached is None:
+            pending.append(tenant)
+            continue
+        results.append(
+            {
+                "tenant": tenant,
+                "ok": True,
+                "cached": True,
+                "file": str(cached),
+                "bytes": cached.stat().st_size,
+                "seconds": 0.0,
+            }
+        )
+    if results:
+        print(f"♻️  Reusing {len(results)} unchanged report(s)")
+
+    bundle_key = report_cache.bundle_key(keys.values(), assets)
+    zip_path = None
+    if do_zip and not pending and not force:
+        zip_path = cache.lookup_bundle(bundle_key)
+        if zip_path is not None:
+            # Keep it the newest bundle for latest_report_paths()
+            os.utime(zip_path)
+            print(f"♻️  Reusing ZIP bundle {zip_path.name}")
+            return results, zip_path
+
+    context.prefetch(pending)
+    zip_path = bundle_path() if do_zip else None
+    zf = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) if do_zip else None
+    try:
+        if zf is not None:
+            add_bundle_assets(zf, assets)
+            for result in results:
+                report_file = pathlib.Path(result["file"])
+                zf.write(report_file, report_file.name)
+
+        for result in _completed(pending, workers, context):
+            results.append(result)
+            if not result["ok"]:
+                print(f"❌ {result['tenant']}: {result['error']}")
+                continue
+            report_file = pathlib.Path(result["file"])
+            cache.store(keys[result["tenant"]], result["tenant"], report_file)
+            if zf is not None:
+                zf.write(report_file, report_file.name)
+            print(
+                f"✅ {result['tenant']}: {result['bytes']:,} bytes "
+                f"in {result['seconds']:.2f}s"
+            )
+    finally:
+        if zf is not None:
+            zf.close()
+
+    if zip_path is not None and all(r["ok"] for r in results):
+        cache.store_bundle(bundle_key, zip_path)
+    cache.save()
+
+    order = {tenant: i for i, tenant in enumerate(tenants)}
+    results.sort(key=lambda r: order[r["tenant"]])
+    return results, zip_path
+
+
+def write_timings(results: List[dict], workers: int, wall_seconds: float) -> None:
+    """Per-tenant render timings for the run, slowest first"""
+    TIMINGS_FILE.write_text(
+        json.dumps(
+            {
+                "timestamp": int(time.time() * 1000),
+                "workers": workers,
+                "tenants": len(results),
+                "failed": {r["tenant"]: r["error"] for r in results if not r["ok"]},
+                "wall_seconds": round(wall_seconds, 3),
+                "cpu_seconds": round(sum(r["seconds"] for r in results), 3),
+                "timings": sorted(results, key=lambda r: r["seconds"], reverse=True),
+            },
+            indent=2,
+        )
+    )
 
 
 def main(args: argparse.Namespace = None):
@@ -565,6 +506,25 @@ def main(args: argparse.Namespace = None):
             "--all", action="store_true", help="Generate for all tenants"
         )
         parser.add_argument("--zip", action="store_true", help="Create ZIP bundle")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Processes rendering tenant reports with --all "
+            "(default: FXZ_REPORT_WORKERS or CPU count)",
+        )
+        parser.add_argument(
+            "--assets",
+            choices=report_template.ASSET_MODES,
+            default=ASSETS,
+            help="Load the pinned charting bundle from the CDN, or from a local "
+            "assets/ copy shipped once next to the reports and in the ZIP (bundle)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate reports even when their inputs are unchanged",
+        )
         args = parser.parse_args()
 
     print("📊 Generating Weekly Report(s)")
@@ -572,43 +532,60 @@ def main(args: argparse.Namespace = None):
 
     try:
         generated_files = []
+        failures = {}
+        zip_path = None
+        assets = getattr(args, "assets", ASSETS)
+        force = getattr(args, "force", False)
 
         if args.all:
             # Generate for all tenants
             tenants = list_tenants()
+            workers = getattr(args, "workers", WORKERS)
             print(f"📋 Found {len(tenants)} tenant(s): {', '.join(tenants)}")
+            print(f"⚙️  Rendering with {min(workers, len(tenants))} worker(s)")
 
-            for tenant in tenants:
-                print(f"\n🏢 Processing tenant: {tenant}")
-                html_content = generate_html_report(tenant)
-
-                # Save tenant-specific report
-                report_file = ART / f"weekly-report-{tenant}.html"
-                report_file.write_text(html_content, encoding="utf-8")
-                generated_files.append(report_file)
-
-                print(f"✅ Report saved: {report_file}")
-                print(f"📁 File size: {len(html_content):,} bytes")
+            t0 = time.perf_counter()
+            results, zip_path = generate_all(
+                tenants, workers, do_zip=args.zip, assets=assets, force=force
+            )
+            wall = time.perf_counter() - t0
+            write_timings(results, workers, wall)
+
+            generated_files = [pathlib.Path(r["file"]) for r in results if r["ok"]]
+            failures = {r["tenant"]: r["error"] for r in results if not r["ok"]}
+            print(
+                f"\n⏱️  {len(generated_files)} report(s) in {wall:.1f}s"
+                + (f", {len(failures)} failed" if failures else "")
+            )
+            for tenant, error in failures.items():
+                print(f"   ❌ {tenant}: {error}")
+            print(f"📈 Timings saved: {TIMINGS_FILE}")
+            if failures and not generated_files:
+                raise RuntimeError("No tenant report could be generated")
         else:
             # Generate for single tenant
             tenant = args.tenant or current_tenant()
             print(f"🏢 Processing tenant: {tenant}")
 
-            html_content = generate_html_report(tenant)
-
-            # Save report
-            report_file = ART / f"weekly-report-{tenant}.html"
-            report_file.write_text(html_content, encoding="utf-8")
-            generated_files.append(report_file)
+            (result,), zip_path = generate_all(
+                [tenant], 1, do_zip=args.zip, assets=assets, force=force
+            )
+            if not result["ok"]:
+                raise RuntimeError(result["error"])
+            generated_files.append(pathlib.Path(result["file"]))
 
-            print(f"✅ Report saved: {report_file}")
-            print(f"📁 File size: {len(html_content):,} bytes")
+            print(f"✅ Report saved: {result['file']}")
+            print(f"📁 File size: {result['bytes']:,} bytes")
 
-        # Create ZIP bundle if requested
-        if args.zip and generated_files:
-            zip_path = zip_reports(generated_files)
-            print(f"📦 ZIP bundle created: {zip_path}")
+        if zip_path is not None:
+            print(f"📦 ZIP bundle ready: {zip_path}")
             print(f"📁 Bundle size: {zip_path.stat().st_size:,} bytes")
+            if failures:
+                print(f"⚠️  Bundle is missing {len(failures)} failed tenant(s)")
+
+        if failures:
+            print(f"\n💥 Report generation failed for {len(failures)} tenant(s)")
+            return 1
 
         print("\n🎯 Weekly report generation completed!")
         print(f"📂 All files saved to: {ART}")